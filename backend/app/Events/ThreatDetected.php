@@ -50,16 +50,6 @@ public function broadcastAs(): string
      */
     public function broadcastWith(): array
     {
-        return [
-            'id' => $this->threat->id,
-            'ip_address' => $this->threat->ip_address,
-            'geo_location' => $this->threat->geo_location,
-            'attack_signature' => $this->threat->attack_signature,
-            'attack_type' => $this->threat->attack_type,
-            'risk_score' => $this->threat->risk_score,
-            'ai_analysis' => $this->threat->ai_analysis,
-            'metadata' => $this->threat->metadata,
-            'created_at' => $this->threat->created_at->toISOString(),
-        ];
+        return $this->threat->toBroadcast();
     }
 }
@@ -0,0 +1,59 @@
+<?php
+
+namespace App\Events;
+
+use Illuminate\Broadcasting\Channel;
+use Illuminate\Broadcasting\InteractsWithSockets;
+use Illuminate\Contracts\Broadcasting\ShouldBroadcast;
+use Illuminate\Foundation\Events\Dispatchable;
+use Illuminate\Queue\SerializesModels;
+use Illuminate\Support\Collection;
+
+class ThreatsAnalyzed implements ShouldBroadcast
+{
+    use Dispatchable, InteractsWithSockets, SerializesModels;
+
+    public $threats;
+
+    /**
+     * Create a new event instance for threats whose AI analysis was attached
+     * after they were stored.
+     */
+    public function __construct(Collection $threats)
+    {
+        $this->threats = $threats;
+    }
+
+    /**
+     * Get the channels the event should broadcast on.
+     *
+     * @return array<int, \Illuminate\Broadcasting\Channel>
+     */
+    public function broadcastOn(): array
+    {
+        return [
+            new Channel('threats'),
+        ];
+    }
+
+    /**
+     * The event's broadcast name.
+     */
+    public function broadcastAs(): string
+    {
+        return 'threats.analyzed';
+    }
+
+    /**
+     * Get the data to broadcast: only the ids, so a batch of 500 analyses
+     * stays under Reverb's message size limit. The dashboard reloads the text
+     * from GET /api/threats/{id} when a case file is opened.
+     */
+    public function broadcastWith(): array
+    {
+        return [
+            'count' => $this->threats->count(),
+            'ids' => $this->threats->pluck('id')->sort()->values()->all(),
+        ];
+    }
+}
@@ -0,0 +1,107 @@
+<?php
+
+namespace App\Events;
+
+use Illuminate\Broadcasting\Channel;
+use Illuminate\Broadcasting\InteractsWithSockets;
+use Illuminate\Contracts\Broadcasting\ShouldBroadcast;
+use Illuminate\Database\Eloquent\Collection;
+use Illuminate\Foundation\Events\Dispatchable;
+use Illuminate\Queue\SerializesModels;
+
+class ThreatsDetected implements ShouldBroadcast
+{
+    use Dispatchable, InteractsWithSockets, SerializesModels;
+
+    public $threats;
+
+    public $immediate;
+
+    public $cursor;
+
+    /**
+     * Create a new event instance for a batch of stored threats. The
+     * broadcast ticker sends immediately instead of through the queue, and
+     * passes its settled cursor: the id below which nothing is still to come.
+     */
+    public function __construct(Collection $threats, bool $immediate = false, ?int $cursor = null)
+    {
+        $this->threats = $threats;
+        $this->immediate = $immediate;
+        $this->cursor = $cursor;
+    }
+
+    /**
+     * Whether to skip the queue.
+     */
+    public function shouldBroadcastNow(): bool
+    {
+        return $this->immediate;
+    }
+
+    /**
+     * Get the channels the event should broadcast on.
+     *
+     * @return array<int, \Illuminate\Broadcasting\Channel>
+     */
+    public function broadcastOn(): array
+    {
+        return [
+            new Channel('threats'),
+        ];
+    }
+
+    /**
+     * The event's broadcast name.
+     */
+    public function broadcastAs(): string
+    {
+        return 'threats.detected';
+    }
+
+    /**
+     * Get the data to broadcast: counts for the whole batch, so the dashboard
+     * can update its totals once, and only the newest threats, so the frame
+     * stays under Reverb's message size limit however large the burst. The
+     * batch's ids go as [first, last] runs so the dashboard can tell which
+     * of them it already counted from the feed.
+     */
+    public function broadcastWith(): array
+    {
+        return [
+            'count' => $this->threats->count(),
+            'by_type' => $this->threats->countBy('attack_type')->all(),
+            'high_risk' => $this->threats->where('risk_score', '>=', 80)->count(),
+            'last_id' => $this->threats->max('id'),
+            'cursor' => $this->cursor ?? $this->threats->max('id'),
+            'ids' => self::idRanges($this->threats->pluck('id')->sort()->values()->all()),
+            'threats' => $this->threats->sortBy('id')
+                ->slice(-config('threats.broadcast_max_threats'))
+                ->map(fn ($threat) => $threat->toBroadcast())
+                ->values()
+                ->all(),
+        ];
+    }
+
+    /**
+     * Sorted ids as [first, last] runs. A tick's ids are nearly consecutive,
+     * so a burst of thousands is still only a few pairs.
+     *
+     * @param  array<int, int>  $ids
+     * @return array<int, array{0: int, 1: int}>
+     */
+    private static function idRanges(array $ids): array
+    {
+        $ranges = [];
+        foreach ($ids as $id) {
+            $last = array_key_last($ranges);
+            if ($last !== null && $ranges[$last][1] === $id - 1) {
+                $ranges[$last][1] = $id;
+            } else {
+                $ranges[] = [$id, $id];
+            }
+        }
+
+        return $ranges;
+    }
+}
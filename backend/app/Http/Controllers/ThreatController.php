@@ -3,20 +3,188 @@
 namespace App\Http\Controllers;
 
 use Illuminate\Http\Request;
+use App\Models\PendingAnalysis;
+use App\Models\ThreatArchive;
 use App\Models\ThreatLog;
+use App\Models\ThreatRollup;
 use App\Events\ThreatDetected;
+use App\Events\ThreatsDetected;
+use App\Events\ThreatsAnalyzed;
 use Illuminate\Support\Facades\Validator;
+use Illuminate\Support\Facades\Cache;
 use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Str;
 
 class ThreatController extends Controller
 {
+    /**
+     * Rows per multi-row INSERT; 10 columns each stays under SQLite's 999 bound parameters
+     */
+    private const INSERT_CHUNK = 90;
+
+    /**
+     * Seconds a stats response is reused; the dashboard polls every 15s
+     */
+    private const STATS_TTL = 5;
+
     /**
      * Store a new threat from the Hunter engine
      * POST /api/threats
      */
     public function store(Request $request)
+    {
+        $validator = Validator::make($request->all(), $this->threatRules());
+
+        if ($validator->fails()) {
+            return response()->json([
+                'success' => false,
+                'errors' => $validator->errors()
+            ], 422);
+        }
+
+        $threat = DB::transaction(function () use ($request) {
+            $threat = $this->createThreat($request->all());
+            if ($threat->wasRecentlyCreated) {
+                ThreatRollup::record([$threat], $threat->created_at);
+                PendingAnalysis::claim(collect([$threat]));
+            }
+            return $threat;
+        });
+
+        // Broadcast real-time event to frontend, unless the broadcast ticker batches it
+        if ($threat->wasRecentlyCreated && ! config('threats.broadcast_tick_ms')) {
+            broadcast(new ThreatDetected($threat))->toOthers();
+        }
+
+        return response()->json([
+            'success' => true,
+            'message' => 'Threat logged successfully',
+            'threat_id' => $threat->id,
+        ], 201);
+    }
+
+    /**
+     * Store a batch of threats from the Hunter engine
+     * POST /api/threats/batch
+     */
+    public function storeBatch(Request $request)
+    {
+        $rules = ['threats' => 'required|array|min:1|max:500'];
+        foreach ($this->threatRules() as $field => $rule) {
+            $rules["threats.*.{$field}"] = $rule;
+        }
+
+        $validator = Validator::make($request->all(), $rules);
+
+        if ($validator->fails()) {
+            return response()->json([
+                'success' => false,
+                'errors' => $validator->errors()
+            ], 422);
+        }
+
+        // One row per event_id; a batch may repeat a redelivered threat
+        $eventIds = [];
+        $rows = [];
+        foreach ($request->input('threats') as $item) {
+            $row = $this->threatAttributes($item);
+            $row['event_id'] ??= (string) Str::ulid();
+            $eventIds[] = $row['event_id'];
+            $rows[$row['event_id']] = $row;
+        }
+
+        [$stored, $created] = DB::transaction(function () use ($rows) {
+            $existing = ThreatLog::whereIn('event_id', array_keys($rows))->pluck('event_id')->all();
+            $new = array_diff_key($rows, array_flip($existing));
+
+            $now = now();
+            $records = array_map(fn ($row) => array_merge($row, [
+                'metadata' => $row['metadata'] === null ? null : json_encode($row['metadata']),
+                'created_at' => $now,
+                'updated_at' => $now,
+            ]), array_values($new));
+
+            // insertOrIgnore: a concurrent redelivery of the same event_id is skipped, not an error
+            foreach (array_chunk($records, self::INSERT_CHUNK) as $chunk) {
+                ThreatLog::insertOrIgnore($chunk);
+            }
+
+            $stored = ThreatLog::whereIn('event_id', array_keys($rows))->orderBy('id')->get()->keyBy('event_id');
+            $created = $stored->filter(fn ($threat) => isset($new[$threat->event_id]))->values();
+
+            ThreatRollup::record($created, $now);
+            PendingAnalysis::claim($created);
+
+            return [$stored, $created];
+        });
+
+        // One event for the whole batch instead of one per threat, unless the broadcast ticker batches it
+        if ($created->isNotEmpty() && ! config('threats.broadcast_tick_ms')) {
+            broadcast(new ThreatsDetected($created))->toOthers();
+        }
+
+        return response()->json([
+            'success' => true,
+            'message' => 'Threats logged successfully',
+            'count' => count($eventIds),
+            'created' => $created->count(),
+            'threat_ids' => array_map(fn ($eventId) => $stored[$eventId]->id, $eventIds),
+        ], 201);
+    }
+
+    /**
+     * Attach AI analysis that finished after its threat was stored. An
+     * analysis that arrives before its threat is held and attached when the
+     * threat is stored; its event_id is listed under pending.
+     * POST /api/threats/analysis
+     */
+    public function updateAnalysis(Request $request)
     {
         $validator = Validator::make($request->all(), [
+            'threats' => 'required|array|min:1|max:500',
+            'threats.*.event_id' => 'required|string|max:64',
+            'threats.*.ai_analysis' => 'required|string',
+        ]);
+
+        if ($validator->fails()) {
+            return response()->json([
+                'success' => false,
+                'errors' => $validator->errors()
+            ], 422);
+        }
+
+        $analysis = collect($request->input('threats'))->pluck('ai_analysis', 'event_id');
+
+        [$threats, $pending] = DB::transaction(function () use ($analysis) {
+            $threats = ThreatLog::whereIn('event_id', $analysis->keys())->get();
+            foreach ($threats as $threat) {
+                $threat->update(['ai_analysis' => $analysis[$threat->event_id]]);
+            }
+
+            $pending = $analysis->except($threats->pluck('event_id')->all());
+            PendingAnalysis::hold($pending);
+
+            return [$threats, $pending];
+        });
+
+        // One event for the whole request instead of one per threat
+        if ($threats->isNotEmpty()) {
+            broadcast(new ThreatsAnalyzed($threats))->toOthers();
+        }
+
+        return response()->json([
+            'success' => true,
+            'updated' => $threats->count(),
+            'pending' => $pending->keys()->all(),
+        ]);
+    }
+
+    /**
+     * Validation rules for a single threat payload
+     */
+    private function threatRules(): array
+    {
+        return [
             'ip_address' => 'required|string|max:255',
             'attack_signature' => 'required|string|max:255',
             'attack_type' => 'required|string|max:255',
@@ -24,39 +192,45 @@ public function store(Request $request)
             'geo_location' => 'nullable|string|max:255',
             'ai_analysis' => 'nullable|string',
             'metadata' => 'nullable|string', // JSON string
-        ]);
+            'event_id' => 'nullable|string|max:64',
+        ];
+    }
 
-        if ($validator->fails()) {
-            return response()->json([
-                'success' => false,
-                'errors' => $validator->errors()
-            ], 422);
+    /**
+     * Store one threat; a redelivered event_id returns the existing row
+     */
+    private function createThreat(array $input): ThreatLog
+    {
+        $attributes = $this->threatAttributes($input);
+
+        if ($attributes['event_id'] === null) {
+            return ThreatLog::create($attributes);
         }
 
+        return ThreatLog::firstOrCreate(['event_id' => $attributes['event_id']], $attributes);
+    }
+
+    /**
+     * Map a validated threat payload onto ThreatLog attributes
+     */
+    private function threatAttributes(array $input): array
+    {
         // Parse metadata if it's a JSON string
-        $metadata = $request->input('metadata');
+        $metadata = $input['metadata'] ?? null;
         if (is_string($metadata)) {
             $metadata = json_decode($metadata, true);
         }
 
-        $threat = ThreatLog::create([
-            'ip_address' => $request->input('ip_address'),
-            'geo_location' => $request->input('geo_location', 'Unknown'),
-            'attack_signature' => $request->input('attack_signature'),
-            'attack_type' => $request->input('attack_type'),
-            'risk_score' => $request->input('risk_score'),
-            'ai_analysis' => $request->input('ai_analysis'),
+        return [
+            'event_id' => $input['event_id'] ?? null,
+            'ip_address' => $input['ip_address'],
+            'geo_location' => $input['geo_location'] ?? 'Unknown',
+            'attack_signature' => $input['attack_signature'],
+            'attack_type' => $input['attack_type'],
+            'risk_score' => $input['risk_score'],
+            'ai_analysis' => $input['ai_analysis'] ?? null,
             'metadata' => $metadata,
-        ]);
-
-        // Broadcast real-time event to frontend
-        broadcast(new ThreatDetected($threat))->toOthers();
-
-        return response()->json([
-            'success' => true,
-            'message' => 'Threat logged successfully',
-            'threat_id' => $threat->id,
-        ], 201);
+        ];
     }
 
     /**
@@ -76,54 +250,131 @@ public function recent(Request $request)
     }
 
     /**
-     * Get threat statistics for the dashboard
-     * GET /api/threats/stats
+     * Get threats stored after a cursor, in the slim feed projection. Without
+     * since_id, returns the latest threats to start from. Pass the returned
+     * cursor as the next since_id. It stops before an id that may not have
+     * committed yet (see ThreatLog::settledCursor), so rows above it come back
+     * on the next poll; clients skip ids they already have. has_more means
+     * another page is waiting after last_id.
+     * GET /api/threats/feed?since_id=1234&limit=100
+     */
+    public function feed(Request $request)
+    {
+        $limit = min(max((int) $request->input('limit', 100), 1), 500);
+        $sinceId = $request->input('since_id');
+
+        if ($sinceId === null) {
+            $threats = ThreatLog::select(ThreatLog::FEED_COLUMNS)
+                ->orderByDesc('id')
+                ->limit($limit)
+                ->get()
+                ->reverse()
+                ->values();
+            $hasMore = false;
+            $sinceId = ($threats->first()?->id ?? 1) - 1;
+        } else {
+            // One extra row tells whether the client is still behind
+            $threats = ThreatLog::select(ThreatLog::FEED_COLUMNS)->since((int) $sinceId)->limit($limit + 1)->get();
+            $hasMore = $threats->count() > $limit;
+            $threats = $threats->take($limit);
+        }
+
+        return response()->json([
+            'success' => true,
+            'count' => $threats->count(),
+            'cursor' => ThreatLog::settledCursor($threats, (int) $sinceId),
+            'last_id' => $threats->last()?->id ?? (int) $sinceId,
+            'has_more' => $hasMore,
+            'threats' => $threats,
+        ]);
+    }
+
+    /**
+     * Get one threat with its forensic metadata and AI analysis
+     * GET /api/threats/{id}
+     */
+    public function show(ThreatLog $threat)
+    {
+        return response()->json([
+            'success' => true,
+            'threat' => $threat,
+        ]);
+    }
+
+    /**
+     * Get threat statistics for the dashboard, read from the threat_rollups
+     * and threat_totals counters so the cost does not grow with threat_logs
+     * GET /api/threats/stats?minutes=60
      */
     public function stats(Request $request)
     {
-        $minutes = $request->input('minutes', 60); // Last 60 minutes by default
+        $minutes = min(max((int) $request->input('minutes', 60), 1), 1440); // Last 60 minutes by default
 
-        // Total threats
-        $total = ThreatLog::count();
+        $stats = Cache::remember("threats.stats.{$minutes}", self::STATS_TTL, function () use ($minutes) {
+            $since = now()->subMinutes($minutes)->startOfMinute();
+            $totals = DB::table('threat_totals');
+            $window = DB::table('threat_rollups')->where('minute', '>=', $since);
 
-        // Recent threats (last N minutes)
-        $recent_count = ThreatLog::where('created_at', '>=', now()->subMinutes($minutes))->count();
+            // Threats by type (all time)
+            $by_type = (clone $totals)->where('dimension', 'type')
+                ->orderByDesc('count')
+                ->get(['value as attack_type', 'count']);
 
-        // Threats by type
-        $by_type = ThreatLog::select('attack_type', DB::raw('count(*) as count'))
-            ->groupBy('attack_type')
-            ->get();
+            // Attacks per minute (for velocity chart)
+            $velocity = (clone $window)->where('dimension', 'type')
+                ->select('minute', DB::raw('sum(count) as count'))
+                ->groupBy('minute')
+                ->orderBy('minute')
+                ->get();
 
-        // High-risk threats
-        $high_risk_count = ThreatLog::highRisk()->count();
-
-        // Attacks per minute (for velocity chart)
-        $velocity = ThreatLog::select(
-            DB::raw('DATE_FORMAT(created_at, "%Y-%m-%d %H:%i:00") as minute'),
-            DB::raw('count(*) as count')
-        )
-            ->where('created_at', '>=', now()->subMinutes($minutes))
-            ->groupBy('minute')
-            ->orderBy('minute')
-            ->get();
+            // Top attacking IPs, all time and within the window
+            $top_ips = (clone $totals)->where('dimension', 'ip')
+                ->orderByDesc('count')
+                ->limit(10)
+                ->get(['value as ip_address', 'count']);
 
-        // Top attacking IPs
-        $top_ips = ThreatLog::select('ip_address', DB::raw('count(*) as count'))
-            ->groupBy('ip_address')
-            ->orderByDesc('count')
-            ->limit(10)
-            ->get();
+            $recent_top_ips = (clone $window)->where('dimension', 'ip')
+                ->select('value as ip_address', DB::raw('sum(count) as count'))
+                ->groupBy('value')
+                ->orderByDesc('count')
+                ->limit(10)
+                ->get();
 
-        return response()->json([
-            'success' => true,
-            'stats' => [
-                'total_threats' => $total,
-                'recent_threats' => $recent_count,
-                'high_risk_threats' => $high_risk_count,
+            return [
+                'total_threats' => (int) $by_type->sum('count'),
+                'recent_threats' => (int) $velocity->sum('count'),
+                'high_risk_threats' => (int) (clone $totals)->where('dimension', 'risk')
+                    ->whereIn('value', ['high', 'critical'])
+                    ->sum('count'),
                 'by_type' => $by_type,
                 'velocity' => $velocity,
                 'top_ips' => $top_ips,
-            ],
+                'recent_top_ips' => $recent_top_ips,
+            ];
+        });
+
+        return response()->json([
+            'success' => true,
+            'stats' => $stats,
+        ]);
+    }
+
+    /**
+     * Get daily summaries of threats moved out of threat_logs by threats:prune
+     * GET /api/threats/archives?days=30
+     */
+    public function archives(Request $request)
+    {
+        $days = min(max((int) $request->input('days', 30), 1), 366);
+
+        $archives = ThreatArchive::where('day', '>=', now()->startOfDay()->subDays($days))
+            ->orderByDesc('day')
+            ->get(['day', 'count', 'bytes', 'unique_ips', 'max_risk', 'by_type', 'by_risk', 'top_ips']);
+
+        return response()->json([
+            'success' => true,
+            'count' => $archives->count(),
+            'archives' => $archives,
         ]);
     }
 
@@ -136,8 +387,7 @@ public function map()
         // Get unique locations with threat counts
         $threats = ThreatLog::select('geo_location', 'ip_address', DB::raw('MAX(risk_score) as max_risk'), DB::raw('count(*) as count'))
             ->whereNotNull('geo_location')
-            ->where('geo_location', '!=', 'Unknown Location')
-            ->where('geo_location', '!=', 'Local Network')
+            ->whereNotIn('geo_location', ['Unknown Location', 'Local Network', 'Secure Network (Local)'])
             ->groupBy('geo_location', 'ip_address')
             ->get();
 
@@ -0,0 +1,77 @@
+<?php
+
+namespace App\Models;
+
+use Illuminate\Database\Eloquent\Model;
+use Illuminate\Support\Collection;
+use Illuminate\Support\Facades\DB;
+
+class PendingAnalysis extends Model
+{
+    protected $fillable = [
+        'event_id',
+        'ai_analysis',
+    ];
+
+    /**
+     * Rows per upsert; 4 columns each stays under SQLite's 999 bound parameters
+     */
+    private const UPSERT_CHUNK = 200;
+
+    /**
+     * Hold analyses (ai_analysis keyed by event_id) whose threats are not
+     * stored yet. A repeated event_id keeps the latest analysis.
+     */
+    public static function hold(Collection $analysis): void
+    {
+        $now = now();
+        $rows = $analysis->map(fn ($text, $eventId) => [
+            'event_id' => $eventId,
+            'ai_analysis' => $text,
+            'created_at' => $now,
+            'updated_at' => $now,
+        ])->values()->all();
+
+        foreach (array_chunk($rows, self::UPSERT_CHUNK) as $chunk) {
+            self::upsert($chunk, ['event_id'], ['ai_analysis', 'updated_at']);
+        }
+    }
+
+    /**
+     * Attach held analyses to newly stored threats and drop them from the
+     * hold. Call inside the transaction that inserted the threats. Returns
+     * the threats that got an analysis.
+     */
+    public static function claim(Collection $threats): Collection
+    {
+        $eventIds = $threats->pluck('event_id')->filter()->values();
+        if ($eventIds->isEmpty()) {
+            return collect();
+        }
+
+        $held = self::whereIn('event_id', $eventIds)->pluck('ai_analysis', 'event_id');
+        if ($held->isEmpty()) {
+            return collect();
+        }
+
+        $claimed = $threats->filter(fn ($threat) => isset($held[$threat->event_id]))->values();
+        foreach ($claimed as $threat) {
+            $threat->update(['ai_analysis' => $held[$threat->event_id]]);
+        }
+        self::whereIn('event_id', $held->keys())->delete();
+
+        return $claimed;
+    }
+
+    /**
+     * Claim analyses whose threat was stored while the analysis was being
+     * held: a batch and its analysis that commit at the same moment can each
+     * miss the other. Returns the threats that got an analysis.
+     */
+    public static function sweep(): Collection
+    {
+        return DB::transaction(fn () => self::claim(
+            ThreatLog::whereIn('event_id', self::select('event_id'))->get()
+        ));
+    }
+}
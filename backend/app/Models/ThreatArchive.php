@@ -0,0 +1,168 @@
+<?php
+
+namespace App\Models;
+
+use Carbon\CarbonInterface;
+use Illuminate\Database\Eloquent\Model;
+use Illuminate\Support\Carbon;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Storage;
+
+class ThreatArchive extends Model
+{
+    protected $fillable = [
+        'day',
+        'path',
+        'first_id',
+        'last_id',
+        'count',
+        'bytes',
+        'unique_ips',
+        'max_risk',
+        'by_type',
+        'by_risk',
+        'top_ips',
+    ];
+
+    protected $casts = [
+        'day' => 'date',
+        'first_id' => 'integer',
+        'last_id' => 'integer',
+        'count' => 'integer',
+        'bytes' => 'integer',
+        'unique_ips' => 'integer',
+        'max_risk' => 'integer',
+        'by_type' => 'array',
+        'by_risk' => 'array',
+        'top_ips' => 'array',
+    ];
+
+    /**
+     * Source IPs kept per archive summary
+     */
+    private const TOP_IPS = 10;
+
+    /**
+     * Move every whole day before $cutoff out of threat_logs, one gzip'd
+     * JSONL file and summary row per day, then drop the per-minute rollups
+     * older than $cutoff. Returns the archives written.
+     */
+    public static function pruneBefore(CarbonInterface $cutoff): array
+    {
+        self::recover();
+
+        $archives = [];
+        $oldest = ThreatLog::where('created_at', '<', $cutoff)->min('created_at');
+        if ($oldest !== null) {
+            for ($day = Carbon::parse($oldest)->startOfDay(); $day < $cutoff; $day = $day->copy()->addDay()) {
+                if ($archive = self::archiveDay($day)) {
+                    $archives[] = $archive;
+                }
+            }
+        }
+
+        // The stats window is at most a day; older minutes are covered by threat_totals
+        DB::table('threat_rollups')->where('minute', '<', $cutoff)->delete();
+
+        return $archives;
+    }
+
+    /**
+     * Archive and delete the threats stored for one day
+     */
+    public static function archiveDay(CarbonInterface $day): ?self
+    {
+        $disk = Storage::disk(config('threats.archive_disk'));
+        $chunk = config('threats.prune_chunk');
+        $day = $day->copy()->startOfDay();
+        $next = $day->copy()->addDay();
+        $ofDay = fn () => ThreatLog::where('created_at', '>=', $day)->where('created_at', '<', $next);
+
+        // Rows an earlier run archived but did not finish deleting
+        $covered = (int) self::whereDate('day', $day)->max('last_id');
+        $leftover = $ofDay()->where('id', '<=', $covered)->min('id');
+        if ($leftover !== null) {
+            self::deleteRange($ofDay, $leftover - 1, $covered, $chunk);
+        }
+
+        // Stream the rest to a local gzip file, summarizing as we go
+        $local = tempnam(sys_get_temp_dir(), 'threats');
+        $gz = gzopen($local, 'wb6');
+        $summary = ['count' => 0, 'max_risk' => 0, 'by_type' => [], 'by_risk' => []];
+        $ips = [];
+        $firstId = $lastId = null;
+
+        foreach ($ofDay()->where('id', '>', $covered)->lazyById($chunk) as $threat) {
+            gzwrite($gz, json_encode($threat->toArray()) . "\n");
+            $firstId ??= $threat->id;
+            $lastId = $threat->id;
+            $summary['count']++;
+            $summary['max_risk'] = max($summary['max_risk'], $threat->risk_score);
+            $band = ThreatRollup::riskBand($threat->risk_score);
+            $summary['by_type'][$threat->attack_type] = ($summary['by_type'][$threat->attack_type] ?? 0) + 1;
+            $summary['by_risk'][$band] = ($summary['by_risk'][$band] ?? 0) + 1;
+            $ips[$threat->ip_address] = ($ips[$threat->ip_address] ?? 0) + 1;
+        }
+        gzclose($gz);
+
+        if ($summary['count'] === 0) {
+            unlink($local);
+            return null;
+        }
+
+        // Upload as .partial; it only becomes the archive once its row is committed
+        $path = sprintf('%s/threats-%s-%d.jsonl.gz', config('threats.archive_path'), $day->toDateString(), $lastId);
+        $stream = fopen($local, 'rb');
+        $disk->writeStream("{$path}.partial", $stream);
+        fclose($stream);
+        $bytes = filesize($local);
+        unlink($local);
+
+        arsort($ips);
+        $archive = self::create(array_merge($summary, [
+            'day' => $day,
+            'path' => $path,
+            'first_id' => $firstId,
+            'last_id' => $lastId,
+            'bytes' => $bytes,
+            'unique_ips' => count($ips),
+            'top_ips' => array_slice($ips, 0, self::TOP_IPS, true),
+        ]));
+        $disk->move("{$path}.partial", $path);
+
+        self::deleteRange($ofDay, $firstId - 1, $lastId, $chunk);
+
+        return $archive;
+    }
+
+    /**
+     * Delete a day's threats with $from < id <= $to, a short transaction per id slice
+     */
+    private static function deleteRange(callable $ofDay, int $from, int $to, int $chunk): void
+    {
+        for ($start = $from; $start < $to; $start += $chunk) {
+            $ofDay()->where('id', '>', $start)->where('id', '<=', min($start + $chunk, $to))->delete();
+        }
+    }
+
+    /**
+     * Finish or discard uploads an interrupted run left behind
+     */
+    private static function recover(): void
+    {
+        $disk = Storage::disk(config('threats.archive_disk'));
+        $known = self::pluck('path')->flip();
+
+        foreach ($disk->files(config('threats.archive_path')) as $file) {
+            if (! str_ends_with($file, '.partial')) {
+                continue;
+            }
+            $path = substr($file, 0, -strlen('.partial'));
+            if (! isset($known[$path])) {
+                $disk->delete($file);                  // Never committed; its rows are still in threat_logs
+            } elseif (! $disk->exists($path)) {
+                $disk->move($file, $path);             // Committed, rename did not happen
+            }
+        }
+    }
+}
@@ -3,10 +3,12 @@
 namespace App\Models;
 
 use Illuminate\Database\Eloquent\Model;
+use Illuminate\Support\Collection;
 
 class ThreatLog extends Model
 {
     protected $fillable = [
+        'event_id',
         'ip_address',
         'geo_location',
         'attack_signature',
@@ -23,6 +25,65 @@ class ThreatLog extends Model
         'updated_at' => 'datetime',
     ];
 
+    /**
+     * Columns the incremental feed returns: no metadata blob or AI text, only
+     * the two metadata fields the feed card shows. The full row is fetched
+     * per threat from GET /api/threats/{id}.
+     */
+    public const FEED_COLUMNS = [
+        'id',
+        'ip_address',
+        'geo_location',
+        'attack_signature',
+        'attack_type',
+        'risk_score',
+        'created_at',
+        'metadata->ips_action as ips_action',
+        'metadata->victim_name as victim_name',
+        'metadata->geo->country_code as country_code',
+    ];
+
+    /**
+     * Fields pushed to the dashboard on the threats channel; the same slim
+     * projection as FEED_COLUMNS
+     */
+    public function toBroadcast(): array
+    {
+        return [
+            'id' => $this->id,
+            'ip_address' => $this->ip_address,
+            'geo_location' => $this->geo_location,
+            'attack_signature' => $this->attack_signature,
+            'attack_type' => $this->attack_type,
+            'risk_score' => $this->risk_score,
+            'created_at' => $this->created_at->toISOString(),
+            'ips_action' => $this->metadata['ips_action'] ?? null,
+            'victim_name' => $this->metadata['victim_name'] ?? null,
+            'country_code' => $this->metadata['geo']['country_code'] ?? null,
+        ];
+    }
+
+    /**
+     * The highest id a cursor may move to after reading $threats (ids above
+     * $after, in id order): every id up to it is either stored or was rolled
+     * back. A missing id right below a row younger than
+     * threats.cursor_grace_seconds may still be in an open transaction, so
+     * the cursor stops before it and the rows above are read again.
+     */
+    public static function settledCursor(Collection $threats, int $after): int
+    {
+        $grace = now()->subSeconds(config('threats.cursor_grace_seconds'));
+        $cursor = $after;
+        foreach ($threats as $threat) {
+            if ($threat->id > $cursor + 1 && $threat->created_at >= $grace) {
+                break;
+            }
+            $cursor = $threat->id;
+        }
+
+        return $cursor;
+    }
+
     /**
      * Scope to get recent threats
      */
@@ -31,6 +92,14 @@ public function scopeRecent($query, $limit = 100)
         return $query->orderBy('created_at', 'desc')->limit($limit);
     }
 
+    /**
+     * Scope to threats stored after the given id, oldest first
+     */
+    public function scopeSince($query, $id)
+    {
+        return $query->where('id', '>', $id)->orderBy('id');
+    }
+
     /**
      * Scope to get threats by type
      */
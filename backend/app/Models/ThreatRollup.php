@@ -0,0 +1,126 @@
+<?php
+
+namespace App\Models;
+
+use DateTimeInterface;
+use Illuminate\Database\Eloquent\Model;
+use Illuminate\Support\Facades\DB;
+
+class ThreatRollup extends Model
+{
+    public $timestamps = false;
+
+    protected $fillable = [
+        'dimension',
+        'minute',
+        'value',
+        'count',
+    ];
+
+    protected $casts = [
+        'count' => 'integer',
+    ];
+
+    /**
+     * Rows per upsert; 4 columns each stays under SQLite's 999 bound parameters
+     */
+    private const UPSERT_CHUNK = 200;
+
+    /**
+     * Risk band for a score; high and critical together are the dashboard's high-risk count (>= 70)
+     */
+    public static function riskBand(int $score): string
+    {
+        return match (true) {
+            $score >= 90 => 'critical',
+            $score >= 70 => 'high',
+            $score >= 40 => 'medium',
+            default => 'low',
+        };
+    }
+
+    /**
+     * Add newly stored threats (ThreatLog models or attribute arrays) to the
+     * per-minute and all-time counters. Call inside the transaction that
+     * inserted them.
+     */
+    public static function record(iterable $threats, DateTimeInterface $at): void
+    {
+        $minute = $at->format('Y-m-d H:i:00');
+        $counts = [];
+        foreach ($threats as $threat) {
+            foreach ([
+                'type' => $threat['attack_type'],
+                'ip' => $threat['ip_address'],
+                'risk' => self::riskBand($threat['risk_score']),
+            ] as $dimension => $value) {
+                $counts[$dimension][$value] = ($counts[$dimension][$value] ?? 0) + 1;
+            }
+        }
+
+        $rollups = [];
+        $totals = [];
+        foreach ($counts as $dimension => $values) {
+            foreach ($values as $value => $count) {
+                $rollups[] = ['dimension' => $dimension, 'minute' => $minute, 'value' => (string) $value, 'count' => $count];
+                $totals[] = ['dimension' => $dimension, 'value' => (string) $value, 'count' => $count];
+            }
+        }
+
+        self::increment('threat_rollups', $rollups, ['dimension', 'minute', 'value']);
+        self::increment('threat_totals', $totals, ['dimension', 'value']);
+    }
+
+    /**
+     * Upsert counters, adding to the stored count on conflict
+     */
+    private static function increment(string $table, array $rows, array $uniqueBy): void
+    {
+        $added = DB::getDriverName() === 'mysql' ? 'values(`count`)' : 'excluded.count';
+
+        foreach (array_chunk($rows, self::UPSERT_CHUNK) as $chunk) {
+            DB::table($table)->upsert($chunk, $uniqueBy, ['count' => DB::raw("{$table}.count + {$added}")]);
+        }
+    }
+
+    /**
+     * Recompute every counter from threat_logs (after a restore, or when
+     * rows were inserted without going through the API). Archived days add
+     * their type and risk counts from threat_archives; their source IPs
+     * are no longer counted.
+     */
+    public static function rebuild(): void
+    {
+        $minute = DB::getDriverName() === 'mysql'
+            ? "DATE_FORMAT(created_at, '%Y-%m-%d %H:%i:00')"
+            : "strftime('%Y-%m-%d %H:%M:00', created_at)";
+        $band = "CASE WHEN risk_score >= 90 THEN 'critical' WHEN risk_score >= 70 THEN 'high' "
+            . "WHEN risk_score >= 40 THEN 'medium' ELSE 'low' END";
+
+        DB::transaction(function () use ($minute, $band) {
+            DB::table('threat_rollups')->delete();
+            DB::table('threat_totals')->delete();
+
+            foreach (['type' => 'attack_type', 'ip' => 'ip_address', 'risk' => $band] as $dimension => $value) {
+                DB::statement(
+                    "INSERT INTO threat_rollups (dimension, minute, value, count) "
+                    . "SELECT '{$dimension}', {$minute}, {$value}, COUNT(*) FROM threat_logs GROUP BY 2, 3"
+                );
+                DB::statement(
+                    "INSERT INTO threat_totals (dimension, value, count) "
+                    . "SELECT dimension, value, SUM(count) FROM threat_rollups WHERE dimension = '{$dimension}' GROUP BY value"
+                );
+            }
+
+            $archived = [];
+            foreach (ThreatArchive::all(['by_type', 'by_risk']) as $archive) {
+                foreach (['type' => $archive->by_type, 'risk' => $archive->by_risk] as $dimension => $values) {
+                    foreach ($values as $value => $count) {
+                        $archived[] = ['dimension' => $dimension, 'value' => (string) $value, 'count' => $count];
+                    }
+                }
+            }
+            self::increment('threat_totals', $archived, ['dimension', 'value']);
+        });
+    }
+}
@@ -0,0 +1,60 @@
+<?php
+
+return [
+
+    /*
+    |--------------------------------------------------------------------------
+    | Threat Retention
+    |--------------------------------------------------------------------------
+    |
+    | Threats older than `retention_days` whole days are moved out of the
+    | threat_logs table by `php artisan threats:prune` (scheduled daily).
+    | Each day is written to a gzip'd JSONL file on the `archive_disk` and
+    | summarized in the threat_archives table; the all-time dashboard totals
+    | are kept in threat_totals and are not affected.
+    |
+    */
+
+    'retention_days' => (int) env('THREAT_RETENTION_DAYS', 7),
+
+    'archive_disk' => env('THREAT_ARCHIVE_DISK', 'local'),
+
+    'archive_path' => env('THREAT_ARCHIVE_PATH', 'threat-archive'),
+
+    'prune_chunk' => 2000,
+
+    /*
+    |--------------------------------------------------------------------------
+    | Cursor Settling
+    |--------------------------------------------------------------------------
+    |
+    | Ids are allocated when a row is inserted, not when its transaction
+    | commits, so with concurrent batch inserts a lower id can become visible
+    | after a higher one. Id cursors (the since_id feed, the broadcast ticker)
+    | do not move past a missing id while the row above it is younger than
+    | this; an older gap is a rolled-back insert and is skipped.
+    |
+    */
+
+    'cursor_grace_seconds' => 10,
+
+    /*
+    |--------------------------------------------------------------------------
+    | Broadcast Batching
+    |--------------------------------------------------------------------------
+    |
+    | With the default tick of 0, the store endpoints broadcast one
+    | threats.detected event per request. With a tick above zero they do not
+    | broadcast at all, and the `php artisan threats:broadcast` process, which
+    | must then be running, sends one event per tick with every threat stored
+    | since the last one. Each event carries counts for all of them but only
+    | the newest `broadcast_max_threats`, keeping frames under Reverb's 10 KB
+    | default.
+    |
+    */
+
+    'broadcast_tick_ms' => (int) env('THREAT_BROADCAST_TICK_MS', 0),
+
+    'broadcast_max_threats' => 30,
+
+];
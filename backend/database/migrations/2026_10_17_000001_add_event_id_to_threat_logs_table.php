@@ -0,0 +1,30 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        Schema::table('threat_logs', function (Blueprint $table) {
+            // Hunter-generated id, used to attach AI analysis that arrives after the threat
+            $table->string('event_id', 64)->nullable()->unique()->after('id');
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::table('threat_logs', function (Blueprint $table) {
+            $table->dropUnique(['event_id']);
+            $table->dropColumn('event_id');
+        });
+    }
+};
@@ -0,0 +1,45 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // Per-minute counters: dimension is type, ip or risk; value the attack type, source IP or risk band
+        Schema::create('threat_rollups', function (Blueprint $table) {
+            $table->id();
+            $table->string('dimension', 8);
+            $table->dateTime('minute');
+            $table->string('value');
+            $table->unsignedBigInteger('count');
+
+            $table->unique(['dimension', 'minute', 'value']);
+        });
+
+        // All-time counters for the same dimensions
+        Schema::create('threat_totals', function (Blueprint $table) {
+            $table->id();
+            $table->string('dimension', 8);
+            $table->string('value');
+            $table->unsignedBigInteger('count');
+
+            $table->unique(['dimension', 'value']);
+            $table->index(['dimension', 'count']); // Top source IPs
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('threat_totals');
+        Schema::dropIfExists('threat_rollups');
+    }
+};
@@ -0,0 +1,40 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // One row per archive file: where a day's threats went and what they were.
+        // A day has more than one file when threats for it arrive after it was archived.
+        Schema::create('threat_archives', function (Blueprint $table) {
+            $table->id();
+            $table->date('day')->index();
+            $table->string('path');
+            $table->unsignedBigInteger('first_id');
+            $table->unsignedBigInteger('last_id');
+            $table->unsignedBigInteger('count');
+            $table->unsignedBigInteger('bytes');
+            $table->unsignedInteger('unique_ips');
+            $table->unsignedTinyInteger('max_risk');
+            $table->json('by_type');
+            $table->json('by_risk');
+            $table->json('top_ips');
+            $table->timestamps();
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('threat_archives');
+    }
+};
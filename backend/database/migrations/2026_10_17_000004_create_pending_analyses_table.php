@@ -0,0 +1,32 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration
+{
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // AI analyses that arrived before their threat row; attached when the threat is stored
+        Schema::create('pending_analyses', function (Blueprint $table) {
+            $table->id();
+            $table->string('event_id', 64)->unique();
+            $table->text('ai_analysis');
+            $table->timestamps();
+
+            $table->index('created_at'); // Pruned with the retention period
+        });
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        Schema::dropIfExists('pending_analyses');
+    }
+};
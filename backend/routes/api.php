@@ -11,6 +11,11 @@
 
 // Threat logging endpoints
 Route::post('/threats', [ThreatController::class, 'store']);
+Route::post('/threats/batch', [ThreatController::class, 'storeBatch']);
+Route::post('/threats/analysis', [ThreatController::class, 'updateAnalysis']);
 Route::get('/threats/recent', [ThreatController::class, 'recent']);
+Route::get('/threats/feed', [ThreatController::class, 'feed']);
 Route::get('/threats/stats', [ThreatController::class, 'stats']);
 Route::get('/threats/map', [ThreatController::class, 'map']);
+Route::get('/threats/archives', [ThreatController::class, 'archives']);
+Route::get('/threats/{threat}', [ThreatController::class, 'show'])->whereNumber('threat');
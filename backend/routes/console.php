@@ -1,8 +1,119 @@
 <?php
 
+use App\Events\ThreatsAnalyzed;
+use App\Events\ThreatsDetected;
+use App\Models\PendingAnalysis;
+use App\Models\ThreatArchive;
+use App\Models\ThreatLog;
+use App\Models\ThreatRollup;
 use Illuminate\Foundation\Inspiring;
 use Illuminate\Support\Facades\Artisan;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schedule;
+use Illuminate\Support\Str;
 
 Artisan::command('inspire', function () {
     $this->comment(Inspiring::quote());
 })->purpose('Display an inspiring quote');
+
+Artisan::command('threats:rebuild-rollups', function () {
+    $started = microtime(true);
+    ThreatRollup::rebuild();
+    $this->info(sprintf('Rebuilt threat rollups in %.1fs', microtime(true) - $started));
+})->purpose('Recompute the stats counters from threat_logs');
+
+Artisan::command('threats:seed {count=100000} {--minutes=1440 : Spread created_at over this many past minutes}', function () {
+    $types = [
+        'port_scan' => 75, 'arp_spoof' => 95, 'sql_injection' => 85,
+        'xss_attempt' => 70, 'honeypot_trap' => 90, 'traffic_anomaly' => 65,
+    ];
+    $count = (int) $this->argument('count');
+    $minutes = max((int) $this->option('minutes'), 1);
+    $now = now();
+
+    $bar = $this->output->createProgressBar($count);
+    for ($done = 0; $done < $count; $done += 9000) {
+        // 100 multi-row inserts of 90 per transaction
+        DB::transaction(function () use ($done, $count, $types, $minutes, $now, $bar) {
+            foreach (array_chunk(range($done, min($done + 9000, $count) - 1), 90) as $chunk) {
+                $rows = [];
+                foreach ($chunk as $i) {
+                    $type = array_rand($types);
+                    $at = $now->copy()->subSeconds(random_int(0, $minutes * 60 - 1));
+                    $rows[] = [
+                        'event_id' => (string) Str::ulid(),
+                        'ip_address' => '203.0.' . random_int(0, 249) . '.' . random_int(1, 250),
+                        'geo_location' => 'Global Web',
+                        'attack_signature' => strtoupper($type) . '_DETECTED',
+                        'attack_type' => $type,
+                        'risk_score' => min($types[$type] + random_int(-10, 10), 100),
+                        'created_at' => $at,
+                        'updated_at' => $at,
+                    ];
+                }
+                DB::table('threat_logs')->insert($rows);
+                $bar->advance(count($rows));
+            }
+        });
+    }
+    $bar->finish();
+    $this->newLine();
+
+    ThreatRollup::rebuild();
+    $this->info("Seeded {$count} threats and rebuilt the rollups");
+})->purpose('Insert synthetic threats for load testing the stats endpoint');
+
+Artisan::command('threats:prune {--days= : Whole days to keep in threat_logs (default THREAT_RETENTION_DAYS)}', function () {
+    $days = (int) ($this->option('days') ?? config('threats.retention_days'));
+    $cutoff = now()->startOfDay()->subDays($days);
+
+    $archives = ThreatArchive::pruneBefore($cutoff);
+    $orphans = PendingAnalysis::where('created_at', '<', $cutoff)->delete();  // Their threat never arrived
+
+    $this->table(['day', 'threats', 'KB', 'file'], array_map(fn ($archive) => [
+        $archive->day->toDateString(), $archive->count, round($archive->bytes / 1024), $archive->path,
+    ], $archives));
+    $this->info(sprintf('Archived %d threats stored before %s', collect($archives)->sum('count'), $cutoff));
+    $this->info("Dropped {$orphans} held AI analyses without a threat");
+})->purpose('Move threats older than the retention period to daily gzip JSONL archives');
+
+Artisan::command('threats:broadcast', function () {
+    if (! config('threats.broadcast_tick_ms')) {
+        $this->error('THREAT_BROADCAST_TICK_MS is 0: the store endpoints broadcast themselves. Set a tick to use the ticker.');
+        return 1;
+    }
+    $tick = max(config('threats.broadcast_tick_ms'), 50);
+    $cursor = (int) ThreatLog::max('id');  // Live from now; history is loaded from the feed
+    $sent = [];                            // Ids above the cursor already broadcast (past a commit gap)
+    $this->info("Broadcasting new threats every {$tick}ms from id {$cursor}");
+
+    while (true) {
+        $started = microtime(true);
+
+        // Everything stored since the last tick goes out as one threats.detected event. The cursor
+        // waits at ids that may still commit, so rows past them are read again and skipped here.
+        $threats = ThreatLog::since($cursor)->limit(5000)->get();
+        $fresh = $threats->reject(fn ($threat) => isset($sent[$threat->id]))->values();
+        $cursor = ThreatLog::settledCursor($threats, $cursor);
+        foreach ($fresh as $threat) {
+            $sent[$threat->id] = true;
+        }
+        $sent = array_filter($sent, fn ($id) => $id > $cursor, ARRAY_FILTER_USE_KEY);
+
+        if ($fresh->isNotEmpty()) {
+            broadcast(new ThreatsDetected($fresh, immediate: true, cursor: $cursor));
+        }
+
+        usleep((int) max($tick * 1000 - (microtime(true) - $started) * 1e6, 0));
+    }
+})->purpose('Broadcast stored threats in one event per tick (THREAT_BROADCAST_TICK_MS)');
+
+Schedule::command('threats:prune')->dailyAt('03:15')->withoutOverlapping();
+
+// Held analyses whose threat committed alongside them; see PendingAnalysis::sweep()
+Schedule::call(function () {
+    $threats = PendingAnalysis::sweep();
+    if ($threats->isNotEmpty()) {
+        broadcast(new ThreatsAnalyzed($threats));
+    }
+})->name('threats:claim-analyses')->everyMinute()->withoutOverlapping();
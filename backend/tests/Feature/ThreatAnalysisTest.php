@@ -0,0 +1,80 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Events\ThreatsAnalyzed;
+use App\Models\PendingAnalysis;
+use App\Models\ThreatLog;
+use Illuminate\Foundation\Testing\RefreshDatabase;
+use Illuminate\Support\Facades\Event;
+use Tests\TestCase;
+
+class ThreatAnalysisTest extends TestCase
+{
+    use RefreshDatabase;
+
+    private function threat(string $eventId): array
+    {
+        return [
+            'event_id' => $eventId,
+            'ip_address' => '203.0.113.7',
+            'attack_signature' => 'PORT_SCAN_DETECTED',
+            'attack_type' => 'port_scan',
+            'risk_score' => 75,
+            'ai_analysis' => 'Analysis pending...',
+        ];
+    }
+
+    public function test_analysis_that_arrives_first_is_attached_when_the_threat_is_stored(): void
+    {
+        $this->postJson('/api/threats/analysis', [
+            'threats' => [['event_id' => 'event-1', 'ai_analysis' => 'Port scan from a known scanner.']],
+        ])->assertOk()->assertJsonPath('updated', 0)->assertJsonPath('pending', ['event-1']);
+
+        $this->postJson('/api/threats/batch', ['threats' => [$this->threat('event-1')]])->assertCreated();
+
+        $this->assertSame('Port scan from a known scanner.', ThreatLog::where('event_id', 'event-1')->value('ai_analysis'));
+        $this->assertSame(0, PendingAnalysis::count());
+    }
+
+    public function test_analysis_for_a_single_stored_threat_is_attached(): void
+    {
+        $this->postJson('/api/threats/analysis', [
+            'threats' => [['event_id' => 'event-1', 'ai_analysis' => 'Port scan from a known scanner.']],
+        ])->assertOk();
+
+        $this->postJson('/api/threats', $this->threat('event-1'))->assertCreated();
+
+        $this->assertSame('Port scan from a known scanner.', ThreatLog::where('event_id', 'event-1')->value('ai_analysis'));
+        $this->assertSame(0, PendingAnalysis::count());
+    }
+
+    public function test_stored_threats_are_updated_and_broadcast_once(): void
+    {
+        Event::fake([ThreatsAnalyzed::class]);
+        $this->postJson('/api/threats/batch', [
+            'threats' => [$this->threat('event-1'), $this->threat('event-2')],
+        ])->assertCreated();
+
+        $this->postJson('/api/threats/analysis', [
+            'threats' => [
+                ['event_id' => 'event-1', 'ai_analysis' => 'First.'],
+                ['event_id' => 'event-2', 'ai_analysis' => 'Second.'],
+                ['event_id' => 'event-3', 'ai_analysis' => 'Third.'],
+            ],
+        ])->assertOk()->assertJsonPath('updated', 2)->assertJsonPath('pending', ['event-3']);
+
+        Event::assertDispatchedTimes(ThreatsAnalyzed::class, 1);
+        $this->assertSame('Second.', ThreatLog::where('event_id', 'event-2')->value('ai_analysis'));
+    }
+
+    public function test_sweep_claims_analyses_whose_threat_was_stored_alongside(): void
+    {
+        PendingAnalysis::hold(collect(['event-1' => 'First.']));
+        ThreatLog::create($this->threat('event-1'));  // Stored without seeing the held analysis
+
+        $this->assertSame(['event-1'], PendingAnalysis::sweep()->pluck('event_id')->all());
+        $this->assertSame('First.', ThreatLog::where('event_id', 'event-1')->value('ai_analysis'));
+        $this->assertSame(0, PendingAnalysis::count());
+    }
+}
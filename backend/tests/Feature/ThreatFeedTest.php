@@ -0,0 +1,65 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Models\ThreatLog;
+use Illuminate\Foundation\Testing\RefreshDatabase;
+use Tests\TestCase;
+
+class ThreatFeedTest extends TestCase
+{
+    use RefreshDatabase;
+
+    /**
+     * Store a threat under a fixed id, as a concurrent batch insert would have allocated it
+     */
+    private function storeThreat(int $id, $createdAt = null): void
+    {
+        $createdAt ??= now();
+        ThreatLog::insert([
+            'id' => $id,
+            'event_id' => "event-{$id}",
+            'ip_address' => '203.0.113.7',
+            'geo_location' => 'Global Web',
+            'attack_signature' => 'PORT_SCAN_DETECTED',
+            'attack_type' => 'port_scan',
+            'risk_score' => 75,
+            'created_at' => $createdAt,
+            'updated_at' => $createdAt,
+        ]);
+    }
+
+    public function test_cursor_waits_for_a_lower_id_that_commits_late(): void
+    {
+        $this->storeThreat(1);
+        $this->storeThreat(2);
+        $this->storeThreat(4);  // id 3 is allocated but its transaction has not committed
+
+        $first = $this->getJson('/api/threats/feed?since_id=0');
+        $first->assertOk()->assertJsonPath('cursor', 2)->assertJsonPath('last_id', 4);
+        $this->assertSame([1, 2, 4], array_column($first->json('threats'), 'id'));
+
+        $this->storeThreat(3);  // Commits after 4 was read
+
+        $second = $this->getJson('/api/threats/feed?since_id=' . $first->json('cursor'));
+        $second->assertOk()->assertJsonPath('cursor', 4);
+        $this->assertSame([3, 4], array_column($second->json('threats'), 'id'));
+    }
+
+    public function test_cursor_skips_a_gap_older_than_the_grace_period(): void
+    {
+        $old = now()->subSeconds(config('threats.cursor_grace_seconds') + 5);
+        $this->storeThreat(1, $old);
+        $this->storeThreat(3, $old);  // id 2 was rolled back
+
+        $this->getJson('/api/threats/feed?since_id=0')->assertOk()->assertJsonPath('cursor', 3);
+    }
+
+    public function test_latest_page_cursor_stops_at_a_recent_gap(): void
+    {
+        $this->storeThreat(5);
+        $this->storeThreat(7);
+
+        $this->getJson('/api/threats/feed?limit=50')->assertOk()->assertJsonPath('cursor', 5);
+    }
+}
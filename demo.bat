@@ -13,8 +13,8 @@ echo [2/4] Starting WebSocket Server (Reverb)...
 start "Sentinel-Eye Reverb" /D "backend" php artisan reverb:start
 timeout /t 5 >nul
 
-echo [3/4] Starting Threat Simulation (Mock Attacks)...
-start "Sentinel-Eye Simulation" python simulate_attacks.py
+echo [3/4] Starting Threat Simulation (Synthetic Attack Traffic)...
+start "Sentinel-Eye Simulation" /D "hunter" python benchmarks\bench_e2e.py --live --url http://localhost:8000/api --duration 86400 --syn-scan 10 --arp-spoof 0.5 --http-attack 0.5 --honeypot 0.2 --benign 20 --progress 10
 
 echo [4/4] Launching War Room Dashboard...
 echo Opening frontend/index.html in your default browser...
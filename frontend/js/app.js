@@ -7,6 +7,9 @@ import { LiveFeed } from './components/liveFeed.js';
 import { ThreatMap } from './components/threatMap.js';
 import { VelocityChart } from './components/velocityChart.js';
 
+// Ids remembered for dedupe: well past what a reconnect catch-up can overlap
+const COUNTED_IDS = 20000;
+
 class SentinelApp {
     constructor() {
         this.threats = [];
@@ -25,6 +28,12 @@ class SentinelApp {
         this.map = new ThreatMap('map');
         this.velocityChart = new VelocityChart('velocityChart');
         this.echo = null;
+        this.cursor = null;       // Threat id everything up to which has been seen; the feed's since_id
+        this.pollTimer = null;    // Fallback polling, only while the websocket is down
+        this.pending = null;      // Threats and counts waiting for the next animation frame
+        this.counted = new Map(); // Threat id -> { type, highRisk } already in the totals, newest COUNTED_IDS
+        this.recoverTimer = null; // Siege auto-recovery
+        this.frameTimes = [];     // Render pass durations (ms), see renderStats()
 
         this.init();
         this.setupEventListeners();
@@ -32,9 +41,8 @@ class SentinelApp {
 
     async init() {
         console.log('🛡️ Sentinel-Eye Pro Initializing...');
-        await this.loadInitialThreats();
+        await this.loadThreats();
         this.connectWebSocket();
-        setInterval(() => this.loadInitialThreats(), 5000);
         setInterval(() => this.fetchStats(), 15000);
     }
 
@@ -42,35 +50,42 @@ class SentinelApp {
         document.getElementById('downloadReport').onclick = () => this.generateReport();
     }
 
-    async loadInitialThreats() {
+    async loadThreats() {
+        // Slim rows after the cursor (the latest 50 on first load); metadata is fetched when a case file opens
         try {
             const host = window.location.hostname || 'localhost';
-            const url = `http://${host}:8000/api/threats/recent?limit=50`;
-            console.log('🔍 Fetching threats from:', url);
-            const response = await fetch(url);
-            const data = await response.json();
-            console.log('📦 API Response:', data);
-
-            if (data.success && data.threats) {
-                console.log(`✅ Found ${data.threats.length} threats`);
-                const newThreats = data.threats.filter(newT =>
-                    !this.threats.some(oldT => oldT.id === newT.id)
-                );
-
-                if (newThreats.length > 0) {
-                    console.log(`➕ Adding ${newThreats.length} new threats to UI`);
-                    newThreats.reverse().forEach(threat => {
-                        console.log('Adding threat:', threat);
-                        this.processThreat(threat, true);
-                    });
-                    this.updateStatsDisplay();
+            let since = this.cursor;
+            let hasMore = true;
+            while (hasMore) {
+                const query = since === null ? 'limit=50' : `since_id=${since}&limit=100`;
+                const response = await fetch(`http://${host}:8000/api/threats/feed?${query}`);
+                const data = await response.json();
+                if (!data.success) return;
+
+                if (data.threats.length > 0) {
+                    console.log(`➕ Adding ${data.threats.length} new threats to UI`);
+                    this.enqueueThreats(data.threats, null, false);
                 }
+                // The server's cursor waits at ids that may still commit; rows past it come again and are skipped
+                this.cursor = Math.max(this.cursor ?? 0, data.cursor);
+                since = data.last_id;
+                hasMore = data.has_more;
             }
         } catch (error) {
             console.error('❌ Error loading threats:', error);
         }
     }
 
+    setPolling(active) {
+        if (active && !this.pollTimer) {
+            console.log('⏱️ WebSocket down, polling the feed every 5s');
+            this.pollTimer = setInterval(() => this.loadThreats(), 5000);
+        } else if (!active && this.pollTimer) {
+            clearInterval(this.pollTimer);
+            this.pollTimer = null;
+        }
+    }
+
     connectWebSocket() {
         try {
             window.Pusher = Pusher;
@@ -88,49 +103,138 @@ class SentinelApp {
             this.echo.channel('threats')
                 .listen('.threat.detected', (event) => {
                     console.log('🚨 WebSocket threat received:', event);
-                    this.processThreat(event, true);
-                    this.playAlertSound();
+                    this.enqueueThreats([event]);
+                })
+                .listen('.threats.detected', (event) => {
+                    // One event per broadcast tick: counts for every threat, the newest threats oldest first
+                    console.log(`🚨 WebSocket batch received: ${event.count} threats`);
+                    this.enqueueThreats(event.threats, event);
+                })
+                .listen('.threats.analyzed', (event) => {
+                    // AI explanations that finished after the threats were shown
+                    this.applyAnalysis(event);
                 });
 
-            console.log('✅ WebSocket connected successfully');
-            this.updateConnectionStatus(true);
+            // Poll only while the socket is down; on (re)connect, catch up on what was missed once
+            this.echo.connector.pusher.connection.bind('state_change', ({ current }) => {
+                const connected = current === 'connected';
+                this.updateConnectionStatus(connected);
+                this.setPolling(!connected);
+                if (connected) this.loadThreats();
+            });
         } catch (error) {
             console.error('❌ WebSocket connection failed:', error);
             this.updateConnectionStatus(false);
+            this.setPolling(true);
             setTimeout(() => this.connectWebSocket(), 5000);
         }
     }
 
-    processThreat(threat, animate = true) {
-        if (this.threats.some(t => t.id === threat.id)) return;
-
-        this.threats.unshift(threat);
-        this.stats.total++;
+    enqueueThreats(threats, summary = null, advance = true) {
+        // Collect everything that arrives before the next frame and render it in one pass
+        const seen = t => this.threats.some(old => old.id === t.id) || this.pending?.threats.some(p => p.id === t.id);
+        const fresh = threats.filter(t => !seen(t));
+        if (!this.pending) {
+            this.pending = { threats: [], total: 0, byType: {}, highRisk: 0, lastId: 0 };
+            requestAnimationFrame(() => this.renderPending());
+        }
 
-        const attackType = threat.attack_type || 'unknown';
-        if (this.stats[attackType] !== undefined) {
-            this.stats[attackType]++;
+        const batch = this.pending;
+        batch.threats.push(...fresh);
+        // Feed rows leave the cursor to the server; pushed threats move it on
+        if (advance) batch.lastId = Math.max(batch.lastId, summary?.cursor ?? summary?.last_id ?? 0,
+            ...(summary ? [] : fresh.map(t => t.id)));
+        // Totals only take ids not counted yet: a reconnect's feed catch-up and the live
+        // batches overlap, and a batch's counts cover more threats than it lists
+        if (summary) {
+            const listed = new Map(threats.map(t => [t.id, t]));
+            let total = summary.count;
+            let highRisk = summary.high_risk;
+            const byType = { ...summary.by_type };
+            (summary.ids ?? []).forEach(([first, last]) => {
+                for (let id = first; id <= last; id++) {
+                    const known = this.counted.get(id);
+                    if (known === undefined) {
+                        const t = listed.get(id);
+                        this.markCounted(id, t ? { type: t.attack_type, highRisk: t.risk_score >= 80 } : null);
+                        continue;
+                    }
+                    total--;
+                    if (known) {
+                        byType[known.type]--;
+                        if (known.highRisk) highRisk--;
+                    }
+                }
+            });
+            batch.total += total;
+            batch.highRisk += highRisk;
+            Object.entries(byType).forEach(([type, n]) => {
+                batch.byType[type] = (batch.byType[type] || 0) + n;
+            });
+        } else {
+            threats.filter(t => !this.counted.has(t.id)).forEach(t => {
+                const highRisk = t.risk_score >= 80;
+                this.markCounted(t.id, { type: t.attack_type, highRisk });
+                batch.total++;
+                batch.byType[t.attack_type] = (batch.byType[t.attack_type] || 0) + 1;
+                if (highRisk) batch.highRisk++;
+            });
         }
+    }
+
+    markCounted(id, info) {
+        // info is null for ids a batch counted without listing them
+        this.counted.set(id, info);
+        if (this.counted.size > COUNTED_IDS) this.counted.delete(this.counted.keys().next().value);
+    }
 
-        if (threat.risk_score >= 80) {
-            this.stats.high_risk++;
+    renderPending() {
+        const started = performance.now();
+        const batch = this.pending;
+        const initialLoad = this.stats.total === 0;
+        this.pending = null;
+
+        this.cursor = Math.max(this.cursor ?? 0, batch.lastId);
+        this.threats = [...batch.threats].reverse().concat(this.threats).slice(0, 100);
+        this.stats.total += batch.total;
+        this.stats.high_risk += batch.highRisk;
+        Object.entries(batch.byType).forEach(([type, n]) => {
+            if (this.stats[type] !== undefined) this.stats[type] += n;
+        });
+
+        if (batch.highRisk > 0) {
             this.setSiegeState(true);
-        } else {
-            // Auto-recover after 10s if no high risk threats
-            setTimeout(() => {
-                if (!this.threats.slice(0, 5).some(t => t.risk_score >= 80)) {
-                    this.setSiegeState(false);
-                }
-            }, 10000);
         }
+        // Auto-recover 10s after the last batch if no recent high risk threats
+        clearTimeout(this.recoverTimer);
+        this.recoverTimer = setTimeout(() => {
+            if (!this.threats.slice(0, 5).some(t => t.risk_score >= 80)) {
+                this.setSiegeState(false);
+            }
+        }, 10000);
 
-        this.liveFeed.addThreat(threat, animate);
-        this.map.addThreat(threat);
-        this.velocityChart.addThreat(threat);
+        this.liveFeed.addThreats(batch.threats);
+        this.map.addThreats(batch.threats);
+        this.velocityChart.addCount(batch.total);
         this.updateStatsDisplay();
+        if (batch.total > 0 && !initialLoad) this.playAlertSound();
+
+        this.frameTimes.push(performance.now() - started);
+        if (this.frameTimes.length > 1000) this.frameTimes.shift();
+    }
+
+    renderStats() {
+        // Render pass timings for load tests: run in the console after a burst
+        const times = [...this.frameTimes].sort((a, b) => a - b);
+        const at = q => times[Math.min(times.length - 1, Math.floor(times.length * q))] || 0;
+        return { passes: times.length, p50_ms: at(0.5), p95_ms: at(0.95), max_ms: at(1) };
+    }
 
-        if (this.threats.length > 100) {
-            this.threats = this.threats.slice(0, 100);
+    applyAnalysis(update) {
+        // Drop case files already loaded for these threats, so the next open fetches the new text
+        const ids = new Set(update.ids);
+        for (const threat of this.threats) {
+            if (ids.has(threat.id)) delete threat.metadata;
         }
     }
 
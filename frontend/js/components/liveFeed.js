@@ -9,21 +9,29 @@ export class LiveFeed {
         this.maxItems = 50;
     }
 
-    addThreat(threat, animate = true) {
-        const item = this.createThreatElement(threat);
+    addThreats(threats, animate = true) {
+        // Oldest first in, newest on top; one DOM insert and one animation frame for the whole batch
+        if (threats.length === 0) return;
+        const items = threats.slice(-this.maxItems).reverse().map(threat => this.createThreatElement(threat));
         const placeholder = this.container.querySelector('.text-center');
         if (placeholder) placeholder.remove();
 
-        this.container.insertBefore(item, this.container.firstChild);
+        const fragment = document.createDocumentFragment();
+        items.forEach(item => {
+            if (animate) {
+                item.style.opacity = '0';
+                item.style.transform = 'translateY(-20px)';
+            }
+            fragment.appendChild(item);
+        });
+        this.container.insertBefore(fragment, this.container.firstChild);
 
         if (animate) {
-            item.style.opacity = '0';
-            item.style.transform = 'translateY(-20px)';
-            setTimeout(() => {
+            requestAnimationFrame(() => items.forEach(item => {
                 item.style.transition = 'all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275)';
                 item.style.opacity = '1';
                 item.style.transform = 'translateY(0)';
-            }, 10);
+            }));
         }
 
         while (this.container.children.length > this.maxItems) {
@@ -36,10 +44,7 @@ export class LiveFeed {
         const score = threat.risk_score || 0;
         const riskClass = score >= 70 ? 'high-risk' : (score >= 40 ? 'med-risk' : 'low-risk');
 
-        let meta = {};
-        try {
-            meta = typeof threat.metadata === 'string' ? JSON.parse(threat.metadata) : (threat.metadata || {});
-        } catch (e) { meta = {}; }
+        const meta = this.parseMetadata(threat);
 
         div.className = `threat-item p-4 mb-3 border-l-4 ${riskClass} bg-slate-900/80 backdrop-blur-sm relative group overflow-hidden`;
 
@@ -69,10 +74,36 @@ export class LiveFeed {
             </div>
         `;
 
-        div.onclick = () => this.showForensics(threat, meta);
+        div.onclick = () => this.openCase(threat);
         return div;
     }
 
+    parseMetadata(threat) {
+        // Feed rows carry only the card's fields; websocket threats carry the full metadata
+        if (threat.metadata === undefined) {
+            return { ips_action: threat.ips_action, victim_name: threat.victim_name };
+        }
+        try {
+            return typeof threat.metadata === 'string' ? JSON.parse(threat.metadata) : (threat.metadata || {});
+        } catch (e) {
+            return {};
+        }
+    }
+
+    async openCase(threat) {
+        // Fetch the forensic metadata and AI analysis the first time a slim feed row is opened
+        if (threat.metadata === undefined) {
+            try {
+                const host = window.location.hostname || 'localhost';
+                const data = await (await fetch(`http://${host}:8000/api/threats/${threat.id}`)).json();
+                if (data.success) Object.assign(threat, data.threat);
+            } catch (e) {
+                console.error('❌ Error loading case file:', e);
+            }
+        }
+        this.showForensics(threat, this.parseMetadata(threat));
+    }
+
     showForensics(threat, meta) {
         const modal = document.createElement('div');
         modal.className = "fixed inset-0 bg-slate-950/90 flex items-center justify-center z-[101] p-6 backdrop-blur-xl animate-in fade-in duration-300";
@@ -103,7 +134,7 @@ export class LiveFeed {
                     <div class="w-1/2 p-6 border-r border-green-500/10 flex flex-col">
                         <div class="text-[10px] font-bold text-white/30 mb-3 tracking-widest uppercase">Byte-Level Evidence (Hex Dump)</div>
                         <div class="flex-1 bg-black p-4 font-mono text-[11px] leading-relaxed text-green-500/60 overflow-y-auto custom-scrollbar border border-white/5 shadow-inner">
-                            ${meta.raw_payload || 'NO RAW DATA CAPTURED.'}
+                            ${this.hexDump(meta) || 'NO RAW DATA CAPTURED.'}
                         </div>
                         <div class="mt-4 p-4 bg-slate-800/50 border-l-2 border-slate-500">
                             <div class="text-[9px] opacity-50 mb-1">METADATA</div>
@@ -147,6 +178,16 @@ export class LiveFeed {
         document.body.appendChild(modal);
     }
 
+    hexDump(meta) {
+        // The hunter may ship forensic bytes as base64; show them as the usual hex dump
+        if (meta.raw_payload_encoding !== 'base64' || !meta.raw_payload) return meta.raw_payload;
+        try {
+            return Array.from(atob(meta.raw_payload), c => c.charCodeAt(0).toString(16).padStart(2, '0')).join(' ');
+        } catch (e) {
+            return meta.raw_payload;
+        }
+    }
+
     highlightKeywords(text) {
         if (!text) return text;
         const keywords = ['SELECT', 'FROM', 'UNION', 'WHERE', 'script', 'fetch', 'cookie'];
@@ -3,6 +3,40 @@
  * Features: Laser Attack Beams targeting Pakistan, Origin-Destination Ripples
  */
 
+// Country centroids by ISO 3166-1 alpha-2 code
+const COUNTRY_COORDS = {
+    US: [37.0902, -95.7129],
+    CA: [56.1304, -106.3468],
+    BR: [-14.235, -51.9253],
+    GB: [55.3781, -3.4360],
+    DE: [51.1657, 10.4515],
+    FR: [46.2276, 2.2137],
+    NL: [52.1326, 5.2913],
+    UA: [48.3794, 31.1656],
+    RU: [61.5240, 105.3188],
+    TR: [38.9637, 35.2433],
+    IR: [32.4279, 53.6880],
+    IN: [20.5937, 78.9629],
+    CN: [35.8617, 104.1954],
+    HK: [22.3193, 114.1694],
+    KR: [35.9078, 127.7669],
+    JP: [36.2048, 138.2529],
+    VN: [14.0583, 108.2772],
+    SG: [1.3521, 103.8198],
+    ID: [-0.7893, 113.9213],
+    AU: [-25.2744, 133.7751]
+};
+
+// Country names (and the old short labels) to codes, for rows without country_code
+const COUNTRY_CODES = {
+    'United States': 'US', 'USA': 'US', 'Canada': 'CA', 'Brazil': 'BR',
+    'United Kingdom': 'GB', 'UK': 'GB', 'Germany': 'DE', 'France': 'FR',
+    'Netherlands': 'NL', 'Ukraine': 'UA', 'Russia': 'RU', 'Russian Federation': 'RU',
+    'Turkey': 'TR', 'Iran': 'IR', 'India': 'IN', 'China': 'CN', 'Hong Kong': 'HK',
+    'South Korea': 'KR', 'Korea': 'KR', 'Japan': 'JP', 'Vietnam': 'VN', 'Viet Nam': 'VN',
+    'Singapore': 'SG', 'Indonesia': 'ID', 'Australia': 'AU'
+};
+
 export class ThreatMap {
     constructor(containerId) {
         this.map = L.map(containerId, {
@@ -20,6 +54,9 @@ export class ThreatMap {
 
         // Target Location: Pakistan
         this.targetCoords = [30.3753, 69.3451];
+        this.maxBeams = 12;       // Beams started per batch; the rest of a burst only counts
+        this.animations = [];     // Live beams, pulses and ripples, all advanced by one frame loop
+        this.animating = false;
         this.initTargetPulse();
     }
 
@@ -38,27 +75,29 @@ export class ThreatMap {
         L.marker(this.targetCoords, { icon: targetIcon, zIndexOffset: 1000 }).addTo(this.map);
     }
 
-    addThreat(threat) {
-        const coords = this.getRandomCoordsForLocation(threat.geo_location);
-
-        // 1. Draw Origin Pulse (Where the attack started)
-        const pulse = L.divIcon({
-            className: 'threat-pulse',
-            html: `<div class="w-4 h-4 bg-red-600 rounded-full animate-ping shadow-[0_0_10px_#ef4444]"></div>`,
-            iconSize: [16, 16]
+    addThreats(threats) {
+        // Highest risk first, capped: a burst of 1,000 alerts draws a dozen beams, not a thousand
+        const shown = [...threats].sort((a, b) => b.risk_score - a.risk_score).slice(0, this.maxBeams);
+        const now = performance.now();
+        shown.forEach(threat => {
+            const coords = this.getRandomCoordsForLocation(threat.country_code, threat.geo_location);
+
+            // 1. Draw Origin Pulse (Where the attack started)
+            const pulse = L.divIcon({
+                className: 'threat-pulse',
+                html: `<div class="w-4 h-4 bg-red-600 rounded-full animate-ping shadow-[0_0_10px_#ef4444]"></div>`,
+                iconSize: [16, 16]
+            });
+            const originMarker = L.marker(coords, { icon: pulse }).addTo(this.markers);
+            this.animations.push({ layer: originMarker, until: now + 10000 });
+
+            // 2. Draw Attack Laser Beam (Origin -> Pakistan)
+            this.drawLaserBeam(coords, this.targetCoords, threat.risk_score, now);
         });
-        const originMarker = L.marker(coords, { icon: pulse }).addTo(this.markers);
-
-        // 2. Draw Attack Laser Beam (Origin -> Pakistan)
-        this.drawLaserBeam(coords, this.targetCoords, threat.risk_score);
-
-        // Auto-cleanup markers to avoid lag
-        setTimeout(() => {
-            this.map.removeLayer(originMarker);
-        }, 10000);
+        this.animate();
     }
 
-    drawLaserBeam(start, end, risk) {
+    drawLaserBeam(start, end, risk, now) {
         const color = risk >= 80 ? '#FF0000' : '#FFD700'; // Red for high risk, Gold for medium
         const weight = risk >= 80 ? 3 : 1;
 
@@ -72,55 +111,61 @@ export class ThreatMap {
             className: 'laser-beam'
         }).addTo(this.beams);
 
-        // Animation logic: Appear, pulse, disappear
-        let opacity = 0;
-        const fadeIn = setInterval(() => {
-            opacity += 0.1;
-            laser.setStyle({ opacity: opacity });
-            if (opacity >= 0.8) {
-                clearInterval(fadeIn);
-                // Trigger Target Ripple when beam 'reaches'
-                this.triggerTargetRipple(risk >= 80);
-
-                setTimeout(() => {
-                    const fadeOut = setInterval(() => {
-                        opacity -= 0.1;
-                        laser.setStyle({ opacity: opacity });
-                        if (opacity <= 0) {
-                            clearInterval(fadeOut);
-                            this.map.removeLayer(laser);
-                        }
-                    }, 50);
-                }, 1000);
+        // Appear over 240ms, hold 1s, fade over 400ms; the ripple fires when the beam 'reaches'
+        this.animations.push({ layer: laser, beam: true, risk, start: now, until: now + 1640, rippled: false });
+    }
+
+    animate() {
+        // One requestAnimationFrame loop for every beam on the map instead of a setInterval per beam
+        if (this.animating) return;
+        this.animating = true;
+
+        const step = (now) => {
+            const ripples = [];
+            this.animations = this.animations.filter(anim => {
+                if (now >= anim.until) {
+                    this.map.removeLayer(anim.layer);
+                    return false;
+                }
+                if (anim.beam) {
+                    const elapsed = now - anim.start;
+                    const opacity = elapsed < 240 ? elapsed / 300 : Math.min(0.8, (anim.until - now) / 500);
+                    anim.layer.setStyle({ opacity });
+                    if (elapsed >= 240 && !anim.rippled) {
+                        anim.rippled = true;
+                        ripples.push(this.triggerTargetRipple(anim.risk >= 80, now));
+                    }
+                }
+                return true;
+            }).concat(ripples);
+
+            if (this.animations.length > 0) {
+                requestAnimationFrame(step);
+            } else {
+                this.animating = false;
             }
-        }, 30);
+        };
+        requestAnimationFrame(step);
     }
 
-    triggerTargetRipple(isHighRisk) {
+    triggerTargetRipple(isHighRisk, now) {
         const ripple = L.divIcon({
             className: 'ripple',
             html: `<div class="w-12 h-12 border-2 ${isHighRisk ? 'border-red-600' : 'border-yellow-500'} rounded-full animate-ping"></div>`,
             iconSize: [48, 48]
         });
         const rippleMarker = L.marker(this.targetCoords, { icon: ripple }).addTo(this.map);
-        setTimeout(() => this.map.removeLayer(rippleMarker), 2000);
+        return { layer: rippleMarker, until: now + 2000 };
     }
 
-    getRandomCoordsForLocation(location) {
-        // Location-based coordinate mapping
-        const locations = {
-            'Global Web': [Math.random() * 120 - 60, Math.random() * 360 - 180],
-            'USA': [37.0902, -95.7129],
-            'Russia': [61.5240, 105.3188],
-            'China': [35.8617, 104.1954],
-            'Germany': [51.1657, 10.4515],
-            'UK': [55.3781, -3.4360],
-            'Brazil': [-14.235, -51.9253],
-            'Australia': [-25.2744, 133.7751]
-        };
-
-        // Pick specific coords or random if location is unknown
-        const base = locations[location] || [Math.random() * 140 - 70, Math.random() * 360 - 180];
+    getRandomCoordsForLocation(countryCode, location) {
+        // Rows resolved by the Hunter's GeoIP database carry an ISO country code; older
+        // rows only have the country name, possibly after a city ("Los Angeles, USA")
+        const name = (location || '').split(',').pop().trim();
+        const code = countryCode || COUNTRY_CODES[name];
+        const base = name === 'Global Web'
+            ? [Math.random() * 120 - 60, Math.random() * 360 - 180]
+            : COUNTRY_COORDS[code] || [Math.random() * 140 - 70, Math.random() * 360 - 180];
         return [base[0] + (Math.random() - 0.5) * 5, base[1] + (Math.random() - 0.5) * 5];
     }
 }
@@ -83,18 +83,19 @@ export class VelocityChart {
     }
 
     /**
-     * Add new threat to chart
+     * Add a batch of new threats to the current minute, one chart update per batch
      */
-    addThreat(threat) {
+    addCount(count) {
+        if (count === 0) return;
         const currentMinute = this.getCurrentMinute();
 
         // Find if we already have a data point for this minute
         let dataPoint = this.dataPoints.find(dp => dp.time === currentMinute);
 
         if (dataPoint) {
-            dataPoint.count++;
+            dataPoint.count += count;
         } else {
-            dataPoint = { time: currentMinute, count: 1 };
+            dataPoint = { time: currentMinute, count: count };
             this.dataPoints.push(dataPoint);
         }
 
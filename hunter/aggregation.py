@@ -0,0 +1,146 @@
+"""
+Sentinel-Eye Alert Aggregation
+Collapses repeated threats from one source into a single windowed record
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+import config
+
+logger = logging.getLogger('ThreatAggregator')
+
+
+class ThreatGroup:
+    """Threats sharing (ip_address, attack_type, attack_signature) within one window."""
+
+    __slots__ = ('threat', 'count', 'opened', 'first_seen', 'last_seen', 'samples')
+
+    def __init__(self, threat, now, wall):
+        self.threat = threat
+        self.count = 1
+        self.opened = now
+        self.first_seen = wall
+        self.last_seen = wall
+        self.samples = []
+
+
+class ThreatAggregator:
+    """
+    Sits between detection and threat_queue.
+
+    The first threat for a key opens a group; repeats within
+    AGGREGATION_WINDOW seconds only bump its counters and keep up to
+    AGGREGATION_SAMPLES payloads that differ from the first one. When the
+    window closes, the group is handed to sink() as one threat: the first
+    threat's fields, the highest risk score seen, and occurrences /
+    first_seen / last_seen / sample_payloads in its metadata. At most AGGREGATION_MAX_GROUPS groups
+    are open; opening another flushes the oldest early.
+    """
+
+    def __init__(self, sink, window=None, max_groups=None, max_samples=None):
+        self.sink = sink
+        self.window = config.AGGREGATION_WINDOW if window is None else window
+        self.max_groups = max_groups or config.AGGREGATION_MAX_GROUPS
+        self.max_samples = config.AGGREGATION_SAMPLES if max_samples is None else max_samples
+        self.groups = OrderedDict()  # key -> ThreatGroup, oldest window first
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+        # Metrics
+        self.received = 0
+        self.emitted = 0
+
+    @staticmethod
+    def group_key(threat):
+        return (threat['ip_address'], threat['attack_type'], threat['attack_signature'])
+
+    def add(self, threat):
+        key = self.group_key(threat)
+        now = time.monotonic()
+        wall = time.time()
+        overflow = None
+
+        with self.lock:
+            self.received += 1
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = ThreatGroup(threat, now, wall)
+                if len(self.groups) > self.max_groups:
+                    overflow = self.groups.popitem(last=False)[1]
+            else:
+                group.count += 1
+                group.last_seen = wall
+                if threat['risk_score'] > group.threat['risk_score']:
+                    group.threat['risk_score'] = threat['risk_score']
+                self._sample(group, threat)
+
+        if overflow:
+            self._emit(overflow)
+
+    def _sample(self, group, threat):
+        if len(group.samples) >= self.max_samples:
+            return
+        payload = threat.get('metadata', {}).get('raw_payload')
+        first = group.threat.get('metadata', {}).get('raw_payload')
+        if payload and payload != first and payload not in group.samples:
+            group.samples.append(payload)
+
+    def flush(self, force=False):
+        """Emit every group whose window has closed (all groups when force is set)."""
+        deadline = time.monotonic() - self.window
+        ready = []
+        with self.lock:
+            while self.groups:
+                key, group = next(iter(self.groups.items()))
+                if not force and group.opened > deadline:
+                    break
+                del self.groups[key]
+                ready.append(group)
+        for group in ready:
+            self._emit(group)
+        return len(ready)
+
+    def _emit(self, group):
+        threat = group.threat
+        metadata = threat.setdefault('metadata', {})
+        metadata['occurrences'] = group.count
+        metadata['first_seen'] = datetime.fromtimestamp(group.first_seen).isoformat()
+        metadata['last_seen'] = datetime.fromtimestamp(group.last_seen).isoformat()
+        if group.samples:
+            metadata['sample_payloads'] = group.samples
+        if group.count > 1 and 'detection_reason' in metadata:
+            metadata['detection_reason'] += f" (x{group.count} in {group.last_seen - group.first_seen:.1f}s)"
+        with self.lock:
+            self.emitted += 1
+        try:
+            self.sink(threat)
+        except Exception as e:
+            logger.error(f"Error emitting aggregated threat: {e}")
+
+    def _flush_loop(self):
+        interval = max(0.05, min(0.5, self.window / 4))
+        while self.running:
+            time.sleep(interval)
+            self.flush()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.thread.start()
+        logger.info(f"Alert aggregation started ({self.window}s window)")
+
+    def stats(self):
+        with self.lock:
+            return {"open_groups": len(self.groups), "received": self.received, "emitted": self.emitted}
+
+    def stop(self):
+        """Stop the timer and emit whatever is still open."""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.flush(force=True)
@@ -0,0 +1,279 @@
+"""
+Sentinel-Eye AI Analysis
+Cached, coalesced and rate-limited threat explanations from the language model
+"""
+
+import re
+import time
+import asyncio
+import hashlib
+import logging
+import binascii
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+import config
+
+logger = logging.getLogger('ThreatAnalyzer')
+
+MOCK_EXPLANATIONS = {
+    "port_scan": "Reconnaissance scan detected. Attacker is mapping open ports.",
+    "arp_spoof": "Man-in-the-Middle attack detected. ARP cache poisoning in progress.",
+    "sql_injection": "SQL injection attempt found in HTTP headers.",
+    "xss_attempt": "Payload containing malicious scripts detected.",
+    "traffic_anomaly": "Host traffic departed sharply from its learned baseline.",
+}
+
+DIGITS = re.compile(r"\d+")
+SPACES = re.compile(r"\s+")
+HEX_DUMP = re.compile(r"^[0-9a-f]{2}( [0-9a-f]{2})*$")
+
+
+def normalize_payload(threat):
+    """
+    Payload text that decides whether two alerts can share an explanation:
+    decoded, lower-cased, numbers collapsed and whitespace squeezed, so
+    alerts that differ only in ids, ports or counters hit the same entry.
+    """
+    metadata = threat.get('metadata') or {}
+    text = metadata.get('decoded_payload') or metadata.get('raw_payload') or ""
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        text = bytes(text).decode('utf-8', 'replace')
+    elif HEX_DUMP.match(text):
+        try:
+            text = binascii.unhexlify(text.replace(" ", "")).decode('utf-8', 'replace')
+        except (ValueError, binascii.Error):
+            pass
+    text = DIGITS.sub("0", text.lower())
+    return SPACES.sub(" ", text).strip()[:config.AI_CACHE_PAYLOAD_CHARS]
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, in bursts of up to `burst`.
+    A rate of zero or less never grants a token.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = max(0.0, rate)
+        self.capacity = max(1, burst) if self.rate else 0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=0.0):
+        """Take one token, waiting up to `timeout` seconds. Returns False if none came."""
+        if not self.rate:
+            return False
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _Pending:
+    """A model call in progress that identical requests wait on."""
+
+    __slots__ = ('event', 'result')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class ThreatAnalyzer:
+    """
+    Explains threats with the configured model, calling it as rarely as possible.
+
+    Explanations are cached by (attack_type, attack_signature, normalized
+    payload) for AI_CACHE_TTL seconds, AI_CACHE_SIZE entries, least recently
+    used first out. Concurrent requests for the same key wait on the one
+    call already in flight. Model calls go through a token bucket
+    (AI_RATE_LIMIT/s, bursts of AI_RATE_BURST, 0 for no calls at all); a
+    request that cannot get a token within AI_RATE_WAIT seconds, or whose
+    call fails, gets the canned explanation instead, which is not cached.
+
+    explain() blocks; submit() runs explain() on a small worker pool and
+    hands the result to a callback, so the threat itself never waits.
+    explain_async() awaits the same pool from a coroutine.
+    """
+
+    def __init__(self, model_url=None, mock=None):
+        self.mock = config.USE_MOCK_AI if mock is None else mock
+        self.model_url = model_url or config.AI_API_URL.format(model=config.AI_MODEL_NAME)
+        self.timeout = config.AI_TIMEOUT
+        self.ttl = config.AI_CACHE_TTL
+        self.max_entries = config.AI_CACHE_SIZE
+        self.bucket = TokenBucket(config.AI_RATE_LIMIT, config.AI_RATE_BURST)
+
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()  # key -> (expires_at, explanation), least recently used first
+        self.inflight = {}          # key -> _Pending
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=config.AI_WORKERS, thread_name_prefix="ai")
+        self.backlog = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.model_calls = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    @staticmethod
+    def cache_key(threat):
+        digest = hashlib.sha1(normalize_payload(threat).encode('utf-8')).hexdigest()
+        return (threat['attack_type'], threat['attack_signature'], digest)
+
+    def fallback(self, threat):
+        """Canned explanation: the mock answer, also used when the model is unavailable."""
+        if threat['attack_type'] == "honeypot_trap":
+            text = (f"Honeypot trigger! Interaction with decoy port {threat['metadata'].get('trap_port')}. "
+                    "High certainty of malicious intent.")
+        else:
+            text = MOCK_EXPLANATIONS.get(threat['attack_type'], 'Cyber threat detected.')
+        return f"[PRO] {text}"
+
+    def cached(self, threat):
+        """Cached explanation for the threat, or None. Never calls the model."""
+        if self.mock:
+            return self.fallback(threat)
+        return self._lookup(self.cache_key(threat))
+
+    def _lookup(self, key):
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.cache[key]
+                return None
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def explain(self, threat):
+        """Explanation for the threat, from cache, an in-flight call, or a new model call."""
+        if self.mock:
+            return self.fallback(threat)
+
+        key = self.cache_key(threat)
+        result = self._lookup(key)
+        if result is not None:
+            return result
+
+        with self.lock:
+            pending = self.inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self.inflight[key] = _Pending()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            pending.event.wait(self.timeout + config.AI_RATE_WAIT)
+            return pending.result or self.fallback(threat)
+
+        try:
+            pending.result = self._call_model(threat)
+        finally:
+            with self.lock:
+                if pending.result is not None:
+                    self.cache[key] = (time.monotonic() + self.ttl, pending.result)
+                    self.cache.move_to_end(key)
+                    while len(self.cache) > self.max_entries:
+                        self.cache.popitem(last=False)
+                del self.inflight[key]
+            pending.event.set()
+        return pending.result or self.fallback(threat)
+
+    async def explain_async(self, threat):
+        """explain() for the async core: cache hits return at once, misses wait on the worker pool."""
+        result = self.cached(threat)
+        if result is not None:
+            return result
+        return await asyncio.wrap_future(self.executor.submit(self.explain, threat))
+
+    def submit(self, threat, callback):
+        """
+        Non-blocking explain(): callback(threat, explanation) runs on a worker.
+        Returns False when AI_PENDING_LIMIT requests are already waiting.
+        """
+        with self.lock:
+            if self.backlog >= config.AI_PENDING_LIMIT:
+                return False
+            self.backlog += 1
+
+        def run():
+            try:
+                callback(threat, self.explain(threat))
+            except Exception as e:
+                logger.error(f"AI analysis callback failed: {e}")
+            finally:
+                with self.lock:
+                    self.backlog -= 1
+
+        self.executor.submit(run)
+        return True
+
+    def prompt(self, threat):
+        # Only fields in the cache key go into the prompt, so a cached answer fits every alert sharing it
+        return (
+            "You are a network security analyst. In two sentences, explain what this intrusion "
+            "alert means and how the defender should respond.\n"
+            f"Attack type: {threat['attack_type']}\n"
+            f"Signature: {threat['attack_signature']}\n"
+            f"Payload excerpt: {normalize_payload(threat) or '(none)'}"
+        )
+
+    def _call_model(self, threat):
+        if not self.bucket.acquire(config.AI_RATE_WAIT):
+            with self.lock:
+                self.rate_limited += 1
+            return None
+
+        with self.lock:
+            self.model_calls += 1
+        try:
+            response = self.session.post(
+                self.model_url,
+                json={"contents": [{"parts": [{"text": self.prompt(threat)}]}]},
+                headers={"x-goog-api-key": config.GEMINI_API_KEY},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            return response.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
+        except (requests.RequestException, ValueError, KeyError, IndexError) as e:
+            logger.warning(f"AI analysis failed for {threat['attack_type']}: {e}")
+            with self.lock:
+                self.failures += 1
+            return None
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "cache_entries": len(self.cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "model_calls": self.model_calls,
+                "rate_limited": self.rate_limited,
+                "failures": self.failures,
+                "backlog": self.backlog,
+            }
+
+    def stop(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
@@ -0,0 +1,295 @@
+"""
+Sentinel-Eye Async Core
+Thread-safe threat bridge and coroutine delivery for ENGINE_MODE "async"
+"""
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+import aiohttp
+import config
+from delivery import REJECTED
+
+logger = logging.getLogger('AsyncCore')
+
+
+class ThreatBridge:
+    """
+    Hands threats from capture, shard and aggregation threads to the
+    processor coroutines on the core's event loop.
+
+    The producer side behaves like the queue.Queue it replaces (put_nowait()
+    raising queue.Full, put(timeout), qsize(), maxsize) and may be called
+    from any thread. Items accepted while the loop is busy are buffered and
+    moved onto the asyncio.Queue by a single call_soon_threadsafe() per
+    burst rather than one wakeup per threat. maxsize counts every threat not
+    yet task_done(), so a slow processor stage pushes back on capture.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or config.MAX_QUEUE_SIZE
+        self.cond = threading.Condition(threading.Lock())
+        self.depth = 0        # accepted and not yet task_done()
+        self.buffer = []      # accepted, not yet on the loop
+        self.scheduled = False
+        self.loop = None
+        self.queue = None
+
+    def bind(self, loop):
+        """Attach to the running core loop; anything put before this is handed over now."""
+        self.loop = loop
+        self.queue = asyncio.Queue()
+        self._transfer()
+
+    def put_nowait(self, item):
+        with self.cond:
+            if self.depth >= self.maxsize:
+                raise queue.Full
+            self._accept(item)
+
+    def put(self, item, timeout=None):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.depth < self.maxsize, timeout):
+                raise queue.Full
+            self._accept(item)
+
+    def _accept(self, item):
+        # Caller holds self.cond
+        self.depth += 1
+        self.buffer.append(item)
+        if self.scheduled or self.loop is None:
+            return
+        self.scheduled = True
+        self.loop.call_soon_threadsafe(self._transfer)
+
+    def _transfer(self):
+        with self.cond:
+            items, self.buffer = self.buffer, []
+            self.scheduled = False
+        for item in items:
+            self.queue.put_nowait(item)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def task_done(self):
+        self.queue.task_done()
+        with self.cond:
+            self.depth -= 1
+            self.cond.notify()
+
+    async def join(self):
+        """Wait until every threat accepted so far has been processed."""
+        self._transfer()
+        await self.queue.join()
+
+    def qsize(self):
+        """Threats waiting for a processor."""
+        return len(self.buffer) + (self.queue.qsize() if self.queue else 0)
+
+
+class AsyncThreatDelivery:
+    """
+    ThreatDelivery for the async core: the same batching (API_BATCH_SIZE /
+    API_BATCH_LATENCY), retry and overflow rules, but batches are POSTed by
+    coroutines over one aiohttp session, up to ASYNC_DELIVERY_CONCURRENCY
+    at a time.
+
+    put() waits while API_PENDING_LIMIT payloads are buffered, which is how
+    a slow API pushes back on the processors. submit() never waits, may be
+    called from any thread, and spools or drops on a full buffer like
+    ThreatDelivery.submit(). Spooling runs in a worker thread, since the
+    spool may fsync; payloads refused while a spool write is under way are
+    written together by the next one.
+    """
+
+    def __init__(self, batch_url=None, batch_size=None, max_latency=None, concurrency=None, overflow=None,
+                 metrics=None):
+        self.batch_url = batch_url or config.API_BATCH_URL
+        self.batch_size = batch_size or config.API_BATCH_SIZE
+        self.max_latency = config.API_BATCH_LATENCY if max_latency is None else max_latency
+        self.concurrency = concurrency or config.ASYNC_DELIVERY_CONCURRENCY
+        self.timeout = config.API_TIMEOUT
+        self.retries = max(1, config.API_RETRY)
+        self.backoff = config.API_RETRY_BACKOFF
+        self.overflow = overflow  # overflow(payloads) -> number kept
+        self.registry = metrics   # optional MetricsRegistry for API round-trip times
+
+        # Created in start(), on the core loop
+        self.loop = None
+        self.pending = None
+        self.slots = None
+        self.session = None
+        self.batcher = None
+        self.sending = set()
+        self.overflowing = []  # Refused by a full buffer, waiting for the spool
+        self.spilling = None   # Task writing them
+
+        # Metrics (only updated on the loop thread)
+        self.in_flight = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.spooled = 0
+        self.failed_attempts = 0
+        self.batches_sent = 0
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.pending = asyncio.Queue(maxsize=config.API_PENDING_LIMIT)
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self.batcher = asyncio.create_task(self._batch_loop())
+        logger.info(f"Async threat delivery started ({self.concurrency} concurrent batches, batch {self.batch_size})")
+
+    async def put(self, payload):
+        await self.pending.put(payload)
+
+    def submit(self, payload):
+        """Queue one API payload without waiting. Returns False if it had to be spooled or dropped."""
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            return self._offer(payload)
+        self.loop.call_soon_threadsafe(self._offer, payload)
+        return True
+
+    def _offer(self, payload):
+        try:
+            self.pending.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            self.overflowing.append(payload)
+            if self.spilling is None:
+                self.spilling = asyncio.create_task(self._spill())
+            return False
+
+    async def _spill(self):
+        """Spool what a full buffer refused, one spool write per burst."""
+        try:
+            while self.overflowing:
+                payloads, self.overflowing = self.overflowing, []
+                await self._overflow(payloads, "Delivery buffer full!")
+        finally:
+            self.spilling = None
+
+    async def _batch_loop(self):
+        while True:
+            batch = await self._next_batch()
+            await self.slots.acquire()
+            task = asyncio.create_task(self._send(batch))
+            self.sending.add(task)
+            task.add_done_callback(self._sent)
+
+    def _sent(self, task):
+        self.sending.discard(task)
+        self.slots.release()
+
+    async def _next_batch(self):
+        """Wait for the first payload, then fill until size or latency deadline."""
+        batch = [await self.pending.get()]
+        deadline = self.loop.time() + self.max_latency
+        while len(batch) < self.batch_size:
+            if not self.pending.empty():
+                batch.append(self.pending.get_nowait())
+                continue
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.pending.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _send(self, batch):
+        try:
+            if not await self.send_batch(batch):
+                await self._overflow(batch, f"Giving up on batch after {self.retries} attempts.")
+        finally:
+            for _ in batch:
+                self.pending.task_done()
+
+    async def send_batch(self, batch):
+        """
+        Deliver one batch with retries. Returns True once the batch is done
+        with: delivered, or rejected by the API and counted as rejected and
+        dropped. False means it may still go through later.
+        """
+        self.in_flight += len(batch)
+        try:
+            outcome = await self._post(batch)
+            if outcome is REJECTED:
+                self.rejected += len(batch)
+                self.dropped += len(batch)
+            elif outcome:
+                self.delivered += len(batch)
+                self.batches_sent += 1
+            return bool(outcome)
+        finally:
+            self.in_flight -= len(batch)
+
+    def post_batch(self, batch):
+        """Blocking send_batch() for other threads (spool replay). Returns True on success."""
+        return asyncio.run_coroutine_threadsafe(self.send_batch(batch), self.loop).result()
+
+    async def _post(self, batch):
+        for attempt in range(self.retries):
+            try:
+                start = time.perf_counter()
+                async with self.session.post(self.batch_url, json={"threats": batch}) as response:
+                    if self.registry is not None:
+                        self.registry.observe("sentinel_api_round_trip_seconds", time.perf_counter() - start)
+                    if response.status < 300:
+                        return True
+                    if 400 <= response.status < 500 and response.status != 429:
+                        # Validation errors will not get better on retry
+                        text = await response.text()
+                        logger.error(f"API rejected batch of {len(batch)}: {response.status} {text[:200]}")
+                        return REJECTED
+                    logger.warning(f"API returned {response.status} (attempt {attempt + 1}/{self.retries})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"API request failed (attempt {attempt + 1}/{self.retries}): {e!r}")
+
+            self.failed_attempts += 1
+            if attempt + 1 < self.retries:
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+        return False
+
+    async def _overflow(self, payloads, reason):
+        kept = await asyncio.to_thread(self.overflow, payloads) if self.overflow else 0
+        self.spooled += kept
+        self.dropped += len(payloads) - kept
+        if kept < len(payloads):
+            logger.error(f"{reason} Dropped {len(payloads) - kept} threats")
+
+    def metrics(self):
+        return {
+            "queued": self.pending.qsize() if self.pending else 0,
+            "in_flight": self.in_flight,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "spooled": self.spooled,
+            "failed_attempts": self.failed_attempts,
+            "batches_sent": self.batches_sent,
+        }
+
+    async def stop(self):
+        """Let the buffer drain, then close the session."""
+        if self.batcher is None:
+            return
+        await self.pending.join()
+        self.batcher.cancel()
+        await asyncio.gather(self.batcher, *self.sending, return_exceptions=True)
+        if self.spilling is not None:
+            await self.spilling
+        self.batcher = None
+        await self.session.close()
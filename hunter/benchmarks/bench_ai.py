@@ -0,0 +1,149 @@
+"""
+AI Analysis Benchmark
+Runs a port-scan alert burst through one-call-per-threat analysis and the cached,
+coalesced, rate-limited ThreatAnalyzer (blocking and non-blocking) against the fake model
+
+Usage (from the hunter directory):
+    python benchmarks/bench_ai.py --threats 400 --workers 4 --latency 0.3
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+import queue
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from ai_analysis import ThreatAnalyzer
+from fake_model import FakeModelServer
+
+PAYLOADS = [
+    ("sql_injection", "SQL_INJECTION_ATTEMPT", "GET /?id={n}' OR '1'='1 HTTP/1.1"),
+    ("sql_injection", "SQL_INJECTION_ATTEMPT", "GET /?q=1 UNION SELECT password FROM users WHERE id={n} HTTP/1.1"),
+    ("xss_attempt", "XSS_DETECTED", "GET /?q=<script>alert({n})</script> HTTP/1.1"),
+]
+
+
+def make_threats(count):
+    """Mostly port-scan alerts from a burst of sources, plus a few payload alerts with varying ids."""
+    rng = random.Random(5)
+    threats = []
+    for i in range(count):
+        if rng.random() < 0.85:
+            threats.append({
+                "ip_address": f"198.51.100.{i % 250 + 1}",
+                "attack_type": "port_scan",
+                "attack_signature": "PORT_SCAN_DETECTED",
+                "metadata": {"syn_count": 20 + i % 7, "raw_payload": "No raw payload data (Header only)"},
+            })
+        else:
+            attack_type, signature, template = rng.choice(PAYLOADS)
+            threats.append({
+                "ip_address": f"203.0.113.{i % 250 + 1}",
+                "attack_type": attack_type,
+                "attack_signature": signature,
+                "metadata": {"decoded_payload": template.format(n=rng.randint(1, 99999))},
+            })
+    return threats
+
+
+def process(threats, workers, handle):
+    """Feed threats to `workers` threads like threat_processor; returns per-threat handling times."""
+    inbox = queue.Queue()
+    for threat in threats:
+        inbox.put(threat)
+    waits = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            try:
+                threat = inbox.get_nowait()
+            except queue.Empty:
+                return
+            start = time.perf_counter()
+            handle(threat)
+            with lock:
+                waits.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(waits)
+
+
+def report(name, elapsed, waits, calls, extra=""):
+    p50 = waits[len(waits) // 2] * 1000
+    p99 = waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000
+    print(f"{name:<14} {elapsed:>9.2f}s {len(waits) / elapsed:>10,.0f} {p50:>10.1f} {p99:>10.1f} {calls:>8} {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threats', type=int, default=400)
+    parser.add_argument('--workers', type=int, default=config.WORKER_THREADS)
+    parser.add_argument('--latency', type=float, default=0.3, help="fake model seconds per call")
+    parser.add_argument('--rate', type=float, default=config.AI_RATE_LIMIT, help="model calls/sec allowed")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    config.AI_RATE_LIMIT = args.rate
+    threats = make_threats(args.threats)
+    fake = FakeModelServer(latency=args.latency).start()
+    session = requests.Session()
+
+    print(f"{args.threats} threats, {args.workers} workers, model latency {args.latency}s, "
+          f"limit {args.rate}/s burst {config.AI_RATE_BURST}")
+    print(f"{'mode':<14} {'elapsed':>10} {'threats/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'calls':>8}")
+
+    # Baseline: every alert makes its own blocking model call
+    def direct(threat):
+        session.post(fake.url, json={"contents": [{"parts": [{"text": f"Attack type: {threat['attack_type']}"}]}]},
+                     timeout=config.AI_TIMEOUT)
+
+    start = time.perf_counter()
+    waits = process(threats, args.workers, direct)
+    report("per-threat", time.perf_counter() - start, waits, fake.calls)
+
+    fake.calls = 0
+    analyzer = ThreatAnalyzer(model_url=fake.url, mock=False)
+    start = time.perf_counter()
+    waits = process(threats, args.workers, analyzer.explain)
+    m = analyzer.metrics()
+    report("cached", time.perf_counter() - start, waits, fake.calls,
+           f"hits={m['hits']} coalesced={m['coalesced']} rate_limited={m['rate_limited']}")
+    analyzer.stop()
+
+    fake.calls = 0
+    analyzer = ThreatAnalyzer(model_url=fake.url, mock=False)
+    done = threading.Semaphore(0)
+    explained = []
+
+    def non_blocking(threat):
+        if analyzer.cached(threat) is None:
+            if analyzer.submit(threat, lambda t, text: (explained.append(text), done.release())):
+                return
+        done.release()
+
+    start = time.perf_counter()
+    waits = process(threats, args.workers, non_blocking)
+    shipped = time.perf_counter() - start
+    for _ in threats:
+        done.acquire()
+    m = analyzer.metrics()
+    report("non-blocking", shipped, waits, fake.calls,
+           f"all explanations after {time.perf_counter() - start:.2f}s, {len(explained)} late updates")
+    analyzer.stop()
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
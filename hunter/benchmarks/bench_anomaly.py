@@ -0,0 +1,168 @@
+"""
+Anomaly Scoring Benchmark
+Compares per-packet Python baseline scoring with AnomalyDetector's one vectorized pass per bucket, scored
+on the packet path or on its background thread, from 1k to 100k sources
+
+Usage (from the hunter directory):
+    python benchmarks/bench_anomaly.py --packets 400000 --hosts 1000 10000 100000
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import PacketSummary, AnomalyDetector
+
+
+def build_traffic(count, hosts, seconds):
+    """Steady background from `hosts` sources over `seconds`, with one source starting a scan in the last fifth."""
+    rng = random.Random(19)
+    scanner = "10.200.0.7"
+    summaries = []
+    for i in range(count):
+        summary = PacketSummary()
+        t = seconds * i / count
+        summary.timestamp = 1_000_000.0 + t
+        if t > seconds * 0.8 and i % 50 == 0:
+            summary.src_ip = scanner
+            summary.dst_ip = f"10.0.{i % 250}.{i // 250 % 250}"
+            summary.dport = rng.randint(1, 65535)
+            summary.tcp_flags = 0x02
+            summary.length = 44
+        else:
+            h = rng.randrange(hosts) if i % 50 else hosts  # the scanner is an ordinary host until then
+            summary.src_ip = scanner if h == hosts else f"10.{100 + h // 65536}.{h // 256 % 256}.{h % 256}"
+            summary.dst_ip = f"10.0.0.{rng.randint(1, 4)}"
+            summary.dport = rng.choice((80, 443, 8443))
+            summary.tcp_flags = 0x18 if rng.random() < 0.3 else 0x10
+            summary.length = rng.randint(60, 1500)
+        summary.sport = 40000 + i % 20000
+        summaries.append(summary)
+    return summaries
+
+
+class PerPacketScorer:
+    """
+    The straightforward alternative: per-source dicts, window counters and
+    EWMA baseline kept in Python, and the source re-scored on every packet.
+    Same features and z-score; the baseline learns per packet instead of
+    per bucket.
+    """
+
+    def __init__(self):
+        self.window = config.ANOMALY_WINDOW
+        self.buckets = config.ANOMALY_BUCKETS
+        self.width = self.window / self.buckets
+        self.hosts = {}
+        self.alerts = 0
+
+    def analyze(self, s):
+        epoch = int(s.timestamp // self.width)
+        host = self.hosts.get(s.src_ip)
+        if host is None:
+            host = self.hosts[s.src_ip] = {"buckets": {}, "mean": [0.0] * 5, "var": [0.0] * 5,
+                                           "age": 0, "alerted": -1e18}
+        buckets = host["buckets"]
+        b = buckets.get(epoch)
+        if b is None:
+            for old in [e for e in buckets if e <= epoch - self.buckets]:
+                del buckets[old]
+            b = buckets[epoch] = [0, 0, 0, set(), set(), 0]
+        b[0] += 1
+        flags = s.tcp_flags or 0
+        b[1] += (flags & 0x12) == 0x02
+        b[2] += (flags & 0x10) != 0
+        b[3].add(s.dport)
+        b[4].add(s.dst_ip)
+        b[5] += s.length or 0
+
+        packets = sum(v[0] for v in buckets.values())
+        x = [math.log1p(packets / self.window),
+             math.log1p(sum(v[1] for v in buckets.values()) / (sum(v[2] for v in buckets.values()) + 1)),
+             math.log1p(sum(len(v[3]) for v in buckets.values())),
+             math.log1p(sum(len(v[4]) for v in buckets.values())),
+             math.log1p(sum(v[5] for v in buckets.values()) / self.window)]
+        mean, var = host["mean"], host["var"]
+        z = max((x[k] - mean[k]) / (math.sqrt(var[k]) + config.ANOMALY_MIN_STD) for k in range(5))
+        if (host["age"] >= config.ANOMALY_WARMUP_TICKS * self.buckets and z >= config.ANOMALY_Z_THRESHOLD
+                and s.timestamp - host["alerted"] >= config.ANOMALY_ALERT_COOLDOWN):
+            host["alerted"] = s.timestamp
+            self.alerts += 1
+        alpha = config.ANOMALY_EWMA_ALPHA / self.buckets  # per packet instead of per bucket
+        for k in range(5):
+            diff = x[k] - mean[k]
+            mean[k] += alpha * diff
+            var[k] = (1 - alpha) * (var[k] + alpha * diff * diff)
+        host["age"] += 1
+        return None
+
+
+def run(detector, summaries):
+    tick_times = []
+    if isinstance(detector, AnomalyDetector):
+        tick = detector._tick
+
+        def timed_tick(*closed):
+            start = time.perf_counter()
+            try:
+                return tick(*closed)
+            finally:
+                tick_times.append(time.perf_counter() - start)
+
+        detector._tick = timed_tick
+
+    threats = 0
+    start = time.perf_counter()
+    for summary in summaries:
+        found = detector.analyze(summary)
+        if found:
+            threats += len(found)
+    capture = time.perf_counter() - start
+    if isinstance(detector, AnomalyDetector):
+        threats += len(detector.drain() or ())
+    elapsed = time.perf_counter() - start
+    alerts = detector.alerts if isinstance(detector, PerPacketScorer) else threats
+    return elapsed, capture, tick_times, alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--packets', type=int, default=400000)
+    parser.add_argument('--hosts', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--seconds', type=int, default=60, help="capture time the packets are spread over")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    print(f"{args.packets} packets over {args.seconds}s, {config.ANOMALY_BUCKETS / config.ANOMALY_WINDOW:.0f} ticks/sec")
+    print(f"{'hosts':>7} {'mode':<11} {'pkts/sec':>10} {'capture':>10} {'ticks':>6} {'tick ms':>8} {'max ms':>8} "
+          f"{'alerts':>7} {'arrays MB':>10}")
+    for hosts in args.hosts:
+        summaries = build_traffic(args.packets, hosts, args.seconds)
+        config.ANOMALY_MAX_HOSTS = hosts + 1
+        for name, make in (("per-packet", PerPacketScorer), ("inline", lambda: AnomalyDetector(background=False)),
+                           ("background", lambda: AnomalyDetector(background=True))):
+            detector = make()
+            elapsed, capture, tick_times, alerts = run(detector, summaries)
+            if tick_times:
+                mb = (detector.ring.nbytes + detector.window_sums.nbytes + detector.mean.nbytes
+                      + detector.var.nbytes) / 2**20
+                ticks = f"{len(tick_times):>6} {sum(tick_times) / len(tick_times) * 1000:>8.2f} " \
+                        f"{max(tick_times) * 1000:>8.2f}"
+                memory = f"{mb:>10.1f}"
+            else:
+                ticks = f"{'-':>6} {'-':>8} {'-':>8}"
+                memory = f"{'-':>10}"
+            print(f"{hosts:>7} {name:<11} {len(summaries) / elapsed:>10,.0f} {len(summaries) / capture:>10,.0f} "
+                  f"{ticks} {alerts:>7} {memory}")
+
+
+if __name__ == "__main__":
+    main()
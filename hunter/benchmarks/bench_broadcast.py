@@ -0,0 +1,172 @@
+"""
+Broadcast Burst Load Test
+Websocket frames, bytes and dashboard render work per viewer for an alert burst, by broadcast mode
+
+Replays a burst of --threats alerts arriving over --duration seconds through
+the Hunter's delivery batching (API_BATCH_SIZE / API_BATCH_LATENCY), and counts
+what each viewer receives and renders under:
+  per threat    ThreatDetected per stored row, full row payload, rendered per threat
+  per request   ThreatsDetected per POST /api/threats/batch, every row, rendered per threat
+  ticked        threats:broadcast every --tick ms: counts for all, the newest 30 slim rows,
+                rendered in one requestAnimationFrame pass per frame
+
+With --url, posts the burst to a running backend instead; open the dashboard
+first and run `sentinelApp.renderStats()` in its console afterwards for the
+measured render pass times.
+
+Usage (from the hunter directory):
+    python benchmarks/bench_broadcast.py --threats 1000 --duration 1
+    python benchmarks/bench_broadcast.py --threats 1000 --url http://localhost:8000/api
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from bench_ingest import make_payload
+
+FRAME_LIMIT = 10_000      # Reverb's default max message size
+MAX_THREATS = 30          # config('threats.broadcast_max_threats')
+MAX_BEAMS = 12            # ThreatMap.maxBeams
+FRAME_MS = 1000 / 60      # requestAnimationFrame at 60 Hz
+TIMERS_PER_THREAT = 6     # Old client: beam fade-in/out intervals, fade-out delay, marker, ripple, siege timeouts
+
+
+def full_row(i, payload):
+    """ThreatLog::toBroadcast before slimming: metadata and AI text included."""
+    return {"id": i + 1, "ip_address": payload["ip_address"], "geo_location": payload["geo_location"],
+            "attack_signature": payload["attack_signature"], "attack_type": payload["attack_type"],
+            "risk_score": payload["risk_score"], "ai_analysis": payload["ai_analysis"],
+            "metadata": json.loads(payload["metadata"]), "created_at": "2026-10-17T09:30:00.000000Z"}
+
+
+def slim_row(i, payload):
+    """ThreatLog::toBroadcast: the feed projection."""
+    return {"id": i + 1, "ip_address": payload["ip_address"], "geo_location": payload["geo_location"],
+            "attack_signature": payload["attack_signature"], "attack_type": payload["attack_type"],
+            "risk_score": payload["risk_score"], "created_at": "2026-10-17T09:30:00.000000Z",
+            "ips_action": None, "victim_name": None, "country_code": None}
+
+
+def summary(rows):
+    by_type = {}
+    for r in rows:
+        by_type[r["attack_type"]] = by_type.get(r["attack_type"], 0) + 1
+    return {"count": len(rows), "by_type": by_type, "high_risk": sum(r["risk_score"] >= 80 for r in rows),
+            "last_id": rows[-1]["id"]}
+
+
+def delivery_batches(arrivals):
+    """When each threat is stored: delivery sends API_BATCH_SIZE threats, or what it has after API_BATCH_LATENCY."""
+    batches, current, opened = [], [], None
+    for i, at in enumerate(arrivals):
+        if current and at - opened >= config.API_BATCH_LATENCY:
+            batches.append((opened + config.API_BATCH_LATENCY, current))
+            current = []
+        if not current:
+            opened = at
+        current.append(i)
+        if len(current) >= config.API_BATCH_SIZE:
+            batches.append((at, current))
+            current = []
+    if current:
+        batches.append((opened + config.API_BATCH_LATENCY, current))
+    return batches
+
+
+def frames_for(mode, payloads, batches, tick):
+    """(send time, frame JSON, threats the client renders) for every websocket frame."""
+    frames = []
+    if mode == "per threat":
+        for at, ids in batches:
+            for i in ids:
+                frames.append((at, json.dumps(full_row(i, payloads[i])), 1))
+    elif mode == "per request":
+        for at, ids in batches:
+            rows = [full_row(i, payloads[i]) for i in ids]
+            frames.append((at, json.dumps({**summary(rows), "threats": rows}), len(rows)))
+    else:
+        stored = sorted((at, i) for at, ids in batches for i in ids)
+        now, pos = tick, 0
+        while pos < len(stored):
+            due = []
+            while pos < len(stored) and stored[pos][0] <= now:
+                due.append(stored[pos][1])
+                pos += 1
+            if due:
+                rows = [slim_row(i, payloads[i]) for i in due]
+                frames.append((now, json.dumps({**summary(rows), "threats": rows[-MAX_THREATS:]}),
+                               min(len(rows), MAX_THREATS)))
+            now += tick
+    return frames
+
+
+def client_work(mode, frames):
+    """Render passes, chart updates, map beams and timers the dashboard starts for these frames."""
+    if mode != "ticked":
+        # Every threat goes through processThreat: its own feed insert, chart update, beam and timers
+        threats = sum(n for _, _, n in frames)
+        return threats, threats, threats, threats * TIMERS_PER_THREAT
+    # Frames that land in the same animation frame share one renderPending pass
+    slots = {}
+    for at, _, n in frames:
+        slot = int(at * 1000 // FRAME_MS)
+        slots[slot] = slots.get(slot, 0) + n
+    beams = sum(min(n, MAX_BEAMS) for n in slots.values())
+    return len(slots), len(slots), beams, len(slots)
+
+
+def post_burst(url, threats, duration):
+    """Send the burst as delivery would: batches of API_BATCH_SIZE, spread over the duration."""
+    session = requests.Session()
+    payloads = [make_payload(i) for i in range(threats)]
+    batches = [payloads[i:i + config.API_BATCH_SIZE] for i in range(0, threats, config.API_BATCH_SIZE)]
+    start = time.perf_counter()
+    for n, batch in enumerate(batches):
+        time.sleep(max(start + duration * n / len(batches) - time.perf_counter(), 0))
+        session.post(f"{url}/threats/batch", json={"threats": batch}, timeout=60).raise_for_status()
+    print(f"posted {threats} threats in {len(batches)} batches over {time.perf_counter() - start:.2f}s; "
+          f"now run sentinelApp.renderStats() in the dashboard console")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threats', type=int, default=1000, help="alerts in the burst")
+    parser.add_argument('--duration', type=float, default=1.0, help="seconds the burst arrives over")
+    parser.add_argument('--tick', type=int, default=250, help="THREAT_BROADCAST_TICK_MS")
+    parser.add_argument('--url', help="API base of a running backend, e.g. http://localhost:8000/api")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    if args.url:
+        post_burst(args.url, args.threats, args.duration)
+        return
+
+    payloads = [make_payload(i) for i in range(args.threats)]
+    arrivals = [args.duration * i / args.threats for i in range(args.threats)]
+    batches = delivery_batches(arrivals)
+
+    print(f"{args.threats} alerts over {args.duration}s, {len(batches)} delivery batches, per viewer:")
+    print(f"{'mode':<12} {'frames':>7} {'KB':>8} {'max frame KB':>13} {'over 10KB':>10} {'renders':>8} "
+          f"{'chart upd':>10} {'beams':>6} {'timers':>7} {'encode ms':>10}")
+    for mode in ("per threat", "per request", "ticked"):
+        start = time.perf_counter()
+        frames = frames_for(mode, payloads, batches, args.tick / 1000)
+        encode_ms = (time.perf_counter() - start) * 1000
+        sizes = [len(body) for _, body, _ in frames]
+        renders, chart_updates, beams, timers = client_work(mode, frames)
+        print(f"{mode:<12} {len(frames):>7} {sum(sizes) / 1024:>8,.0f} {max(sizes) / 1024:>13.1f} "
+              f"{sum(s > FRAME_LIMIT for s in sizes):>10} {renders:>8} {chart_updates:>10} {beams:>6} {timers:>7} "
+              f"{encode_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
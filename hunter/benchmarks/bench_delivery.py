@@ -0,0 +1,74 @@
+"""
+Threat Delivery Benchmark
+Compares one requests.post per threat with batched, pooled ThreatDelivery
+against the local stub API
+
+Usage (from the hunter directory):
+    python benchmarks/bench_delivery.py --threats 2000 --latency 0.005
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delivery import ThreatDelivery
+from stub_api import StubThreatAPI
+
+
+def make_payload(i):
+    return {
+        "ip_address": f"203.0.113.{i % 250 + 1}",
+        "geo_location": "Global Web",
+        "attack_signature": "PORT_SCAN_DETECTED",
+        "attack_type": "port_scan",
+        "risk_score": 75,
+        "ai_analysis": "[PRO] Reconnaissance scan detected.",
+        "metadata": json.dumps({"syn_count": 20, "unique_ports": 20}),
+    }
+
+
+def bench_per_request(stub, count):
+    """The old send_to_api: fresh connection and blocking POST per threat."""
+    start = time.perf_counter()
+    for i in range(count):
+        requests.post(stub.url, json=make_payload(i), timeout=2)
+    return time.perf_counter() - start
+
+
+def bench_batched(stub, count):
+    delivery = ThreatDelivery(batch_url=stub.batch_url)
+    delivery.start()
+    start = time.perf_counter()
+    for i in range(count):
+        delivery.submit(make_payload(i))
+    delivery.stop()
+    return time.perf_counter() - start, delivery.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threats', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.005, help="stub per-request delay in seconds")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    stub = StubThreatAPI(latency=args.latency).start()
+
+    elapsed = bench_per_request(stub, args.threats)
+    print(f"per-request : {args.threats / elapsed:>10,.0f} threats/sec  ({stub.requests} HTTP requests)")
+
+    before = stub.requests
+    elapsed, metrics = bench_batched(stub, args.threats)
+    print(f"batched     : {args.threats / elapsed:>10,.0f} threats/sec  ({stub.requests - before} HTTP requests)")
+    print(f"metrics     : {metrics}")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
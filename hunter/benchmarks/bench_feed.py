@@ -0,0 +1,123 @@
+"""
+Dashboard Feed Benchmark
+Bytes and rows served per minute to N dashboards: full /threats/recent polling vs the since_id feed, on SQLite
+
+Replays the queries each dashboard causes against a SQLite threat_logs table
+while threats arrive at --rate per second:
+  recent polling    every viewer fetches the latest 100 full rows every 5s
+  feed polling      every viewer fetches only rows after its cursor, slim (websocket down)
+  feed + websocket  no polls; each new threat is pushed once per viewer, slim
+
+Usage (from the hunter directory):
+    python benchmarks/bench_feed.py --viewers 20 --rate 5
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_ingest import SCHEMA, COLUMNS, make_payload, row
+
+POLL_SECONDS = 5   # app.js polling interval
+RECENT_LIMIT = 100
+FEED_LIMIT = 100
+
+RECENT_SQL = f"select * from threat_logs order by created_at desc limit {RECENT_LIMIT}"
+# ThreatLog::FEED_COLUMNS
+FEED_SQL = ("select id, ip_address, geo_location, attack_signature, attack_type, risk_score, created_at, "
+            "json_extract(metadata, '$.ips_action') as ips_action, "
+            "json_extract(metadata, '$.victim_name') as victim_name, "
+            "json_extract(metadata, '$.geo.country_code') as country_code "
+            f"from threat_logs where id > ? order by id limit {FEED_LIMIT + 1}")
+
+
+class Feed:
+    def __init__(self, preload):
+        self.db = sqlite3.connect(":memory:", isolation_level=None)
+        self.db.executescript(SCHEMA)
+        self.db.row_factory = sqlite3.Row
+        self.serial = 0
+        self.store(preload)
+
+    def store(self, count):
+        """Insert `count` threats; returns them as ThreatLog::toBroadcast would push them."""
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        rows = [row(make_payload(self.serial + i), now) for i in range(count)]
+        self.serial += count
+        self.db.execute("begin")
+        marks = ", ".join("?" * len(COLUMNS))
+        self.db.executemany(f"insert into threat_logs ({', '.join(COLUMNS)}) values ({marks})", rows)
+        self.db.execute("commit")
+        first = self.last_id() - count + 1
+        return [{"id": first + i, "ip_address": r[1], "geo_location": r[2], "attack_signature": r[3],
+                 "attack_type": r[4], "risk_score": r[5], "created_at": r[8], "ips_action": None,
+                 "victim_name": None, "country_code": None} for i, r in enumerate(rows)]
+
+    def query(self, sql, params=()):
+        rows = [dict(r) for r in self.db.execute(sql, params)]
+        for r in rows:
+            if isinstance(r.get("metadata"), str):
+                r["metadata"] = json.loads(r["metadata"])
+        return rows
+
+    def last_id(self):
+        return self.db.execute("select max(id) from threat_logs").fetchone()[0]
+
+
+def simulate(mode, viewers, rate, minutes, preload):
+    feed = Feed(preload)
+    cursors = [feed.last_id()] * viewers
+    requests = rows = sent = 0
+    db_seconds = 0.0
+    for _ in range(minutes * 60 // POLL_SECONDS):
+        new = feed.store(rate * POLL_SECONDS)
+        if mode == "feed + websocket":
+            # One push per new threat per connected viewer, no queries
+            sent += viewers * sum(len(json.dumps({"threats": [t]})) for t in new)
+            rows += viewers * len(new)
+            continue
+        for v in range(viewers):
+            start = time.perf_counter()
+            if mode == "recent polling":
+                page = feed.query(RECENT_SQL)
+                body = {"success": True, "count": len(page), "threats": page}
+            else:
+                page = feed.query(FEED_SQL, (cursors[v],))
+                has_more = len(page) > FEED_LIMIT
+                page = page[:FEED_LIMIT]
+                cursors[v] = page[-1]["id"] if page else cursors[v]
+                body = {"success": True, "count": len(page), "cursor": cursors[v], "has_more": has_more,
+                        "threats": page}
+            payload = json.dumps(body)
+            db_seconds += time.perf_counter() - start
+            requests += 1
+            rows += len(page)
+            sent += len(payload)
+    return requests / minutes, rows / minutes, sent / minutes, db_seconds * 1000 / minutes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--viewers', type=int, default=20, help="open dashboards")
+    parser.add_argument('--rate', type=int, default=5, help="new threats per second")
+    parser.add_argument('--minutes', type=int, default=2, help="simulated minutes")
+    parser.add_argument('--preload', type=int, default=10000, help="threats stored before the run")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    print(f"{args.viewers} viewers, {args.rate} threats/s, {args.minutes} simulated minutes, "
+          f"{args.preload} threats preloaded; per minute:")
+    print(f"{'mode':<17} {'requests':>9} {'rows':>9} {'KB sent':>9} {'server ms':>10}")
+    for mode in ("recent polling", "feed polling", "feed + websocket"):
+        requests, rows, sent, server_ms = simulate(mode, args.viewers, args.rate, args.minutes, args.preload)
+        print(f"{mode:<17} {requests:>9,.0f} {rows:>9,.0f} {sent / 1024:>9,.0f} {server_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+GeoIP Benchmark
+Builds a synthetic range database and measures open time and lookups/sec,
+uncached and with the LRU cache under a hot-attacker workload
+
+Usage (from the hunter directory):
+    python benchmarks/bench_geoip.py --v4-ranges 500000 --v6-ranges 100000 --lookups 200000
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+import ipaddress
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geoip import GeoIPResolver, build_database
+
+COUNTRIES = [("US", "USA", 15169, "GOOGLE"), ("RU", "Russia", 12389, "ROSTELECOM"),
+             ("CN", "China", 4134, "CHINANET"), ("DE", "Germany", 3320, "DTAG"),
+             ("GB", "UK", 2856, "BT"), ("BR", "Brazil", 28573, "CLARO"),
+             ("AU", "Australia", 1221, "TELSTRA"), ("PK", "Pakistan", 17557, "PKTELECOM")]
+
+
+def synthetic_rows(v4_ranges, v6_ranges):
+    """Contiguous, non-overlapping public ranges with one gap in ten, like a real export."""
+    rng = random.Random(3)
+    rows = []
+    step = (223 << 24) // v4_ranges
+    for i in range(v4_ranges):
+        start = (1 << 24) + i * step
+        if i % 10 == 9:
+            continue
+        cc, name, asn, org = rng.choice(COUNTRIES)
+        rows.append((4, start, start + step - 1, f"{cc}\t{name}\t{asn + i % 50}\t{org}"))
+    base = int(ipaddress.ip_address("2000::"))
+    step6 = (1 << 125) // max(1, v6_ranges)
+    for i in range(v6_ranges):
+        cc, name, asn, org = rng.choice(COUNTRIES)
+        start = base + i * step6
+        rows.append((6, start, start + step6 - 1, f"{cc}\t{name}\t{asn}\t{org}"))
+    return rows
+
+
+def random_addresses(count, v6_share):
+    rng = random.Random(11)
+    addresses = []
+    for _ in range(count):
+        if rng.random() < v6_share:
+            addresses.append(str(ipaddress.IPv6Address(int(ipaddress.ip_address("2000::")) + rng.getrandbits(124))))
+        else:
+            addresses.append(str(ipaddress.IPv4Address(rng.randint(1 << 24, (224 << 24) - 1))))
+    return addresses
+
+
+def hot_addresses(count, attackers):
+    """Alerts mostly come from a small set of repeat sources."""
+    rng = random.Random(12)
+    pool = random_addresses(attackers, 0.1)
+    return [pool[min(int(rng.paretovariate(1.2)) - 1, attackers - 1)] for _ in range(count)]
+
+
+def rate(resolver, addresses):
+    start = time.perf_counter()
+    for address in addresses:
+        resolver.lookup(address)
+    return len(addresses) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--v4-ranges', type=int, default=500000)
+    parser.add_argument('--v6-ranges', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=200000)
+    parser.add_argument('--attackers', type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    path = os.path.join(tempfile.mkdtemp(prefix="geoip-bench-"), "geoip.bin")
+
+    start = time.perf_counter()
+    build_database(synthetic_rows(args.v4_ranges, args.v6_ranges), path)
+    print(f"Built {args.v4_ranges:,} IPv4 + {args.v6_ranges:,} IPv6 ranges in {time.perf_counter() - start:.2f}s "
+          f"({os.path.getsize(path) / 1e6:.1f} MB)")
+
+    start = time.perf_counter()
+    resolver = GeoIPResolver(path, cache_size=0)
+    print(f"Opened (mmap) in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    uniform_v4 = random_addresses(args.lookups, 0.0)
+    uniform_v6 = random_addresses(args.lookups, 1.0)
+    hot = hot_addresses(args.lookups, args.attackers)
+
+    print(f"{'workload':<28} {'lookups/sec':>14}")
+    print(f"{'uncached, random IPv4':<28} {rate(resolver, uniform_v4):>14,.0f}")
+    print(f"{'uncached, random IPv6':<28} {rate(resolver, uniform_v6):>14,.0f}")
+    print(f"{'uncached, hot attackers':<28} {rate(resolver, hot):>14,.0f}")
+    cached = GeoIPResolver(path)
+    print(f"{'cached, hot attackers':<28} {rate(cached, hot):>14,.0f}   {cached.stats()}")
+
+    resolver.close()
+    cached.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
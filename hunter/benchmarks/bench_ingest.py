@@ -0,0 +1,226 @@
+"""
+Threat Ingest Load Test
+Threats/sec stored through POST /api/threats, the old row-by-row batch and the bulk batch, on SQLite
+
+Without --url, replays the statements ThreatController issues for each
+endpoint against a fresh SQLite file with the threat_logs and jobs schema
+(broadcasts are queued in the jobs table, as with QUEUE_CONNECTION=database).
+With --url, drives a running backend (php artisan serve on SQLite) over HTTP.
+
+Usage (from the hunter directory):
+    python benchmarks/bench_ingest.py --threats 5000 --batch 50
+    python benchmarks/bench_ingest.py --threats 5000 --batch 50 --url http://localhost:8000/api
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCHEMA = """
+create table threat_logs (
+    id integer primary key autoincrement not null,
+    event_id varchar(64),
+    ip_address varchar not null,
+    geo_location varchar,
+    attack_signature varchar not null,
+    attack_type varchar not null,
+    risk_score integer not null,
+    ai_analysis text,
+    metadata text,
+    created_at datetime,
+    updated_at datetime
+);
+create unique index threat_logs_event_id_unique on threat_logs (event_id);
+create index threat_logs_ip_address_index on threat_logs (ip_address);
+create index threat_logs_attack_type_index on threat_logs (attack_type);
+create index threat_logs_created_at_index on threat_logs (created_at);
+create table jobs (
+    id integer primary key autoincrement not null,
+    queue varchar not null,
+    payload text not null,
+    attempts integer not null,
+    reserved_at integer,
+    available_at integer not null,
+    created_at integer not null
+);
+create index jobs_queue_index on jobs (queue);
+"""
+
+COLUMNS = ("event_id", "ip_address", "geo_location", "attack_signature", "attack_type", "risk_score",
+           "ai_analysis", "metadata", "created_at", "updated_at")
+INSERT_CHUNK = 90   # ThreatController::INSERT_CHUNK
+JOB_PAYLOAD = "x" * 900  # Serialized broadcast job holding a model identifier
+
+
+def make_payload(i):
+    return {
+        "ip_address": f"203.0.{i // 250 % 250}.{i % 250 + 1}",
+        "geo_location": "Global Web",
+        "attack_signature": "SQL_INJECTION_ATTEMPT",
+        "attack_type": "sql_injection",
+        "risk_score": 85,
+        "ai_analysis": "[PRO] SQL injection attempt found in HTTP headers.",
+        "metadata": json.dumps({"matched_pattern": "(\\'.*or.*\\'.*=.*\\')",
+                                "raw_payload": bytes(range(200)).hex(' ')}),
+        "event_id": uuid.uuid4().hex,
+    }
+
+
+def row(payload, now):
+    return (payload["event_id"], payload["ip_address"], payload["geo_location"], payload["attack_signature"],
+            payload["attack_type"], payload["risk_score"], payload["ai_analysis"], payload["metadata"], now, now)
+
+
+class Replay:
+    """The SQL each endpoint issues, on an autocommit connection like PDO's."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.executescript(SCHEMA)
+        self.statements = 0
+        self.commits = 0
+
+    def execute(self, sql, params=()):
+        self.statements += 1
+        return self.db.execute(sql, params).fetchall()
+
+    def queue_broadcast(self, payload=JOB_PAYLOAD):
+        now = int(time.time())
+        self.execute("insert into jobs (queue, payload, attempts, available_at, created_at) values (?, ?, 0, ?, ?)",
+                     ("default", payload, now, now))
+        self.commits += 1
+
+    def insert(self, rows):
+        placeholders = ", ".join(["(" + ", ".join("?" * len(COLUMNS)) + ")"] * len(rows))
+        self.execute(f"insert or ignore into threat_logs ({', '.join(COLUMNS)}) values {placeholders}",
+                     [value for r in rows for value in r])
+
+    def store(self, payload):
+        """POST /api/threats: firstOrCreate in autocommit, then one queued broadcast."""
+        self.execute("select * from threat_logs where event_id = ? limit 1", (payload["event_id"],))
+        self.insert([row(payload, time.strftime("%Y-%m-%d %H:%M:%S"))])
+        self.commits += 1
+        self.queue_broadcast()
+
+    def store_batch_rows(self, payloads):
+        """The previous POST /api/threats/batch: firstOrCreate per threat in one transaction, a broadcast each."""
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.execute("begin")
+        for payload in payloads:
+            self.execute("select * from threat_logs where event_id = ? limit 1", (payload["event_id"],))
+            self.insert([row(payload, now)])
+        self.execute("commit")
+        self.commits += 1
+        for _ in payloads:
+            self.queue_broadcast()
+
+    def store_batch(self, payloads):
+        """POST /api/threats/batch: one lookup, multi-row inserts, one read-back, one transaction, one broadcast."""
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        ids = [p["event_id"] for p in payloads]
+        marks = ", ".join("?" * len(ids))
+        self.execute("begin")
+        existing = {r[0] for r in self.execute(f"select event_id from threat_logs where event_id in ({marks})", ids)}
+        rows = [row(p, now) for p in payloads if p["event_id"] not in existing]
+        for start in range(0, len(rows), INSERT_CHUNK):
+            self.insert(rows[start:start + INSERT_CHUNK])
+        self.execute(f"select * from threat_logs where event_id in ({marks}) order by id", ids)
+        self.execute("commit")
+        self.commits += 1
+        self.queue_broadcast(JOB_PAYLOAD + "," * 10 * len(rows))
+
+    def count(self):
+        return self.db.execute("select count(*) from threat_logs").fetchone()[0]
+
+
+def replay(mode, payloads, batch, path):
+    db = Replay(path)
+    start = time.perf_counter()
+    if mode == "per-request":
+        for payload in payloads:
+            db.store(payload)
+    else:
+        send = db.store_batch if mode == "bulk batch" else db.store_batch_rows
+        for i in range(0, len(payloads), batch):
+            send(payloads[i:i + batch])
+    elapsed = time.perf_counter() - start
+    return elapsed, db.count(), db.statements, db.commits
+
+
+def stored_total(url):
+    try:
+        return requests.get(f"{url}/threats/stats", timeout=30).json()["stats"]["total_threats"]
+    except (requests.RequestException, ValueError, KeyError):
+        return None
+
+
+def drive(mode, payloads, batch, url, concurrency):
+    """POST the threats to a running backend from `concurrency` keep-alive sessions."""
+    local = threading.local()
+
+    def post(item):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        session = local.session
+        if mode == "per-request":
+            response = session.post(f"{url}/threats", json=item, timeout=60)
+        else:
+            response = session.post(f"{url}/threats/batch", json={"threats": item}, timeout=60)
+        return response.status_code < 300
+
+    items = payloads if mode == "per-request" else [payloads[i:i + batch] for i in range(0, len(payloads), batch)]
+    before = stored_total(url)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        failed = sum(not ok for ok in pool.map(post, items))
+    elapsed = time.perf_counter() - start
+    after = stored_total(url)
+    stored = after - before if before is not None and after is not None else None
+    return elapsed, stored, len(items), failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threats', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=50, help="threats per batch request (API_BATCH_SIZE)")
+    parser.add_argument('--url', help="API base of a running backend, e.g. http://localhost:8000/api")
+    parser.add_argument('--concurrency', type=int, default=4, help="parallel HTTP clients (--url only)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    modes = ("per-request", "row batch", "bulk batch")
+    if args.url:
+        print(f"{args.threats} threats to {args.url}, batches of {args.batch}, {args.concurrency} clients")
+        print(f"{'mode':<12} {'seconds':>8} {'threats/s':>10} {'stored':>7} {'requests':>9} {'failed':>7}")
+        for mode in ("per-request", "bulk batch"):
+            payloads = [make_payload(i) for i in range(args.threats)]
+            elapsed, stored, sent, failed = drive(mode, payloads, args.batch, args.url, args.concurrency)
+            print(f"{mode:<12} {elapsed:>8.2f} {args.threats / elapsed:>10,.0f} {stored if stored is not None else '?':>7} "
+                  f"{sent:>9} {failed:>7}")
+        return
+
+    print(f"{args.threats} threats replayed against SQLite, batches of {args.batch}")
+    print(f"{'mode':<12} {'seconds':>8} {'threats/s':>10} {'stored':>7} {'statements':>11} {'commits':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            payloads = [make_payload(i) for i in range(args.threats)]
+            elapsed, stored, statements, commits = replay(mode, payloads, args.batch,
+                                                          os.path.join(tmp, f"{mode.replace(' ', '-')}.sqlite"))
+            print(f"{mode:<12} {elapsed:>8.2f} {args.threats / elapsed:>10,.0f} {stored:>7} {statements:>11} "
+                  f"{commits:>8}")
+
+
+if __name__ == "__main__":
+    main()
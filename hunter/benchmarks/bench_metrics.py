@@ -0,0 +1,54 @@
+"""
+Instrumentation Overhead Benchmark
+Detector throughput with no timing, sampled timing and per-packet timing
+
+Usage (from the hunter directory):
+    python benchmarks/bench_metrics.py --packets 50000 --sample-rate 64
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detectors import summarize, DetectorPipeline
+from metrics import MetricsRegistry
+from bench_sharding import build_packets
+
+
+def run(summaries, sample_rate):
+    pipeline = DetectorPipeline()
+    registry = MetricsRegistry()
+
+    def observe(name, seconds):
+        registry.observe("sentinel_detector_seconds", seconds, name)
+
+    start = time.perf_counter()
+    for seen, summary in enumerate(summaries, 1):
+        sampled = sample_rate and seen % sample_rate == 0
+        pipeline.analyze(summary, observe if sampled else None)
+    return len(summaries) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--packets', type=int, default=50000)
+    parser.add_argument('--sample-rate', type=int, default=64)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    summaries = [summarize(p) for p in build_packets(args.packets, 5000)]
+
+    modes = [("off", 0), (f"1 in {args.sample_rate}", args.sample_rate), ("every packet", 1)]
+    best = {name: max(run(summaries, rate) for _ in range(args.rounds)) for name, rate in modes}
+    baseline = best["off"]
+    for name, rate in best.items():
+        print(f"{name:<14}{rate:>12,.0f} pkts/sec  overhead {(baseline / rate - 1) * 100:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
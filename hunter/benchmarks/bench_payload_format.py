@@ -0,0 +1,105 @@
+"""
+Forensic Payload Formatting Benchmark
+Measures sniff-callback cost per threat with the old eager hex dump versus
+bytes-by-reference, and the deferred rendering cost at delivery
+
+Usage (from the hunter directory):
+    python benchmarks/bench_payload_format.py --threats 50000 --size 1400
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import binascii
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import PacketSummary, DetectorPipeline, extract_raw_payload, render_metadata
+
+
+def eager_hex_dump(summary):
+    """The old extract_raw_payload: hexlify then join pairs with a list comprehension."""
+    if summary.payload is not None:
+        hex_data = binascii.hexlify(summary.payload[:config.MAX_PAYLOAD_SIZE]).decode('utf-8')
+        return " ".join(hex_data[i:i+2] for i in range(0, len(hex_data), 2))
+    return "No raw payload data (Header only)"
+
+
+def build_summaries(count, size):
+    """SQLi requests padded with headers to `size` bytes, each on its own flow."""
+    rng = random.Random(8)
+    summaries = []
+    for i in range(count):
+        request = f"GET /item?id={rng.randint(1, 9999)}' OR '1'='1 HTTP/1.1\r\nHost: shop.local\r\n"
+        padding = "X-Trace: " + "a" * max(0, size - len(request) - 13) + "\r\n\r\n"
+        summary = PacketSummary()
+        summary.src_ip = f"198.51.100.{i % 250 + 1}"
+        summary.dst_ip = "10.0.0.5"
+        summary.sport = 1024 + i % 60000
+        summary.dport = 80
+        summary.tcp_flags = 0x18
+        summary.payload = (request + padding).encode()
+        summary.timestamp = 1_000_000.0 + i
+        summaries.append(summary)
+    return summaries
+
+
+def callback_cost(pipeline, summaries, attach):
+    """Seconds per packet for detection plus attaching forensic data to each threat."""
+    config.CAPTURE_RAW_PAYLOAD = False  # attach() below stands in for the pipeline's own step
+    start = time.perf_counter()
+    for summary in summaries:
+        threats = pipeline.analyze(summary)
+        if threats:
+            raw = attach(summary)
+            for threat in threats:
+                threat['metadata']['raw_payload'] = raw
+    return (time.perf_counter() - start) / len(summaries)
+
+
+def attach_cost(summaries, attach):
+    start = time.perf_counter()
+    for summary in summaries:
+        attach(summary)
+    return (time.perf_counter() - start) / len(summaries)
+
+
+def delivery_cost(metadata, count, encoding):
+    config.RAW_PAYLOAD_ENCODING = encoding
+    start = time.perf_counter()
+    for _ in range(count):
+        body = json.dumps(render_metadata(metadata))
+    return (time.perf_counter() - start) / count, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threats', type=int, default=50000)
+    parser.add_argument('--size', type=int, default=1400, help="payload bytes per packet")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    config.REASSEMBLY_ENABLED = False
+    summaries = build_summaries(args.threats, args.size)
+
+    print(f"{args.threats} malicious packets, {args.size}-byte payloads, MAX_PAYLOAD_SIZE={config.MAX_PAYLOAD_SIZE}")
+    print(f"{'hot path':<20} {'attach us':>10} {'callback us':>12}")
+    for name, attach in (("eager hex dump", eager_hex_dump), ("bytes reference", extract_raw_payload)):
+        per_attach = attach_cost(summaries, attach)
+        per_callback = callback_cost(DetectorPipeline(), summaries, attach)
+        print(f"{name:<20} {per_attach * 1e6:>10.2f} {per_callback * 1e6:>12.2f}")
+
+    metadata = {"matched_rule": "sql_injection:2", "raw_payload": extract_raw_payload(summaries[0])}
+    print(f"\n{'delivery render':<20} {'us/threat':>10} {'JSON bytes':>12}")
+    for encoding in ("hex", "base64"):
+        per_threat, size = delivery_cost(metadata, 20000, encoding)
+        print(f"{encoding:<20} {per_threat * 1e6:>10.2f} {size:>12}")
+
+
+if __name__ == "__main__":
+    main()
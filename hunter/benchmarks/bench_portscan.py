@@ -0,0 +1,127 @@
+"""
+Port Scan State Benchmark
+Floods the old deque-per-IP tracker and the bounded PortScanDetector with SYNs from spoofed sources
+
+Usage (from the hunter directory):
+    python benchmarks/bench_portscan.py --sources 1000000 --scanners 20
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tracemalloc
+from threading import Lock
+from collections import defaultdict, deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import PacketSummary, PortScanDetector
+
+
+class LegacyPortScanDetector:
+    """The pre-bounded behaviour: a deque of (time, port) per IP, and IPs that alerted are never forgotten."""
+
+    def __init__(self):
+        self.syn_tracker = defaultdict(deque)
+        self.lock = Lock()
+        self.threshold = config.PORT_SCAN_THRESHOLD
+        self.window = config.PORT_SCAN_WINDOW
+        self.detected_ips = set()
+
+    def analyze(self, summary):
+        flags = summary.tcp_flags
+        if not (flags & 0x02 and not (flags & 0x10)):
+            return None
+        src_ip = summary.src_ip
+        current_time = summary.timestamp
+        with self.lock:
+            tracker = self.syn_tracker[src_ip]
+            tracker.append((current_time, summary.dport))
+            while tracker and current_time - tracker[0][0] > self.window:
+                tracker.popleft()
+            if len(tracker) >= self.threshold and src_ip not in self.detected_ips:
+                self.detected_ips.add(src_ip)
+                return {"ip_address": src_ip, "unique_ports": len(set(p for _, p in tracker))}
+        return None
+
+
+def build_flood(sources, scanners, rate):
+    """
+    One SYN from each of `sources` spoofed addresses at `rate` packets/sec,
+    with `scanners` real scanners sweeping 100 ports each mixed in.
+    """
+    rng = random.Random(7)
+    summaries = []
+
+    def syn(src, dport, ts):
+        summary = PacketSummary()
+        summary.src_ip = src
+        summary.dst_ip = "10.0.0.5"
+        summary.sport = 40000
+        summary.dport = dport
+        summary.tcp_flags = 0x02
+        summary.timestamp = ts
+        return summary
+
+    scan_every = max(1, sources // (scanners * 100 or 1))
+    scanner_ips = [f"192.168.{i // 250}.{i % 250 + 1}" for i in range(scanners)]
+    scan_ports = {ip: 0 for ip in scanner_ips}
+    for i in range(sources):
+        ts = 1_000_000.0 + i / rate
+        summaries.append(syn("%d.%d.%d.%d" % (11 + (i >> 24), (i >> 16) & 255, (i >> 8) & 255, i & 255),
+                             rng.randint(1, 65535), ts))
+        if scanners and i % scan_every == 0:
+            ip = scanner_ips[(i // scan_every) % scanners]
+            if scan_ports[ip] < 100:
+                scan_ports[ip] += 1
+                summaries.append(syn(ip, scan_ports[ip], ts))
+    return summaries
+
+
+def run(factory, summaries):
+    """Timed pass for throughput, then a second traced pass for memory (tracemalloc skews timing)."""
+    detector = factory()
+    alerts = 0
+    start = time.perf_counter()
+    for summary in summaries:
+        if detector.analyze(summary):
+            alerts += 1
+    elapsed = time.perf_counter() - start
+    del detector
+
+    tracemalloc.start()
+    detector = factory()
+    for summary in summaries:
+        detector.analyze(summary)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current, peak, alerts, detector
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sources', type=int, default=1_000_000)
+    parser.add_argument('--scanners', type=int, default=20)
+    parser.add_argument('--rate', type=float, default=50000, help="flood packets/sec (sets timestamps)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    summaries = build_flood(args.sources, args.scanners, args.rate)
+    print(f"{len(summaries)} SYNs from {args.sources} spoofed sources + {args.scanners} scanners "
+          f"(cap {config.PORT_SCAN_MAX_TRACKED} IPs)")
+    print(f"{'tracker':<10} {'pkts/sec':>12} {'retained MB':>12} {'peak MB':>10} {'tracked IPs':>12} {'alerts':>8}")
+
+    for name, factory in (("legacy", LegacyPortScanDetector), ("bounded", PortScanDetector)):
+        elapsed, current, peak, alerts, detector = run(factory, summaries)
+        tracked = len(detector.syn_tracker) if name == "legacy" else len(detector.state)
+        print(f"{name:<10} {len(summaries) / elapsed:>12,.0f} {current / 1e6:>12.1f} {peak / 1e6:>10.1f} "
+              f"{tracked:>12,} {alerts:>8}")
+        del detector
+
+
+if __name__ == "__main__":
+    main()
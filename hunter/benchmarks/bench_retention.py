@@ -0,0 +1,215 @@
+"""
+Threat Retention Benchmark
+Query latency on a seeded SQLite threat_logs before and after threats:prune moves old days to gzip JSONL archives
+
+Seeds --rows threats at a steady rate over --days of history, times the queries
+that still read threat_logs (recent, feed, map, the old stats aggregates, an
+IP lookup), then replays ThreatArchive::pruneBefore: every whole day older than
+--retention is streamed by id to a gzip'd JSONL file, summarized into
+threat_archives and deleted in id slices. The same queries are timed again.
+
+Usage (from the hunter directory):
+    python benchmarks/bench_retention.py --rows 1000000
+    python benchmarks/bench_retention.py --rows 10000000 --days 90 --retention 7
+"""
+
+import os
+import sys
+import gzip
+import calendar
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_ingest import SCHEMA, COLUMNS
+
+ARCHIVE_SCHEMA = """
+create table threat_archives (
+    id integer primary key autoincrement not null,
+    day date not null,
+    path varchar not null,
+    first_id integer not null,
+    last_id integer not null,
+    count integer not null,
+    bytes integer not null,
+    unique_ips integer not null,
+    max_risk integer not null,
+    by_type text not null,
+    by_risk text not null,
+    top_ips text not null,
+    created_at datetime,
+    updated_at datetime
+);
+create index threat_archives_day_index on threat_archives (day);
+"""
+
+TYPES = {"port_scan": 75, "arp_spoof": 95, "sql_injection": 85, "xss_attempt": 70, "honeypot_trap": 90}
+PRUNE_CHUNK = 2000  # config('threats.prune_chunk')
+TOP_IPS = 10        # ThreatArchive::TOP_IPS
+
+QUERIES = {
+    "recent 100": ("select * from threat_logs order by created_at desc limit 100", ()),
+    "feed since_id": ("select id, ip_address, attack_type, risk_score, created_at from threat_logs "
+                      "where id > (select max(id) - 50 from threat_logs) order by id limit 101", ()),
+    "map": ("select geo_location, ip_address, max(risk_score) as max_risk, count(*) as count from threat_logs "
+            "where geo_location is not null and geo_location not in "
+            "('Unknown Location', 'Local Network', 'Secure Network (Local)') group by geo_location, ip_address", ()),
+    "stats count": ("select count(*) from threat_logs", ()),
+    "stats by type": ("select attack_type, count(*) from threat_logs group by attack_type", ()),
+    "stats top ips": ("select ip_address, count(*) as count from threat_logs group by ip_address "
+                      "order by count desc limit 10", ()),
+    "stats high risk": ("select count(*) from threat_logs where risk_score >= 70", ()),
+    "ip lookup": ("select * from threat_logs where ip_address = ? order by created_at desc limit 50", ("203.0.7.7",)),
+}
+
+GEO = ("Global Web", "Frankfurt, DE", "Ashburn, US", "Singapore, SG", "Unknown Location", "Local Network")
+
+
+def band(score):
+    return "critical" if score >= 90 else "high" if score >= 70 else "medium" if score >= 40 else "low"
+
+
+def seed(db, rows, days, now):
+    """Rows at a steady rate, oldest first, in transactions of 9000."""
+    span = days * 86400
+    names = list(TYPES)
+    start = now - span
+    for first in range(0, rows, 9000):
+        batch = []
+        for i in range(first, min(first + 9000, rows)):
+            kind = names[i % len(names)]
+            at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * span // rows))
+            metadata = json.dumps({"matched_pattern": "SYN_SCAN", "ports": [22, 80, 443, 8080][:i % 4 + 1],
+                                   "raw_payload": random.randbytes(24).hex(" ")})
+            batch.append((f"{i:032x}", f"203.0.{random.randrange(250)}.{random.randrange(1, 251)}", GEO[i % len(GEO)],
+                           kind.upper() + "_DETECTED", kind, min(TYPES[kind] + random.randint(-10, 10), 100),
+                           "Mock analysis.", metadata, at, at))
+        db.execute("begin")
+        marks = ", ".join("?" * len(COLUMNS))
+        db.executemany(f"insert into threat_logs ({', '.join(COLUMNS)}) values ({marks})", batch)
+        db.execute("commit")
+
+
+def timed(db, repeat):
+    """Median milliseconds per query."""
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            db.execute(sql, params).fetchall()
+            runs.append((time.perf_counter() - start) * 1000)
+        results[name] = statistics.median(runs)
+    return results
+
+
+def archive_day(db, day, next_day, directory):
+    """ThreatArchive::archiveDay: stream by id to gzip JSONL, summarize, commit the summary, delete in id slices."""
+    local = os.path.join(directory, f"threats-{day[:10]}.jsonl.gz")
+    summary = {"count": 0, "max_risk": 0, "by_type": {}, "by_risk": {}}
+    ips = {}
+    first_id = last_id = None
+    cursor = 0
+    with gzip.open(local, "wt", compresslevel=6) as gz:
+        while True:
+            # lazyById: id-ordered pages of PRUNE_CHUNK
+            page = db.execute(f"select id, {', '.join(COLUMNS)} from threat_logs where created_at >= ? "
+                              f"and created_at < ? and id > ? order by id limit {PRUNE_CHUNK}",
+                              (day, next_day, cursor)).fetchall()
+            if not page:
+                break
+            for r in page:
+                threat = dict(zip(("id",) + COLUMNS, r))
+                threat["metadata"] = json.loads(threat["metadata"]) if threat["metadata"] else None
+                gz.write(json.dumps(threat) + "\n")
+                first_id = first_id or threat["id"]
+                last_id = threat["id"]
+                summary["count"] += 1
+                summary["max_risk"] = max(summary["max_risk"], threat["risk_score"])
+                summary["by_type"][threat["attack_type"]] = summary["by_type"].get(threat["attack_type"], 0) + 1
+                risk = band(threat["risk_score"])
+                summary["by_risk"][risk] = summary["by_risk"].get(risk, 0) + 1
+                ips[threat["ip_address"]] = ips.get(threat["ip_address"], 0) + 1
+            cursor = page[-1][0]
+    if not summary["count"]:
+        os.unlink(local)
+        return 0, 0
+    top = dict(sorted(ips.items(), key=lambda item: -item[1])[:TOP_IPS])
+    size = os.path.getsize(local)
+    db.execute("insert into threat_archives (day, path, first_id, last_id, count, bytes, unique_ips, max_risk, "
+               "by_type, by_risk, top_ips) values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+               (day, local, first_id, last_id, summary["count"], size, len(ips), summary["max_risk"],
+                json.dumps(summary["by_type"]), json.dumps(summary["by_risk"]), json.dumps(top)))
+    for start in range(first_id - 1, last_id, PRUNE_CHUNK):
+        db.execute("delete from threat_logs where created_at >= ? and created_at < ? and id > ? and id <= ?",
+                   (day, next_day, start, min(start + PRUNE_CHUNK, last_id)))
+    return summary["count"], size
+
+
+def prune(db, cutoff, directory):
+    oldest = db.execute("select min(created_at) from threat_logs where created_at < ?", (cutoff,)).fetchone()[0]
+    archived = size = files = 0
+    if oldest is None:
+        return archived, size, files
+    day = calendar.timegm(time.strptime(oldest[:10], "%Y-%m-%d"))
+    while True:
+        start = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(day))
+        if start >= cutoff:
+            break
+        end = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(day + 86400))
+        count, written = archive_day(db, start, end, directory)
+        archived += count
+        size += written
+        files += bool(count)
+        day += 86400
+    return archived, size, files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=90, help="history the rows are spread over")
+    parser.add_argument('--retention', type=int, default=7, help="whole days kept in threat_logs")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    random.seed(7)
+    now = int(time.time())
+    cutoff = time.strftime("%Y-%m-%d 00:00:00", time.gmtime(now - args.retention * 86400))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "threats.sqlite")
+        db = sqlite3.connect(path, isolation_level=None)
+        db.executescript(SCHEMA + ARCHIVE_SCHEMA)
+
+        start = time.perf_counter()
+        seed(db, args.rows, args.days, now)
+        print(f"seeded {args.rows:,} threats over {args.days} days in {time.perf_counter() - start:.0f}s, "
+              f"{os.path.getsize(path) / 2**20:,.0f} MB")
+        before = timed(db, args.repeat)
+
+        start = time.perf_counter()
+        archived, archive_bytes, files = prune(db, cutoff, tmp)
+        elapsed = time.perf_counter() - start
+        hot = db.execute("select count(*) from threat_logs").fetchone()[0]
+        free = db.execute("pragma freelist_count").fetchone()[0] * db.execute("pragma page_size").fetchone()[0]
+        print(f"pruned to {args.retention} days: {archived:,} threats to {files} archives "
+              f"({archive_bytes / 2**20:,.0f} MB gzip) in {elapsed:.0f}s ({archived / elapsed:,.0f} threats/s); "
+              f"{hot:,} hot rows, {free / 2**20:,.0f} MB of pages free for reuse")
+        after = timed(db, args.repeat)
+
+    print(f"\n{'query':<16} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+    for name in QUERIES:
+        print(f"{name:<16} {before[name]:>10.2f} {after[name]:>9.2f} {before[name] / max(after[name], 1e-3):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Sharded Capture Benchmark
+Measures packets/sec through the detectors inline and with 1..N shard processes
+
+Usage (from the hunter directory):
+    python benchmarks/bench_sharding.py --packets 50000 --shards 1 2 4 8
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import Ether, IP, TCP, ARP, Raw
+from detectors import summarize, DetectorPipeline
+from sharding import ShardedCapture
+
+
+def build_packets(count, sources):
+    """Mixed traffic: mostly SYNs from many sources, some HTTP payloads and ARP."""
+    rng = random.Random(1337)
+    ips = [f"{rng.randint(1, 223)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+           for _ in range(sources)]
+    bodies = [
+        b"GET /index.html HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+        b"GET /?id=1' OR '1'='1 HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+        b"GET /?q=<script>alert(1)</script> HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+    ]
+    packets = []
+    for _ in range(count):
+        roll = rng.random()
+        src = rng.choice(ips)
+        if roll < 0.80:
+            pkt = Ether() / IP(src=src, dst="10.0.0.5") / TCP(sport=rng.randint(1024, 65535),
+                                                            dport=rng.randint(1, 1024), flags="S")
+        elif roll < 0.95:
+            pkt = (Ether() / IP(src=src, dst="10.0.0.5") / TCP(sport=rng.randint(1024, 65535), dport=80, flags="PA")
+                   / Raw(rng.choice(bodies)))
+        else:
+            pkt = Ether() / ARP(op=2, psrc=src, hwsrc="de:ad:be:ef:%02x:%02x" % (rng.randint(0, 255), rng.randint(0, 255)))
+        packets.append(pkt)
+    return packets
+
+
+def bench_inline(packets):
+    pipeline = DetectorPipeline()
+    threats = 0
+    start = time.perf_counter()
+    for pkt in packets:
+        threats += len(pipeline.analyze(summarize(pkt)))
+    return time.perf_counter() - start, threats
+
+
+def bench_sharded(packets, shards):
+    found = []
+    capture = ShardedCapture(found.append, shards, block_when_full=True)
+    capture.start()
+    start = time.perf_counter()
+    for pkt in packets:
+        capture.submit(pkt)
+    capture.stop()
+    return time.perf_counter() - start, len(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--packets', type=int, default=50000)
+    parser.add_argument('--sources', type=int, default=5000)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 4])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    packets = build_packets(args.packets, args.sources)
+
+    elapsed, threats = bench_inline(packets)
+    baseline = args.packets / elapsed
+    print(f"{'mode':<12}{'pkts/sec':>12}{'speedup':>10}{'threats':>10}")
+    print(f"{'inline':<12}{baseline:>12,.0f}{1.0:>10.2f}{threats:>10}")
+
+    for shards in args.shards:
+        elapsed, threats = bench_sharded(packets, shards)
+        rate = args.packets / elapsed
+        print(f"{f'{shards} shards':<12}{rate:>12,.0f}{rate / baseline:>10.2f}{threats:>10}")
+
+
+if __name__ == "__main__":
+    main()
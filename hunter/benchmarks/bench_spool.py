@@ -0,0 +1,87 @@
+"""
+Threat Spool Benchmark
+Sustained enqueue throughput while the backend stub is offline, then replay
+once it recovers
+
+Usage (from the hunter directory):
+    python benchmarks/bench_spool.py --threats 50000
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import argparse
+import resource
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from spool import ThreatSpool
+from delivery import ThreatDelivery
+from stub_api import StubThreatAPI
+from bench_delivery import make_payload
+
+
+def peak_rss_mb():
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / 1024 if sys.platform != 'darwin' else usage / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threats', type=int, default=50000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    # Fail fast while offline so the benchmark measures the spool, not retry sleeps
+    config.API_RETRY = 1
+    config.API_PENDING_LIMIT = 1000
+
+    directory = tempfile.mkdtemp(prefix="sentinel-spool-")
+    stub = StubThreatAPI().start()
+    stub.set_offline(True)
+
+    spool = ThreatSpool(directory)
+    delivery = ThreatDelivery(batch_url=stub.batch_url,
+                              overflow=lambda payloads: spool.append("delivery", payloads))
+    delivery.start()
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    for i in range(args.threats):
+        delivery.submit(make_payload(i))
+    enqueue_time = time.perf_counter() - start
+    delivery.stop()
+    spool.sync()
+
+    metrics = delivery.metrics()
+    print(f"backend offline : {args.threats / enqueue_time:>10,.0f} threats/sec enqueued")
+    print(f"                  spooled={metrics['spooled']} dropped={metrics['dropped']} "
+          f"disk={spool.metrics()['disk_bytes'] / 1024:,.0f} KiB "
+          f"peak RSS {rss_before:.0f} -> {peak_rss_mb():.0f} MiB")
+
+    # Backend recovers: drain everything through the batch endpoint
+    stub.set_offline(False)
+    config.API_RETRY = 3
+    replayer = ThreatDelivery(batch_url=stub.batch_url)
+
+    def handler(records):
+        return replayer.post_batch([r["item"] for r in records])
+
+    start = time.perf_counter()
+    while spool.replay(handler, config.SPOOL_DRAIN_BATCH * 10):
+        pass
+    drain_time = time.perf_counter() - start
+    print(f"backend online  : {stub.threats / drain_time:>10,.0f} threats/sec replayed "
+          f"({stub.threats}/{args.threats} delivered)")
+
+    spool.close()
+    stub.stop()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Dashboard Stats Benchmark
+GET /api/threats/stats latency as threat_logs grows: GROUP BY over threat_logs vs the rollup counters, on SQLite
+
+Without --url, seeds one SQLite file in steps up to each --rows size at a steady
+--per-minute rate (each step adds older history, so the stats window holds the
+same number of threats at every size), rebuilds threat_rollups/threat_totals the way
+`php artisan threats:rebuild-rollups` does, and times the statements the old
+and new ThreatController::stats issue. With --url, times the endpoint of a
+running backend (seed it first with `php artisan threats:seed`).
+
+Usage (from the hunter directory):
+    python benchmarks/bench_stats.py --rows 100000,1000000
+    python benchmarks/bench_stats.py --rows 10000000 --repeat 3
+    python benchmarks/bench_stats.py --url http://localhost:8000/api
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import tempfile
+import statistics
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_ingest import SCHEMA
+
+ROLLUP_SCHEMA = """
+create table threat_rollups (
+    id integer primary key autoincrement not null,
+    dimension varchar not null,
+    minute datetime not null,
+    value varchar not null,
+    count integer not null
+);
+create unique index threat_rollups_dimension_minute_value_unique on threat_rollups (dimension, minute, value);
+create table threat_totals (
+    id integer primary key autoincrement not null,
+    dimension varchar not null,
+    value varchar not null,
+    count integer not null
+);
+create unique index threat_totals_dimension_value_unique on threat_totals (dimension, value);
+create index threat_totals_dimension_count_index on threat_totals (dimension, count);
+"""
+
+TYPES = {"port_scan": 75, "arp_spoof": 95, "sql_injection": 85, "xss_attempt": 70, "honeypot_trap": 90,
+         "traffic_anomaly": 65}
+MINUTE = "strftime('%Y-%m-%d %H:%M:00', created_at)"
+BAND = ("CASE WHEN risk_score >= 90 THEN 'critical' WHEN risk_score >= 70 THEN 'high' "
+        "WHEN risk_score >= 40 THEN 'medium' ELSE 'low' END")
+
+# The previous ThreatController::stats, with DATE_FORMAT as its SQLite equivalent
+OLD_QUERIES = (
+    "select count(*) from threat_logs",
+    "select count(*) from threat_logs where created_at >= :since",
+    "select attack_type, count(*) as count from threat_logs group by attack_type",
+    "select count(*) from threat_logs where risk_score >= 70",
+    f"select {MINUTE} as minute, count(*) as count from threat_logs where created_at >= :since "
+    "group by minute order by minute",
+    "select ip_address, count(*) as count from threat_logs group by ip_address order by count desc limit 10",
+)
+
+# ThreatController::stats on the counters
+ROLLUP_QUERIES = (
+    "select value as attack_type, count from threat_totals where dimension = 'type' order by count desc",
+    "select minute, sum(count) as count from threat_rollups where dimension = 'type' and minute >= :minute "
+    "group by minute order by minute",
+    "select value as ip_address, count from threat_totals where dimension = 'ip' order by count desc limit 10",
+    "select value as ip_address, sum(count) as count from threat_rollups where dimension = 'ip' "
+    "and minute >= :minute group by value order by count desc limit 10",
+    "select sum(count) from threat_totals where dimension = 'risk' and value in ('high', 'critical')",
+)
+
+
+def seed(db, start, stop, now, per_minute):
+    """Insert rows start..stop-1, row i about i / per_minute minutes old, in transactions of 9000."""
+    names = list(TYPES)
+    for first in range(start, stop, 9000):
+        rows = []
+        for i in range(first, min(first + 9000, stop)):
+            kind = names[i % len(names)]
+            at = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now - i // per_minute * 60 - random.randrange(60)))
+            rows.append((f"{i:032x}", f"203.0.{random.randrange(250)}.{random.randrange(1, 251)}", "Global Web",
+                         kind.upper() + "_DETECTED", kind, min(TYPES[kind] + random.randint(-10, 10), 100), at, at))
+        db.execute("begin")
+        db.executemany("insert into threat_logs (event_id, ip_address, geo_location, attack_signature, attack_type, "
+                       "risk_score, created_at, updated_at) values (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        db.execute("commit")
+
+
+def rebuild(db):
+    """ThreatRollup::rebuild"""
+    db.execute("begin")
+    db.execute("delete from threat_rollups")
+    db.execute("delete from threat_totals")
+    for dimension, value in (("type", "attack_type"), ("ip", "ip_address"), ("risk", BAND)):
+        db.execute(f"insert into threat_rollups (dimension, minute, value, count) "
+                   f"select '{dimension}', {MINUTE}, {value}, count(*) from threat_logs group by 2, 3")
+        db.execute(f"insert into threat_totals (dimension, value, count) select dimension, value, sum(count) "
+                   f"from threat_rollups where dimension = '{dimension}' group by value")
+    db.execute("commit")
+
+
+def record(db, batch, now):
+    """ThreatRollup::record for one ingested batch: two upserts per dimension."""
+    minute = time.strftime("%Y-%m-%d %H:%M:00", time.gmtime(now))
+    counts = {}
+    for kind, ip, risk in batch:
+        band = "critical" if risk >= 90 else "high" if risk >= 70 else "medium" if risk >= 40 else "low"
+        for key in (("type", kind), ("ip", ip), ("risk", band)):
+            counts[key] = counts.get(key, 0) + 1
+    db.execute("begin")
+    db.executemany("insert into threat_rollups (dimension, minute, value, count) values (?, ?, ?, ?) "
+                   "on conflict (dimension, minute, value) do update set count = threat_rollups.count + excluded.count",
+                   [(d, minute, v, c) for (d, v), c in counts.items()])
+    db.executemany("insert into threat_totals (dimension, value, count) values (?, ?, ?) "
+                   "on conflict (dimension, value) do update set count = threat_totals.count + excluded.count",
+                   [(d, v, c) for (d, v), c in counts.items()])
+    db.execute("commit")
+
+
+def timed(db, queries, params, repeat):
+    """Median milliseconds to run every query once."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sql in queries:
+            db.execute(sql, params).fetchall()
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs)
+
+
+def check(db, params):
+    """The counters must agree with threat_logs."""
+    old = db.execute(OLD_QUERIES[0]).fetchone()[0], db.execute(OLD_QUERIES[3]).fetchone()[0]
+    new = (db.execute("select sum(count) from threat_totals where dimension = 'type'").fetchone()[0],
+           db.execute(ROLLUP_QUERIES[4]).fetchone()[0])
+    recent = db.execute(OLD_QUERIES[1], params).fetchone()[0]
+    windowed = db.execute("select sum(count) from threat_rollups where dimension = 'type' and minute >= :minute",
+                          params).fetchone()[0]
+    return old == new and recent <= windowed
+
+
+def bench_url(url, repeat):
+    session = requests.Session()
+    print(f"GET {url}/threats/stats, {repeat} requests")
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = session.get(f"{url}/threats/stats", timeout=120)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    total = response.json()["stats"]["total_threats"]
+    latencies.sort()
+    print(f"{'threats':>12} {'median ms':>10} {'p95 ms':>8} {'max ms':>8}")
+    print(f"{total:>12,} {statistics.median(latencies):>10.1f} {latencies[int(len(latencies) * 0.95)]:>8.1f} "
+          f"{latencies[-1]:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', default="100000,1000000", help="comma-separated threat_logs sizes")
+    parser.add_argument('--per-minute', type=int, default=100, help="threats stored per minute of history")
+    parser.add_argument('--minutes', type=int, default=60, help="stats window (?minutes=)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--batch', type=int, default=50, help="threats per ingested batch for the upkeep column")
+    parser.add_argument('--url', help="API base of a running backend, e.g. http://localhost:8000/api")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    if args.url:
+        bench_url(args.url, max(args.repeat, 20))
+        return
+
+    random.seed(7)
+    sizes = sorted(int(n) for n in args.rows.split(","))
+    now = int(time.time())
+    since = now - args.minutes * 60
+    params = {"since": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(since)),
+              "minute": time.strftime("%Y-%m-%d %H:%M:00", time.gmtime(since))}
+
+    print(f"stats over the last {args.minutes} minutes, {args.per_minute} threats/minute, median of {args.repeat}")
+    print(f"{'rows':>11} {'group by ms':>12} {'rollups ms':>11} {'speedup':>8} {'rollup rows':>12} "
+          f"{'upkeep ms':>10} {'rebuild s':>10} {'match':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = sqlite3.connect(os.path.join(tmp, "stats.sqlite"), isolation_level=None)
+        db.executescript(SCHEMA + ROLLUP_SCHEMA)
+        seeded = 0
+        for size in sizes:
+            seed(db, seeded, size, now, args.per_minute)
+            seeded = size
+
+            start = time.perf_counter()
+            rebuild(db)
+            rebuild_s = time.perf_counter() - start
+
+            old_ms = timed(db, OLD_QUERIES, params, args.repeat)
+            new_ms = timed(db, ROLLUP_QUERIES, params, args.repeat)
+            rollup_rows = db.execute("select count(*) from threat_rollups").fetchone()[0]
+            matches = check(db, params)
+
+            batch = [(kind, f"198.51.100.{i % 250 + 1}", TYPES[kind])
+                     for i, kind in zip(range(args.batch), list(TYPES) * args.batch)]
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                record(db, batch, now)
+            upkeep_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+            print(f"{size:>11,} {old_ms:>12.1f} {new_ms:>11.2f} {old_ms / new_ms:>7.0f}x {rollup_rows:>12,} "
+                  f"{upkeep_ms:>10.2f} {rebuild_s:>10.1f} {'yes' if matches else 'NO':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Fake Model Server
+Local stand-in for the Gemini generateContent endpoint, for exercising AI analysis offline
+
+Usage (from the hunter directory):
+    python benchmarks/fake_model.py --port 8090 --latency 0.5
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeModelServer:
+    """
+    Answers any POST with a generateContent-shaped response and counts calls.
+    latency adds a per-call delay (model think time), fail_rate answers
+    that fraction of calls with 503.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1beta/models/fake:generateContent"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with fake.lock:
+                    fake.calls += 1
+                    call = fake.calls
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                if random.random() < fake.fail_rate:
+                    with fake.lock:
+                        fake.failures += 1
+                    return self._reply(503, {"error": {"code": 503, "message": "overloaded"}})
+
+                prompt = body["contents"][0]["parts"][0]["text"]
+                attack = next((line.split(": ", 1)[1] for line in prompt.splitlines()
+                               if line.startswith("Attack type: ")), "unknown")
+                text = f"[fake #{call}] {attack} activity observed; isolate the source and review logs."
+                self._reply(200, {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}]})
+
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeModelServer(port=args.port, latency=args.latency, fail_rate=args.fail_rate).start()
+    print(f"Fake model listening on {fake.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"calls={fake.calls} failures={fake.failures}")
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
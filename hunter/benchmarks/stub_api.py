@@ -0,0 +1,139 @@
+"""
+Stub Threat API
+Local stand-in for the Laravel endpoints, for exercising delivery without a backend
+
+Usage (from the hunter directory):
+    python benchmarks/stub_api.py --port 8000 --latency 0.005
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubThreatAPI:
+    """
+    Accepts POST /api/threats, /api/threats/batch and /api/threats/analysis
+    and counts what arrives.
+    latency adds a per-request delay, fail_rate answers that fraction of
+    requests with 503, and set_offline(True) makes the server refuse work.
+    Like the Laravel validator, a batch with a non-integer risk_score is
+    answered with 422.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_rate=0.0):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.offline = False
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.threats = 0
+        self.updates = 0
+        self.failures = 0
+        self.rejections = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/threats"
+
+    @property
+    def batch_url(self):
+        return self.url + "/batch"
+
+    @property
+    def analysis_url(self):
+        return self.url + "/analysis"
+
+    def set_offline(self, offline):
+        self.offline = offline
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if stub.offline or random.random() < stub.fail_rate:
+                    with stub.lock:
+                        stub.failures += 1
+                    return self._reply(503, {"success": False})
+
+                data = json.loads(body or b"{}")
+                if self.path.endswith("/analysis"):
+                    with stub.lock:
+                        stub.requests += 1
+                        stub.updates += len(data.get("threats", []))
+                    return self._reply(200, {"success": True, "updated": len(data.get("threats", []))})
+                if self.path.endswith("/batch"):
+                    invalid = [f"threats.{i}.risk_score" for i, threat in enumerate(data.get("threats", []))
+                               if type(threat.get("risk_score")) is not int]
+                    if invalid:
+                        with stub.lock:
+                            stub.rejections += 1
+                        return self._reply(422, {"success": False, "errors": {key: ["must be an integer."]
+                                                                              for key in invalid}})
+                    count = len(data.get("threats", []))
+                elif self.path.endswith("/threats"):
+                    count = 1
+                else:
+                    return self._reply(404, {"success": False})
+
+                with stub.lock:
+                    stub.requests += 1
+                    stub.threats += count
+                self._reply(201, {"success": True, "count": count})
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    stub = StubThreatAPI(port=args.port, latency=args.latency, fail_rate=args.fail_rate).start()
+    print(f"Stub threat API listening on {stub.url}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"requests={stub.requests} threats={stub.threats} failures={stub.failures}")
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,63 @@ Adjust thresholds and API settings here
 # Network Configuration
 NETWORK_INTERFACE = None  # None = auto-detect, or specify like "eth0" or "Ethernet"
 PROMISCUOUS_MODE = True
+BPF_PREFILTER = True  # Only copy packets the enabled detectors need out of the kernel
 
 # Detection Thresholds
 PORT_SCAN_THRESHOLD = 20  # SYN packets per second from single IP
 PORT_SCAN_WINDOW = 10  # Time window in seconds
+PORT_SCAN_BUCKETS = 10              # Time buckets the window is split into
+PORT_SCAN_MAX_TRACKED = 50000       # Source IPs tracked before least-recently-seen are evicted
+PORT_SCAN_SKETCH_BITS = 1024        # Bitmap size for the per-IP distinct-port estimate
+PORT_SCAN_ALERT_COOLDOWN = 60       # Seconds before the same IP can raise another port-scan alert
+DETECTOR_STATE_SHARDS = 16          # Independently locked partitions of per-IP detector state
 ARP_CACHE_SIZE = 100  # Max ARP entries to track
 HTTP_INSPECT_DEPTH = 1000  # Max bytes to inspect in HTTP payload
 
+# Traffic Anomaly Detection (per-source baselines, needs numpy)
+ANOMALY_ENABLED = False         # Widens the kernel prefilter to all IP traffic
+ANOMALY_WINDOW = 10             # Seconds of traffic each source is scored over
+ANOMALY_BUCKETS = 10            # Time buckets in the window; every source is scored once per bucket
+ANOMALY_MAX_HOSTS = 100000      # Sources tracked at once (rows of the feature arrays)
+ANOMALY_EWMA_ALPHA = 0.05       # Baseline learning rate per bucket
+ANOMALY_MIN_STD = 0.25          # Std-dev floor in log1p units, so steady sources need a real jump
+ANOMALY_Z_THRESHOLD = 4.0       # Largest feature z-score that raises an alert
+ANOMALY_WARMUP_TICKS = 30       # Buckets a source is observed before it can alert (its window must fill first)
+ANOMALY_MIN_PACKETS = 20        # Packets a source must send in the window before it can alert
+ANOMALY_ALERT_COOLDOWN = 60     # Seconds before the same source can alert again
+ANOMALY_IDLE_TICKS = 300        # Buckets without traffic before a source's row is reused
+ANOMALY_MAX_ALERTS = 100        # Highest-scoring sources reported per bucket
+ANOMALY_BACKGROUND_SCORING = True  # Score closed buckets on a thread, not in the capture callback
+
+# TCP Stream Reassembly (payload inspection across segment boundaries)
+REASSEMBLY_ENABLED = True
+REASSEMBLY_MAX_FLOWS = 10000     # Tracked flows before least-recently-used are evicted
+REASSEMBLY_IDLE_TIMEOUT = 60     # Seconds without traffic before a flow is dropped
+REASSEMBLY_FLOW_BUDGET = 65536   # Bytes inspected per flow before inspection stops
+REASSEMBLY_OVERLAP = 256         # Trailing bytes kept per flow to catch split patterns
+
+# Alert Aggregation (collapse repeats before the threat queue)
+AGGREGATION_ENABLED = True
+AGGREGATION_WINDOW = 2.0       # Seconds repeats of one (ip, type, signature) are collapsed
+AGGREGATION_MAX_GROUPS = 5000  # Open groups before the oldest is flushed early
+AGGREGATION_SAMPLES = 3        # Extra distinct payloads kept per aggregated threat
+
 # 🛡️ IPS (Intrusion Prevention) Settings
-IPS_BLOCKING_ENABLED = True  # Simulation: Log "BLOCKING..." when high-risk
+IPS_BLOCKING_ENABLED = True   # Auto-block high-risk sources through IPS_BACKEND
 IPS_BLOCK_THRESHOLD = 80      # Risk score at which auto-block triggers
+IPS_BACKEND = "dry-run"       # "dry-run" (in-process only), "nftables" or "ipset" (need root)
+IPS_BLOCK_TTL = 3600          # Seconds a source stays blocked
+IPS_COMMIT_INTERVAL = 1.0     # Seconds between batched firewall commits
+IPS_MAX_BLOCKED = 100000      # Block set size; sources beyond it are only monitored
+IPS_EARLY_DROP = IPS_BACKEND != "dry-run"  # Discard packets from firewall-blocked sources before detection
+IPS_ALLOWLIST = ["127.0.0.0/8", "::1/128"]  # Networks that are never blocked
+IPS_EXEMPT_TYPES = ["arp_spoof"]            # ip_address is the impersonated host, not the attacker
+IPS_NFT_TABLE = "sentinel"    # nftables: inet table holding blocked_v4 / blocked_v6
+IPS_IPSET_PREFIX = "sentinel" # ipset: sets <prefix>-v4 / <prefix>-v6
+
+# Rule Reloading (versioned overrides applied while running, see rules.example.json)
+RULES_FILE = "rules.json"       # Watched for changes; None disables reloading
+RULES_RELOAD_INTERVAL = 2.0     # Seconds between checks of the file's modification time
 
 # 🍯 Honeypot (Deception) Settings
 HONEYPOT_ENABLED = True
@@ -41,9 +88,14 @@ XSS_PATTERNS = [
     r"eval\(",
 ]
 
+# GeoIP (offline range database, see geoip.py build)
+GEOIP_DATABASE = "data/geoip.bin"
+GEOIP_CACHE_SIZE = 65536  # Most recently resolved addresses kept in memory
+
 # Forensic Data Capture
 CAPTURE_RAW_PAYLOAD = True
 MAX_PAYLOAD_SIZE = 512  # Bytes to store for forensics
+RAW_PAYLOAD_ENCODING = "hex"  # "hex" (spaced dump shown by the dashboard) or "base64" (smaller)
 
 # Risk Scoring
 RISK_SCORES = {
@@ -52,18 +104,49 @@ RISK_SCORES = {
     "sql_injection": 85,
     "xss_attempt": 70,
     "suspicious_payload": 60,
+    "traffic_anomaly": 65,
 }
 
 # API Configuration
 LARAVEL_API_URL = "http://localhost:8000/api/threats"
+API_BATCH_URL = "http://localhost:8000/api/threats/batch"
 API_TIMEOUT = 5  # seconds
 API_RETRY = 3
+API_RETRY_BACKOFF = 0.5    # Seconds before the first retry, doubled per attempt
+API_BATCH_SIZE = 50        # Max threats per bulk request
+API_BATCH_LATENCY = 0.25   # Max seconds a threat waits for its batch to fill
+API_SENDERS = 2            # Concurrent delivery threads sharing one keep-alive session
+API_PENDING_LIMIT = 5000   # Threats buffered for delivery before new ones are spooled
+API_ANALYSIS_URL = "http://localhost:8000/api/threats/analysis"  # Late AI explanations (AI_NON_BLOCKING)
+
+# Durable Spool (threats that overflow the queue or fail delivery)
+SPOOL_ENABLED = True
+SPOOL_DIR = "spool"
+SPOOL_SEGMENT_BYTES = 4 * 1024 * 1024   # Rotate to a new segment file at this size
+SPOOL_MAX_BYTES = 512 * 1024 * 1024     # Disk cap; threats beyond it are dropped
+SPOOL_FSYNC_EVERY = 200                 # fsync after this many records...
+SPOOL_FSYNC_INTERVAL = 1.0              # ...or this many seconds, whichever first
+SPOOL_DRAIN_BATCH = 50                  # Records replayed per attempt
+SPOOL_DRAIN_RATE = 200                  # Max threats/sec replayed once the API recovers
+SPOOL_DRAIN_INTERVAL = 5                # Seconds between attempts while the API is down
 
 # Gemini AI Configuration (for real integration)
 GEMINI_API_KEY = "YOUR_GEMINI_API_KEY_HERE"  # Replace with actual key
 # AI Analysis Settings
 USE_MOCK_AI = True  # Set to False to use actual Gemini API
 AI_MODEL_NAME = "gemini-1.5-flash"
+AI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+AI_TIMEOUT = 10               # Seconds per model call
+AI_CACHE_SIZE = 1024          # Explanations kept, least recently used evicted first
+AI_CACHE_TTL = 3600           # Seconds an explanation is reused for matching alerts
+AI_CACHE_PAYLOAD_CHARS = 256  # Normalized payload characters that distinguish cache entries
+AI_RATE_LIMIT = 1.0           # Model calls per second (token bucket refill rate); 0 disables them
+AI_RATE_BURST = 5             # Calls allowed back-to-back before the rate applies
+AI_RATE_WAIT = 2.0            # Max seconds to wait for a call slot before using the canned text
+AI_NON_BLOCKING = True        # Ship threats at once; the explanation follows as an update
+AI_WORKERS = 2                # Concurrent model calls in non-blocking mode
+AI_PENDING_LIMIT = 500        # Queued non-blocking requests before falling back to canned text
+AI_PENDING_TEXT = "AI analysis pending..."
 
 # Hackathon / Demo Settings
 SIMULATION_MODE = True  # Set to True if you don't have Npcap/WinPcap installed
@@ -73,7 +156,24 @@ SIMULATION_INTERVAL = 30  # Seconds between simulated threats
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
 LOG_FILE = "sentinel.log"
 
+# Metrics Endpoint
+METRICS_ENABLED = True
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108        # GET /metrics (Prometheus text) and /metrics.json
+METRICS_SAMPLE_RATE = 64   # Time detectors on 1 in N packets; counters still see every packet
+
 # Performance
 MAX_QUEUE_SIZE = 1000
-WORKER_THREADS = 4
+WORKER_THREADS = 4          # Blocking threat processors (ENGINE_MODE = "threads")
 PACKET_BUFFER = 512
+
+# Engine Core
+ENGINE_MODE = "async"             # "async": processors and delivery as coroutines; "threads": WORKER_THREADS
+ASYNC_PROCESSORS = 64             # Concurrent threat-processing coroutines
+ASYNC_DELIVERY_CONCURRENCY = 16   # Batch POSTs in flight at once (connection pool size)
+
+# Capture Sharding (live mode only)
+CAPTURE_SHARDS = 0           # Detector processes; 0 = detect inline in the sniff callback
+SHARD_BATCH_SIZE = 64        # Packet summaries per IPC message to a shard
+SHARD_FLUSH_INTERVAL = 0.05  # Max seconds a partial batch waits before being sent
+SHARD_QUEUE_SIZE = 256       # Batches buffered per shard before packets are dropped
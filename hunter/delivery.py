@@ -0,0 +1,184 @@
+"""
+Sentinel-Eye Threat Delivery
+Batched, pooled, background delivery of threats to the Laravel API
+"""
+
+import time
+import queue
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import config
+
+logger = logging.getLogger('ThreatDelivery')
+
+# _post() outcome for a batch the API refused as invalid: retrying or spooling it fails the same way
+REJECTED = "rejected"
+
+
+class ThreatDelivery:
+    """
+    Ships API payloads to POST /api/threats/batch from a few sender threads.
+
+    submit() never blocks the caller: payloads wait in a bounded buffer and a
+    sender collects them into a batch that is sent when it reaches
+    API_BATCH_SIZE items or the oldest item has waited API_BATCH_LATENCY
+    seconds. All senders share one keep-alive requests.Session. Failed
+    batches are retried API_RETRY times with exponential backoff before
+    being counted as dropped, unless an overflow callback (normally the
+    on-disk spool) accepts them. A batch the API rejects as invalid (a 4xx
+    other than 429) is dropped at once and never spooled.
+    """
+
+    def __init__(self, batch_url=None, batch_size=None, max_latency=None, senders=None, overflow=None,
+                 metrics=None):
+        self.batch_url = batch_url or config.API_BATCH_URL
+        self.batch_size = batch_size or config.API_BATCH_SIZE
+        self.max_latency = config.API_BATCH_LATENCY if max_latency is None else max_latency
+        self.senders = senders or config.API_SENDERS
+        self.timeout = config.API_TIMEOUT
+        self.retries = max(1, config.API_RETRY)
+        self.backoff = config.API_RETRY_BACKOFF
+        self.overflow = overflow  # overflow(payloads) -> number kept
+        self.registry = metrics   # optional MetricsRegistry for API round-trip times
+
+        self.pending = queue.Queue(maxsize=config.API_PENDING_LIMIT)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.senders)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.running = False
+        self.threads = []
+
+        # Metrics
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.spooled = 0
+        self.failed_attempts = 0
+        self.batches_sent = 0
+
+    def start(self):
+        self.running = True
+        for _ in range(self.senders):
+            thread = threading.Thread(target=self._sender_loop, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Threat delivery started ({self.senders} senders, batch {self.batch_size})")
+
+    def submit(self, payload):
+        """Queue one API payload. Returns False if it had to be spooled or dropped."""
+        try:
+            self.pending.put_nowait(payload)
+            return True
+        except queue.Full:
+            self._overflow([payload], "Delivery buffer full!")
+            return False
+
+    def _sender_loop(self):
+        while self.running or not self.pending.empty():
+            batch = self._next_batch()
+            if batch:
+                self._send(batch)
+
+    def _next_batch(self):
+        """Block for the first payload, then fill until size or latency deadline."""
+        try:
+            batch = [self.pending.get(timeout=0.5)]
+        except queue.Empty:
+            return None
+
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self.pending.get_nowait())
+                else:
+                    batch.append(self.pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _send(self, batch):
+        if not self.post_batch(batch):
+            self._overflow(batch, f"Giving up on batch after {self.retries} attempts.")
+
+    def post_batch(self, batch):
+        """
+        Synchronously deliver one batch with retries. Returns True once the
+        batch is done with: delivered, or rejected by the API and counted as
+        rejected and dropped. False means it may still go through later.
+        """
+        with self.lock:
+            self.in_flight += len(batch)
+
+        try:
+            outcome = self._post(batch)
+            with self.lock:
+                if outcome is REJECTED:
+                    self.rejected += len(batch)
+                    self.dropped += len(batch)
+                elif outcome:
+                    self.delivered += len(batch)
+                    self.batches_sent += 1
+            return bool(outcome)
+        finally:
+            with self.lock:
+                self.in_flight -= len(batch)
+
+    def _post(self, batch):
+        for attempt in range(self.retries):
+            try:
+                start = time.perf_counter()
+                response = self.session.post(self.batch_url, json={"threats": batch}, timeout=self.timeout)
+                if self.registry is not None:
+                    self.registry.observe("sentinel_api_round_trip_seconds", time.perf_counter() - start)
+                if response.status_code < 300:
+                    return True
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    # Validation errors will not get better on retry
+                    logger.error(f"API rejected batch of {len(batch)}: {response.status_code} {response.text[:200]}")
+                    return REJECTED
+                logger.warning(f"API returned {response.status_code} (attempt {attempt + 1}/{self.retries})")
+            except requests.RequestException as e:
+                logger.warning(f"API request failed (attempt {attempt + 1}/{self.retries}): {e}")
+
+            with self.lock:
+                self.failed_attempts += 1
+            if attempt + 1 < self.retries:
+                time.sleep(self.backoff * (2 ** attempt))
+        return False
+
+    def _overflow(self, payloads, reason):
+        kept = self.overflow(payloads) if self.overflow else 0
+        with self.lock:
+            self.spooled += kept
+            self.dropped += len(payloads) - kept
+        if kept < len(payloads):
+            logger.error(f"{reason} Dropped {len(payloads) - kept} threats")
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "queued": self.pending.qsize(),
+                "in_flight": self.in_flight,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "spooled": self.spooled,
+                "failed_attempts": self.failed_attempts,
+                "batches_sent": self.batches_sent,
+            }
+
+    def stop(self, timeout=None):
+        """Let the senders drain the buffer, then wait for them to exit."""
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        self.session.close()
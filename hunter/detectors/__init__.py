@@ -2,9 +2,21 @@
 Sentinel-Eye Detection Modules
 """
 
+from .packet_summary import PacketSummary, summarize
+from .signatures import SignatureSet, SignatureMatch
+from .stream_reassembly import StreamReassembler
+from .shard_state import ShardedState
 from .port_scanner import PortScanDetector
 from .arp_spoof import ARPSpoofDetector
 from .payload_scan import PayloadInspector
 from .honeypot import HoneypotDetector
+from .anomaly import AnomalyDetector
+from .pipeline import DetectorPipeline, extract_raw_payload, format_raw_payload, render_metadata
 
-__all__ = ['PortScanDetector', 'ARPSpoofDetector', 'PayloadInspector']
+__all__ = [
+    'PacketSummary', 'summarize',
+    'SignatureSet', 'SignatureMatch', 'StreamReassembler', 'ShardedState',
+    'PortScanDetector', 'ARPSpoofDetector', 'PayloadInspector', 'HoneypotDetector',
+    'AnomalyDetector',
+    'DetectorPipeline', 'extract_raw_payload', 'format_raw_payload', 'render_metadata',
+]
@@ -0,0 +1,364 @@
+"""
+Traffic Anomaly Detector
+Scores every tracked source against its own traffic baseline, one vectorized pass per time bucket
+"""
+
+import time
+import queue
+import logging
+import threading
+from collections import namedtuple
+import numpy as np
+import config
+
+logger = logging.getLogger('AnomalyDetector')
+
+# Scored features, in column order
+FEATURES = ("packet_rate", "syn_ack_ratio", "distinct_ports", "distinct_destinations", "byte_rate")
+
+# Per-bucket counters, in column order
+PACKETS, SYNS, ACKS, PORTS, DESTINATIONS, BYTES = range(6)
+
+# Reloadable settings, swapped as one object (see PortScanDetector's ScanLimits)
+AnomalyLimits = namedtuple('AnomalyLimits', 'threshold cooldown')
+
+
+class AnomalyDetector:
+    """
+    Learns what each source normally does and flags sudden departures from it.
+
+    Every source IP owns a row in preallocated NumPy arrays (up to
+    ANOMALY_MAX_HOSTS rows). Packets are only appended to pending lists on
+    the hot path; when a packet opens a new time bucket (ANOMALY_WINDOW /
+    ANOMALY_BUCKETS seconds), the pending lists are handed to a scoring
+    thread, which folds them into that bucket's counters with
+    bincount/unique, replaces the oldest slot of a ring of ANOMALY_BUCKETS
+    buckets with it and scores every row at once:
+
+        x = log1p(packet rate, SYN/ACK ratio, distinct ports,
+                  distinct destinations, byte rate) over the window
+        z = (x - ewma_mean) / (sqrt(ewma_var) + ANOMALY_MIN_STD)
+
+    A source alerts when its largest z reaches ANOMALY_Z_THRESHOLD, it sent
+    traffic in the closed bucket, it has been scored for at least
+    ANOMALY_WARMUP_TICKS buckets, it sent at least ANOMALY_MIN_PACKETS
+    packets in the window (a lone packet from a quiet source is a big
+    relative jump but no evidence of anything) and its last alert is older
+    than ANOMALY_ALERT_COOLDOWN. Only increases are flagged. Buckets scoring
+    above half the threshold are learned at a tenth of ANOMALY_EWMA_ALPHA:
+    a ramp that the window only reveals over a few buckets is not absorbed
+    into the baseline before it crosses the threshold, while a lasting
+    change eventually is. New sources have no baseline yet; scanners that
+    are noisy from their first packet are PortScanDetector's job.
+
+    Distinct ports and destinations are counted per bucket and summed over
+    the window, which overcounts sources that revisit the same targets in
+    every bucket; the baseline is built from the same sums, so this only
+    shifts the scale. Sources idle for ANOMALY_IDLE_TICKS buckets give their
+    row back; when every row is taken, packets from new sources are counted
+    as untracked and skipped.
+
+    With background=True (ANOMALY_BACKGROUND_SCORING) the capture path
+    never waits for a scoring pass: its threats are returned by the next
+    analyze() call after it finishes, and drain() waits for them. With
+    background=False the packet that closes a bucket scores it, as offline
+    replay needs for results that do not depend on replay speed.
+    """
+
+    def __init__(self, background=None):
+        self.capacity = config.ANOMALY_MAX_HOSTS
+        self.window = config.ANOMALY_WINDOW
+        self.buckets = config.ANOMALY_BUCKETS
+        self.bucket_width = self.window / self.buckets
+        self.alpha = config.ANOMALY_EWMA_ALPHA
+        self.min_std = config.ANOMALY_MIN_STD
+        self.warmup = config.ANOMALY_WARMUP_TICKS
+        self.idle_ticks = config.ANOMALY_IDLE_TICKS
+        self.min_packets = config.ANOMALY_MIN_PACKETS
+        self.max_alerts = config.ANOMALY_MAX_ALERTS
+        self.limits = self.compile_rules(vars(config))
+
+        # Column per source, so each counter or feature is one contiguous row
+        n = self.capacity
+        self.ring = np.zeros((self.buckets, len(FEATURES) + 1, n), dtype=np.float32)  # bucket counters
+        self.window_sums = np.zeros((len(FEATURES) + 1, n), dtype=np.float32)          # sum over the ring
+        self.mean = np.zeros((len(FEATURES), n), dtype=np.float32)
+        self.var = np.zeros((len(FEATURES), n), dtype=np.float32)
+        self.occupied = np.zeros(n, dtype=bool)
+        self.age = np.zeros(n, dtype=np.int32)         # buckets scored since the row was assigned
+        self.last_seen = np.zeros(n, dtype=np.int64)   # last bucket with traffic
+        self.alerted_at = np.full(n, -np.inf)
+
+        self.rows = {}                   # ip -> row
+        self.ips = [None] * n            # row -> ip
+        self.free = list(range(n - 1, -1, -1))
+        self.epoch = None                # bucket currently being filled
+
+        # Packets of the current bucket, as parallel lists. self.lock guards them and
+        # the row assignment (rows, ips, free, occupied); the feature arrays belong
+        # to whoever holds self.scoring.
+        self.lock = threading.Lock()
+        self.scoring = threading.Lock()
+        self.pending_rows = []
+        self.pending_flags = []
+        self.pending_ports = []
+        self.pending_destinations = []
+        self.pending_lengths = []
+
+        # Closed buckets waiting for the scoring thread, and the threats it found
+        self.background = config.ANOMALY_BACKGROUND_SCORING if background is None else background
+        self.closed = queue.Queue()
+        self.ready = []
+        if self.background:
+            threading.Thread(target=self._score_loop, daemon=True, name="AnomalyScoring").start()
+
+        # Metrics
+        self.ticks = 0
+        self.tick_seconds = 0.0
+        self.alerts = 0
+        self.untracked = 0
+        self.expired = 0
+
+        mb = (self.ring.nbytes + self.window_sums.nbytes + self.mean.nbytes + self.var.nbytes) / 2**20
+        logger.info(f"Anomaly detection tracking up to {n} sources ({mb:.0f} MB of feature arrays)")
+
+    def compile_rules(self, settings):
+        return AnomalyLimits(settings['ANOMALY_Z_THRESHOLD'], settings['ANOMALY_ALERT_COOLDOWN'])
+
+    def apply_rules(self, limits):
+        self.limits = limits
+
+    def bpf_filter(self):
+        """Rates and byte counts need every IP packet, not just the ones other detectors match"""
+        return "ip"
+
+    def analyze(self, summary):
+        """
+        Record one packet. Returns a list of threats when this packet closed
+        a bucket in which some sources scored as anomalous, None otherwise.
+        """
+        src_ip = summary.src_ip
+        if src_ip is None:
+            return None
+        epoch = int(summary.timestamp // self.bucket_width)
+
+        closed = threats = None
+        with self.lock:
+            if self.epoch is None:
+                self.epoch = epoch
+            elif epoch > self.epoch:
+                closed = self._close(epoch)
+                if self.background:
+                    self.closed.put(closed)
+                    closed = None
+            if self.ready:
+                threats, self.ready = self.ready, []
+
+            row = self.rows.get(src_ip)
+            if row is None:
+                if not self.free:
+                    self.untracked += 1
+                    row = None
+                else:
+                    row = self.free.pop()
+                    self.rows[src_ip] = row
+                    self.ips[row] = src_ip
+                    self.occupied[row] = True
+
+            if row is not None:
+                # Late packets count towards the bucket being filled
+                self.pending_rows.append(row)
+                self.pending_flags.append(summary.tcp_flags or 0)
+                self.pending_ports.append(-1 if summary.dport is None else summary.dport)
+                self.pending_destinations.append(hash(summary.dst_ip) & 0xFFFFFFFF)
+                self.pending_lengths.append(summary.length or 0)
+
+        if closed is not None:
+            threats = self._tick(*closed)
+        return threats
+
+    def _close(self, epoch):
+        """Take the bucket being filled; caller holds self.lock. Returns _tick()'s arguments."""
+        pending = (self.pending_rows, self.pending_flags, self.pending_ports,
+                   self.pending_destinations, self.pending_lengths)
+        self.pending_rows = []
+        self.pending_flags = []
+        self.pending_ports = []
+        self.pending_destinations = []
+        self.pending_lengths = []
+        closed, self.epoch = self.epoch, epoch
+        return closed, epoch, pending
+
+    def _score_loop(self):
+        while True:
+            closed = self.closed.get()
+            try:
+                threats = self._tick(*closed)
+                if threats:
+                    with self.lock:
+                        self.ready.extend(threats)
+            except Exception as e:
+                logger.error(f"Error scoring bucket {closed[0]}: {e}")
+            finally:
+                self.closed.task_done()
+
+    def drain(self):
+        """Wait until every closed bucket is scored; returns the threats not yet handed out, or None."""
+        self.closed.join()
+        with self.lock:
+            threats, self.ready = self.ready, []
+        return threats or None
+
+    def _fill_bucket(self, counters, pending):
+        """Fold a closed bucket's packets (see _close) into its (counters x sources) array."""
+        n = self.capacity
+        counters[:] = 0
+        if not pending[0]:
+            return
+        rows = np.array(pending[0], dtype=np.int64)
+        flags = np.array(pending[1], dtype=np.int32)
+        ports = np.array(pending[2], dtype=np.int64)
+        destinations = np.array(pending[3], dtype=np.int64)
+        lengths = np.array(pending[4], dtype=np.float64)
+
+        counters[PACKETS] = np.bincount(rows, minlength=n)
+        counters[SYNS] = np.bincount(rows[(flags & 0x12) == 0x02], minlength=n)
+        counters[ACKS] = np.bincount(rows[(flags & 0x10) != 0], minlength=n)
+        counters[BYTES] = np.bincount(rows, weights=lengths, minlength=n)
+        has_port = ports >= 0
+        pairs = np.unique((rows[has_port] << 16) | ports[has_port])
+        counters[PORTS] = np.bincount(pairs >> 16, minlength=n)
+        pairs = np.unique((rows << 32) | destinations)
+        counters[DESTINATIONS] = np.bincount(pairs >> 32, minlength=n)
+
+    def _rotate(self, epoch, pending=None):
+        """Replace the ring slot of `epoch` (the bucket one window older) and keep the window sums current."""
+        counters = self.ring[epoch % self.buckets]
+        self.window_sums -= counters
+        if pending is not None:
+            self._fill_bucket(counters, pending)
+        else:
+            counters[:] = 0
+        self.window_sums += counters
+
+    def features(self):
+        """log1p feature matrix (FEATURES x sources) over the current window."""
+        sums = self.window_sums
+        x = np.empty(self.mean.shape, dtype=np.float32)
+        np.divide(sums[PACKETS], self.window, out=x[0])
+        np.divide(sums[SYNS], sums[ACKS] + 1, out=x[1])
+        x[2] = sums[PORTS]
+        x[3] = sums[DESTINATIONS]
+        np.divide(sums[BYTES], self.window, out=x[4])
+        np.maximum(x, 0, out=x)  # float32 sums can drift a hair below zero
+        return np.log1p(x, out=x)
+
+    def _tick(self, closed, epoch, pending):
+        """Fold in the closed bucket, score every row, learn, and expire idle rows."""
+        with self.scoring:
+            return self._score(closed, epoch, pending)
+
+    def _score(self, closed, epoch, pending):
+        start = time.perf_counter()
+        self._rotate(closed, pending)
+        active = self.ring[closed % self.buckets][PACKETS] > 0
+        # Buckets nobody sent anything in, at most one window's worth
+        for e in range(closed + 1, min(epoch, closed + 1 + self.buckets)):
+            self._rotate(e)
+
+        x = self.features()
+        diff = x - self.mean
+        z = np.sqrt(self.var)
+        z += self.min_std
+        np.divide(diff, z, out=z)
+        score = z.max(axis=0)
+
+        limits = self.limits
+        now = (closed + 1) * self.bucket_width
+        candidates = active & (score >= limits.threshold) & (self.age >= self.warmup)
+        candidates &= self.window_sums[PACKETS] >= self.min_packets
+        hits = np.flatnonzero(candidates & (now - self.alerted_at >= limits.cooldown))
+        if len(hits) > self.max_alerts:
+            hits = hits[np.argsort(score[hits])[-self.max_alerts:]]
+        threats = [self._threat(row, x[:, row], z[:, row]) for row in hits] or None
+        self.alerted_at[hits] = now
+        self.alerts += len(hits)
+
+        # EWMA update; rows start from their first observation
+        rate = np.where(score >= limits.threshold / 2, np.float32(self.alpha * 0.1), np.float32(self.alpha))
+        step = diff * rate
+        self.mean += step
+        step *= diff             # rate * diff**2
+        self.var += step
+        self.var *= 1 - rate
+        # Rows assigned since the bucket closed have no traffic in it yet and stay unscored
+        fresh = np.flatnonzero(active & (self.age == 0))
+        self.mean[:, fresh] = x[:, fresh]
+        self.var[:, fresh] = 0
+        self.age[active | (self.age > 0)] += 1
+
+        self.last_seen[active] = closed
+        self._expire(closed)
+
+        self.ticks += 1
+        self.tick_seconds = time.perf_counter() - start
+        return threats
+
+    def _expire(self, epoch):
+        """Give back the rows of sources with no traffic for ANOMALY_IDLE_TICKS buckets."""
+        idle = np.flatnonzero(self.occupied & (self.age > 0) & (epoch - self.last_seen >= self.idle_ticks))
+        if not len(idle):
+            return
+        with self.lock:
+            if not self.closed.empty():
+                return  # Queued buckets may still count packets for these rows; expire after them
+            # Sources that came back since the bucket closed keep their rows
+            busy = set(self.pending_rows)
+            idle = np.array([row for row in idle.tolist() if row not in busy], dtype=np.int64)
+            if not len(idle):
+                return
+            self.ring[:, :, idle] = 0
+            self.window_sums[:, idle] = 0
+            self.mean[:, idle] = 0
+            self.var[:, idle] = 0
+            self.age[idle] = 0
+            self.alerted_at[idle] = -np.inf
+            self.occupied[idle] = False
+            for row in idle.tolist():
+                del self.rows[self.ips[row]]
+                self.ips[row] = None
+                self.free.append(row)
+        self.expired += len(idle)
+
+    def _threat(self, row, x, z):
+        feature = int(z.argmax())
+        name = FEATURES[feature]
+        values = np.expm1(x)
+        baseline = np.expm1(self.mean[:, row])
+        return {
+            "ip_address": self.ips[row],
+            "attack_signature": f"TRAFFIC_ANOMALY ({name})",
+            "attack_type": "traffic_anomaly",
+            "risk_score": config.RISK_SCORES.get("traffic_anomaly", 65),
+            "metadata": {
+                "anomaly_score": round(float(z[feature]), 2),
+                "feature": name,
+                "features": {f: round(float(v), 2) for f, v in zip(FEATURES, values)},
+                "baseline": {f: round(float(v), 2) for f, v in zip(FEATURES, baseline)},
+                "time_window": self.window,
+                "raw_payload": None,  # Scored over a window, not one packet
+                "detection_reason": (f"{name} {values[feature]:.1f} against a baseline of "
+                                     f"{baseline[feature]:.1f} (z={z[feature]:.1f}) over {self.window}s"),
+            },
+        }
+
+    def stats(self):
+        return {
+            "tracked_ips": len(self.rows),
+            "untracked_packets": self.untracked,
+            "expired_ips": self.expired,
+            "ticks": self.ticks,
+            "tick_seconds": self.tick_seconds,
+            "queued_buckets": self.closed.qsize(),
+            "alerts": self.alerts,
+        }
@@ -1,4 +1,3 @@
-from scapy.all import IP, TCP
 import logging
 import config
 
@@ -9,17 +8,32 @@ class HoneypotDetector:
     Deception module. Detects interactions with high-value decoy ports.
     """
     def __init__(self):
-        self.trap_ports = config.HONEYPOT_PORTS
-        logger.info(f"Honeypot active on ports: {self.trap_ports}")
+        self.trap_ports = self.compile_rules(vars(config))
+        logger.info(f"Honeypot active on ports: {sorted(self.trap_ports)}")
 
-    def analyze(self, packet):
+    def compile_rules(self, settings):
+        return frozenset(settings['HONEYPOT_PORTS'])
+
+    def apply_rules(self, trap_ports):
+        if trap_ports != self.trap_ports:
+            logger.info(f"Honeypot ports changed to: {sorted(trap_ports)}")
+        self.trap_ports = trap_ports
+
+    def bpf_filter(self):
+        """Kernel-side filter for the trap ports; None when the honeypot is off"""
+        if not config.HONEYPOT_ENABLED or not self.trap_ports:
+            return None
+        ports = " or ".join(f"dst port {p}" for p in sorted(self.trap_ports))
+        return f"tcp and ({ports})"
+
+    def analyze(self, summary):
         if not config.HONEYPOT_ENABLED:
             return None
 
-        if packet.haslayer(TCP) and packet.haslayer(IP):
-            dst_port = packet[TCP].dport
+        if summary.is_tcp:
+            dst_port = summary.dport
             if dst_port in self.trap_ports:
-                src_ip = packet[IP].src
+                src_ip = summary.src_ip
                 logger.warning(f"\U0001f36f HONEYPOT TRIGGERED! {src_ip} touched port {dst_port}")
                 
                 return {
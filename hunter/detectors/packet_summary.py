@@ -0,0 +1,78 @@
+"""
+Packet Summary
+Decodes each captured packet once so every detector can share the result
+"""
+
+from scapy.all import IP, TCP, ARP, Raw
+from scapy.packet import NoPayload
+
+
+class PacketSummary:
+    """
+    Flat record of the fields the detectors care about.
+    Built once per packet by summarize(); detectors only read it and
+    never touch the scapy object themselves.
+    """
+
+    __slots__ = (
+        'src_ip', 'dst_ip', 'length',
+        'sport', 'dport', 'tcp_flags', 'tcp_seq',
+        'arp_op', 'arp_psrc', 'arp_pdst', 'arp_hwsrc',
+        'payload', 'timestamp',
+    )
+
+    def __init__(self):
+        self.src_ip = None
+        self.dst_ip = None
+        self.length = None     # IP total length, as sent
+        self.sport = None
+        self.dport = None
+        self.tcp_flags = None  # int, None when the packet has no TCP layer
+        self.tcp_seq = None
+        self.arp_op = None     # None when the packet has no ARP layer
+        self.arp_psrc = None
+        self.arp_pdst = None
+        self.arp_hwsrc = None
+        self.payload = None    # Raw layer bytes, None when header only
+        self.timestamp = 0.0   # Capture time (pcap timestamp when replaying)
+
+    @property
+    def is_tcp(self):
+        return self.tcp_flags is not None and self.src_ip is not None
+
+    @property
+    def is_arp(self):
+        return self.arp_op is not None
+
+
+def summarize(packet):
+    """
+    Walk the scapy layer chain a single time and copy out the
+    IP/TCP/ARP/Raw fields into a PacketSummary.
+    """
+    summary = PacketSummary()
+    summary.timestamp = float(packet.time)
+    layer = packet
+
+    while not isinstance(layer, NoPayload):
+        cls = layer.__class__
+        if cls is IP:
+            summary.src_ip = layer.src
+            summary.dst_ip = layer.dst
+            summary.length = layer.len
+        elif cls is TCP:
+            summary.sport = layer.sport
+            summary.dport = layer.dport
+            summary.tcp_flags = int(layer.flags)
+            summary.tcp_seq = layer.seq
+        elif cls is ARP:
+            summary.arp_op = layer.op
+            summary.arp_psrc = layer.psrc
+            summary.arp_pdst = layer.pdst
+            summary.arp_hwsrc = layer.hwsrc
+        elif cls is Raw:
+            summary.payload = layer.load
+            break
+        layer = layer.payload
+
+    return summary
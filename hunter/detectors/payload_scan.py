@@ -3,9 +3,17 @@ Payload Inspector
 Scans HTTP traffic for SQL Injection and XSS attack patterns
 """
 
-import re
-from scapy.all import IP, TCP, Raw
 import config
+from .signatures import SignatureSet
+from .stream_reassembly import StreamReassembler
+
+HTTP_PORTS = frozenset((80, 8000, 8080, 3000, 8888))
+
+# attack_type -> (attack_signature, human label)
+THREAT_LABELS = {
+    "sql_injection": ("SQL_INJECTION_ATTEMPT", "SQL injection"),
+    "xss_attempt": ("XSS_ATTEMPT", "XSS"),
+}
 
 
 class PayloadInspector:
@@ -19,62 +27,56 @@ class PayloadInspector:
     """
     
     def __init__(self):
-        # Compile regex patterns for performance
-        self.sql_patterns = [re.compile(p, re.IGNORECASE) for p in config.SQL_INJECTION_PATTERNS]
-        self.xss_patterns = [re.compile(p, re.IGNORECASE) for p in config.XSS_PATTERNS]
+        # Compile every signature into one prefiltered rule set
+        self.signatures = self.compile_rules(vars(config))
         self.max_depth = config.HTTP_INSPECT_DEPTH
+        self.streams = StreamReassembler() if config.REASSEMBLY_ENABLED else None
+
+    def compile_rules(self, settings):
+        """Build the signature set for a rule reload; slow, so it runs off the hot path"""
+        return SignatureSet.from_settings(settings)
+
+    def apply_rules(self, signatures):
+        self.signatures = signatures
     
-    def analyze(self, packet):
+    def bpf_filter(self):
+        """Kernel-side filter: all TCP on the HTTP ports (payload and FIN/RST for reassembly)"""
+        ports = " or ".join(f"port {p}" for p in sorted(HTTP_PORTS))
+        return f"tcp and ({ports})"
+    
+    def analyze(self, summary):
         """
-        Analyze HTTP payloads for malicious patterns.
+        Analyze the HTTP payload of a PacketSummary for malicious patterns.
         Returns threat data if attack detected, None otherwise.
         """
-        if not packet.haslayer(IP) or not packet.haslayer(TCP) or not packet.haslayer(Raw):
+        if not summary.is_tcp:
             return None
         
-        ip_layer = packet[IP]
-        tcp_layer = packet[TCP]
-        
         # Check if it's HTTP traffic (ports 80, 8000, 8080, 3000, etc.)
-        if tcp_layer.dport not in [80, 8000, 8080, 3000, 8888] and tcp_layer.sport not in [80, 8000, 8080, 3000, 8888]:
+        if summary.dport not in HTTP_PORTS and summary.sport not in HTTP_PORTS:
             return None
         
         try:
-            payload = packet[Raw].load.decode('utf-8', errors='ignore')[:self.max_depth]
+            if self.streams is not None:
+                # Reassembled window: retained overlap + new in-order bytes
+                data = self.streams.feed(summary)
+            elif summary.payload is not None:
+                data = summary.payload[:self.max_depth]
+            else:
+                data = None
+            
+            if not data:
+                return None
             
-            # Check for SQL Injection
-            sql_match = self._check_sql_injection(payload)
-            if sql_match:
-                return {
-                    "ip_address": ip_layer.src,
-                    "attack_signature": "SQL_INJECTION_ATTEMPT",
-                    "attack_type": "sql_injection",
-                    "risk_score": config.RISK_SCORES.get("sql_injection", 85),
-                    "metadata": {
-                        "matched_pattern": sql_match,
-                        "payload_sample": payload[:200],
-                        "destination_ip": ip_layer.dst,
-                        "destination_port": tcp_layer.dport,
-                        "detection_reason": f"SQL injection pattern detected: {sql_match}"
-                    }
-                }
+            payload = data.decode('utf-8', errors='ignore')
             
-            # Check for XSS
-            xss_match = self._check_xss(payload)
-            if xss_match:
-                return {
-                    "ip_address": ip_layer.src,
-                    "attack_signature": "XSS_ATTEMPT",
-                    "attack_type": "xss_attempt",
-                    "risk_score": config.RISK_SCORES.get("xss_attempt", 70),
-                    "metadata": {
-                        "matched_pattern": xss_match,
-                        "payload_sample": payload[:200],
-                        "destination_ip": ip_layer.dst,
-                        "destination_port": tcp_layer.dport,
-                        "detection_reason": f"XSS pattern detected: {xss_match}"
-                    }
-                }
+            # Match against the whole SQL injection + XSS rule set at once
+            match = self.signatures.search(payload)
+            if match:
+                if self.streams is not None:
+                    # Don't let the same bytes alert again on the next segment
+                    self.streams.clear_context(summary)
+                return self._build_threat(summary, payload, match)
         
         except Exception as e:
             # Ignore decoding errors, malformed packets, etc.
@@ -82,18 +84,20 @@ class PayloadInspector:
         
         return None
     
-    def _check_sql_injection(self, payload):
-        """Check payload against SQL injection patterns"""
-        for pattern in self.sql_patterns:
-            match = pattern.search(payload)
-            if match:
-                return match.group(0)[:50]  # Return matched pattern (truncated)
-        return None
-    
-    def _check_xss(self, payload):
-        """Check payload against XSS patterns"""
-        for pattern in self.xss_patterns:
-            match = pattern.search(payload)
-            if match:
-                return match.group(0)[:50]  # Return matched pattern (truncated)
-        return None
+    def _build_threat(self, summary, payload, match):
+        """Turn a SignatureMatch into threat data"""
+        signature, label = THREAT_LABELS[match.category]
+        return {
+            "ip_address": summary.src_ip,
+            "attack_signature": signature,
+            "attack_type": match.category,
+            "risk_score": config.RISK_SCORES.get(match.category, 70),
+            "metadata": {
+                "matched_pattern": match.text,
+                "matched_rule": match.rule_id,
+                "payload_sample": payload[:200],
+                "destination_ip": summary.dst_ip,
+                "destination_port": summary.dport,
+                "detection_reason": f"{label} pattern detected: {match.text}"
+            }
+        }
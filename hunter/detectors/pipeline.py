@@ -0,0 +1,147 @@
+"""
+Detector Pipeline
+Runs every detection module against one PacketSummary
+"""
+
+import time
+import base64
+import config
+from .port_scanner import PortScanDetector
+from .arp_spoof import ARPSpoofDetector
+from .payload_scan import PayloadInspector
+from .honeypot import HoneypotDetector
+from .anomaly import AnomalyDetector
+
+
+NO_PAYLOAD = "No raw payload data (Header only)"
+
+
+def extract_raw_payload(summary):
+    """
+    Forensic bytes for a threat, or None for header-only packets.
+    Payloads within MAX_PAYLOAD_SIZE are passed by reference; nothing is
+    formatted here, see format_raw_payload().
+    """
+    payload = summary.payload
+    if payload is None:
+        return None
+    return payload if len(payload) <= config.MAX_PAYLOAD_SIZE else payload[:config.MAX_PAYLOAD_SIZE]
+
+
+def format_raw_payload(data, encoding=None):
+    """Render forensic bytes as spaced hex (the dashboard's hex dump) or base64."""
+    if data is None:
+        return NO_PAYLOAD
+    if isinstance(data, str):
+        return data  # Already rendered (simulation, replayed spool records)
+    if (encoding or config.RAW_PAYLOAD_ENCODING) == "base64":
+        return base64.b64encode(data).decode('ascii')
+    return data.hex(' ')
+
+
+def render_metadata(metadata):
+    """JSON-ready copy of threat metadata with forensic bytes rendered."""
+    rendered = dict(metadata)
+    encoding = config.RAW_PAYLOAD_ENCODING
+    if 'raw_payload' in rendered:
+        if isinstance(rendered['raw_payload'], (bytes, bytearray, memoryview)):
+            rendered['raw_payload_encoding'] = encoding
+        rendered['raw_payload'] = format_raw_payload(rendered['raw_payload'], encoding)
+    if 'sample_payloads' in rendered:
+        rendered['sample_payloads'] = [format_raw_payload(p, encoding) for p in rendered['sample_payloads']]
+    return rendered
+
+
+class DetectorPipeline:
+    """
+    Owns one instance of each detector plus its per-IP state.
+    The engine keeps a single pipeline; each capture shard keeps its own.
+    offline=True (PCAP replay) scores anomaly buckets inline, so results do
+    not depend on replay speed.
+    """
+
+    def __init__(self, profile=False, offline=False):
+        self.port_detector = PortScanDetector()
+        self.arp_detector = ARPSpoofDetector()
+        self.payload_inspector = PayloadInspector()
+        self.honeypot = HoneypotDetector()
+        self.anomaly = AnomalyDetector(background=False if offline else None) if config.ANOMALY_ENABLED else None
+        self.detectors = (
+            self.port_detector,
+            self.arp_detector,
+            self.payload_inspector,
+            self.honeypot,
+        ) + ((self.anomaly,) if self.anomaly else ())
+        # Cumulative seconds spent in each detector, only kept when profiling
+        self.timings = {type(d).__name__: 0.0 for d in self.detectors} if profile else None
+
+    def compile_rules(self, settings):
+        """
+        Compile every reloadable detector's rules for `settings` (a mapping of
+        config names). Raises on a bad rule without touching the running
+        detectors; the result goes to apply_rules().
+        """
+        return [(d, d.compile_rules(settings)) for d in self.detectors if hasattr(d, 'compile_rules')]
+
+    @staticmethod
+    def apply_rules(compiled):
+        """Swap compiled rules in, one attribute per detector; per-IP state is untouched."""
+        for detector, rules in compiled:
+            detector.apply_rules(rules)
+
+    def bpf_filter(self):
+        """
+        OR together every detector's bpf_filter() so the kernel only copies
+        packets some detector can use. Detectors return None when they need
+        no traffic; a detector without bpf_filter() needs everything, in
+        which case no filter (None) is returned.
+        """
+        parts = []
+        for detector in self.detectors:
+            if not hasattr(detector, 'bpf_filter'):
+                return None
+            expression = detector.bpf_filter()
+            if expression:
+                parts.append(f"({expression})")
+        return " or ".join(parts) or None
+
+    def analyze(self, summary, observe=None):
+        """
+        Run all detectors and attach forensic data.
+        observe(detector_name, seconds), when given, receives each detector's run time.
+        A detector returns one threat dict, or a list of them when it scores
+        many sources at once (AnomalyDetector).
+        Returns a (possibly empty) list of threat dicts.
+        """
+        threats = []
+        if observe is None and self.timings is None:
+            for detector in self.detectors:
+                threat = detector.analyze(summary)
+                if threat:
+                    if type(threat) is list:
+                        threats.extend(threat)
+                    else:
+                        threats.append(threat)
+        else:
+            for detector in self.detectors:
+                start = time.perf_counter()
+                threat = detector.analyze(summary)
+                elapsed = time.perf_counter() - start
+                name = type(detector).__name__
+                if self.timings is not None:
+                    self.timings[name] += elapsed
+                if observe is not None:
+                    observe(name, elapsed)
+                if threat:
+                    if type(threat) is list:
+                        threats.extend(threat)
+                    else:
+                        threats.append(threat)
+
+        if threats and config.CAPTURE_RAW_PAYLOAD:
+            # Bytes only; rendering waits for delivery (render_metadata)
+            raw_payload = extract_raw_payload(summary)
+            for threat in threats:
+                threat['metadata'].setdefault('raw_payload', raw_payload)
+
+        return threats
@@ -3,83 +3,195 @@ Port Scan Detector
 Detects rapid SYN packets from a single IP (potential port scanning activity)
 """
 
-import time
-from collections import defaultdict, deque
-from threading import Lock
-from scapy.all import IP, TCP
+import math
+from collections import namedtuple
 import config
+from .shard_state import ShardedState
+
+PORT_SAMPLE_SIZE = 10
+
+# Reloadable settings, swapped as one object so a packet never sees half an update
+ScanLimits = namedtuple('ScanLimits', 'threshold cooldown')
+
+
+class ScanState:
+    """
+    Fixed-size per-IP state: a ring of SYN counters and one of destination
+    port bitmaps (one of each per time bucket), the running SYN total and a
+    few sample ports.
+    """
+
+    __slots__ = ('counts', 'total', 'port_bits', 'ports_sample', 'last_epoch', 'alerted_at')
+
+    def __init__(self, buckets, epoch):
+        self.counts = [0] * buckets
+        self.total = 0
+        self.port_bits = [0] * buckets
+        self.ports_sample = []
+        self.last_epoch = epoch
+        self.alerted_at = None
 
 
 class PortScanDetector:
     """
     Detects port scanning by tracking SYN packet velocity from each IP.
-    Uses a sliding window approach to count packets over time.
-    
+    The sliding window is split into PORT_SCAN_BUCKETS time buckets, so each
+    IP costs a constant amount of memory no matter how many SYNs it sends.
+    Distinct ports are estimated with a linear-counting bitmap per bucket;
+    the buckets in the window are ORed when an alert is raised, so ports
+    leave the estimate with the bucket they were seen in.
+
+    At most PORT_SCAN_MAX_TRACKED IPs are tracked: idle IPs expire after one
+    window and the least recently seen IP is evicted when the cap is hit,
+    so a spoofed-source SYN flood cannot grow memory without bound. An IP
+    can alert again PORT_SCAN_ALERT_COOLDOWN seconds after its last alert.
+
+    State is split into DETECTOR_STATE_SHARDS independently locked shards
+    keyed by source IP; the cap and LRU order apply per shard.
+
     Demo: Run 'nmap -sS -p 1-1000 <target_ip>' to trigger this detector
     """
-    
-    def __init__(self):
-        self.syn_tracker = defaultdict(deque)  # IP -> [(timestamp, port), ...]
-        self.lock = Lock()
-        self.threshold = config.PORT_SCAN_THRESHOLD
+
+    def __init__(self, shards=None):
+        self.state = ShardedState(shards)  # IP -> ScanState per shard, least recently seen first
+        self.limits = self.compile_rules(vars(config))
         self.window = config.PORT_SCAN_WINDOW
-        self.detected_ips = set()  # Avoid duplicate alerts
-    
-    def analyze(self, packet):
+        self.buckets = config.PORT_SCAN_BUCKETS
+        self.bucket_width = self.window / self.buckets
+        self.max_per_shard = self.state.capacity(config.PORT_SCAN_MAX_TRACKED)
+        self.sketch_bits = config.PORT_SCAN_SKETCH_BITS
+
+    def compile_rules(self, settings):
+        """Threshold and cooldown can change at runtime; the window and ring layout cannot"""
+        return ScanLimits(settings['PORT_SCAN_THRESHOLD'], settings['PORT_SCAN_ALERT_COOLDOWN'])
+
+    def apply_rules(self, limits):
+        self.limits = limits
+
+    def analyze(self, summary):
         """
-        Analyze packet for port scanning behavior.
+        Analyze a PacketSummary for port scanning behavior.
         Returns threat data if scanning detected, None otherwise.
         """
-        if not packet.haslayer(IP) or not packet.haslayer(TCP):
+        if not summary.is_tcp:
             return None
-        
-        ip_layer = packet[IP]
-        tcp_layer = packet[TCP]
-        
+
+        flags = summary.tcp_flags
+
         # Check for SYN flag without ACK (new connection attempt)
-        if tcp_layer.flags & 0x02 and not (tcp_layer.flags & 0x10):
-            src_ip = ip_layer.src
-            dst_port = tcp_layer.dport
-            current_time = time.time()
-            
-            with self.lock:
-                # Add to tracker
-                self.syn_tracker[src_ip].append((current_time, dst_port))
-                
-                # Remove old entries outside the time window
-                while (self.syn_tracker[src_ip] and 
-                       current_time - self.syn_tracker[src_ip][0][0] > self.window):
-                    self.syn_tracker[src_ip].popleft()
-                
+        if flags & 0x02 and not (flags & 0x10):
+            src_ip = summary.src_ip
+            dst_port = summary.dport
+            current_time = summary.timestamp
+            epoch = int(current_time // self.bucket_width)
+
+            shard = self.state.shard(src_ip)
+            with shard.lock:
+                if epoch > shard.swept:
+                    # Idle IPs are swept once per bucket
+                    self._expire(shard, epoch)
+
+                tracker = shard.entries
+                state = tracker.get(src_ip)
+                if state is None:
+                    state = ScanState(self.buckets, epoch)
+                    tracker[src_ip] = state
+                    if len(tracker) > self.max_per_shard:
+                        tracker.popitem(last=False)
+                        shard.evicted += 1
+                else:
+                    tracker.move_to_end(src_ip)
+                    if epoch > state.last_epoch:
+                        self._advance(state, epoch)
+
+                # Add to the current time bucket (late packets count towards the newest one)
+                slot = state.last_epoch % self.buckets
+                state.counts[slot] += 1
+                state.total += 1
+
+                state.port_bits[slot] |= 1 << (((dst_port * 2654435761) & 0xFFFFFFFF) % self.sketch_bits)
+                if len(state.ports_sample) < PORT_SAMPLE_SIZE and dst_port not in state.ports_sample:
+                    state.ports_sample.append(dst_port)
+
                 # Check if threshold exceeded
-                syn_count = len(self.syn_tracker[src_ip])
-                
-                if syn_count >= self.threshold and src_ip not in self.detected_ips:
-                    self.detected_ips.add(src_ip)
-                    
-                    # Get unique ports scanned
-                    unique_ports = set([port for _, port in self.syn_tracker[src_ip]])
-                    
-                    return {
-                        "ip_address": src_ip,
-                        "attack_signature": "PORT_SCAN_DETECTED",
-                        "attack_type": "port_scan",
-                        "risk_score": config.RISK_SCORES.get("port_scan", 75),
-                        "metadata": {
-                            "syn_count": syn_count,
-                            "unique_ports": len(unique_ports),
-                            "ports_sample": list(unique_ports)[:10],
-                            "time_window": self.window,
-                            "detection_reason": f"{syn_count} SYN packets to {len(unique_ports)} ports in {self.window}s"
-                        }
+                limits = self.limits
+                syn_count = state.total
+                if syn_count < limits.threshold:
+                    return None
+                if state.alerted_at is not None and current_time - state.alerted_at < limits.cooldown:
+                    return None
+                state.alerted_at = current_time
+
+                unique_ports = self._estimate_ports(state)
+
+                return {
+                    "ip_address": src_ip,
+                    "attack_signature": "PORT_SCAN_DETECTED",
+                    "attack_type": "port_scan",
+                    "risk_score": config.RISK_SCORES.get("port_scan", 75),
+                    "metadata": {
+                        "syn_count": syn_count,
+                        "unique_ports": unique_ports,
+                        "ports_sample": list(state.ports_sample),
+                        "time_window": self.window,
+                        "detection_reason": f"{syn_count} SYN packets to {unique_ports} ports in {self.window}s"
                     }
-        
+                }
+
         return None
-    
+
+    def _advance(self, state, epoch):
+        """Rotate the bucket ring forward to epoch, dropping counts that left the window"""
+        if epoch - state.last_epoch >= self.buckets:
+            # Quiet for a whole window: start over, including the port samples
+            state.counts = [0] * self.buckets
+            state.total = 0
+            state.port_bits = [0] * self.buckets
+            state.ports_sample = []
+        else:
+            counts = state.counts
+            port_bits = state.port_bits
+            for e in range(state.last_epoch + 1, epoch + 1):
+                slot = e % self.buckets
+                state.total -= counts[slot]
+                counts[slot] = 0
+                port_bits[slot] = 0
+        state.last_epoch = epoch
+
+    def _estimate_ports(self, state):
+        """Linear counting estimate of distinct destination ports in the window"""
+        bits = 0
+        for bucket in state.port_bits:
+            bits |= bucket
+        zeros = self.sketch_bits - bits.bit_count()
+        if zeros == 0:
+            return self.sketch_bits
+        return round(-self.sketch_bits * math.log(zeros / self.sketch_bits))
+
+    def _expire(self, shard, epoch):
+        """Drop a shard's IPs that have been silent for longer than one window"""
+        shard.swept = epoch
+        oldest = epoch - self.buckets
+        tracker = shard.entries
+        while tracker:
+            ip, state = next(iter(tracker.items()))
+            if state.last_epoch > oldest:
+                break
+            # Keep suppressed IPs until their cooldown has run out
+            if state.alerted_at is not None and (epoch * self.bucket_width) - state.alerted_at < self.limits.cooldown:
+                tracker.move_to_end(ip)
+                break
+            del tracker[ip]
+
+    def stats(self):
+        return {"tracked_ips": len(self.state), "evicted_ips": self.state.evicted()}
+
+    def bpf_filter(self):
+        """Kernel-side filter for the packets this detector needs: SYN without ACK"""
+        return "tcp[tcpflags] & (tcp-syn|tcp-ack) == tcp-syn"
+
     def reset_tracking(self, ip):
         """Reset tracking for an IP after alert is sent"""
-        with self.lock:
-            if ip in self.detected_ips:
-                self.detected_ips.remove(ip)
-            if ip in self.syn_tracker:
-                self.syn_tracker[ip].clear()
+        shard = self.state.shard(ip)
+        with shard.lock:
+            shard.entries.pop(ip, None)
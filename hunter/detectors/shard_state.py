@@ -0,0 +1,46 @@
+"""
+Sharded Detector State
+Per-IP detector state split into independently locked partitions
+"""
+
+from collections import OrderedDict
+from threading import Lock
+import config
+
+
+class StateShard:
+    """One partition: its own lock, its own IP -> state map (oldest first) and counters."""
+
+    __slots__ = ('lock', 'entries', 'swept', 'evicted')
+
+    def __init__(self):
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.swept = -1   # detector-defined marker for the last idle sweep
+        self.evicted = 0
+
+
+class ShardedState:
+    """
+    Partitions per-IP state into DETECTOR_STATE_SHARDS shards by hash of
+    the key. Packets from different sources take different locks, so
+    capture threads only contend when their sources share a shard, and
+    eviction and expiry only ever walk one shard while holding its lock.
+    """
+
+    def __init__(self, shards=None):
+        self.count = max(1, shards or config.DETECTOR_STATE_SHARDS)
+        self.shards = tuple(StateShard() for _ in range(self.count))
+
+    def shard(self, key):
+        return self.shards[hash(key) % self.count]
+
+    def capacity(self, total):
+        """Per-shard share of a global entry cap."""
+        return max(1, -(-total // self.count))
+
+    def __len__(self):
+        return sum(len(shard.entries) for shard in self.shards)
+
+    def evicted(self):
+        return sum(shard.evicted for shard in self.shards)
@@ -0,0 +1,190 @@
+"""
+Signature Engine
+Literal prefilter that gates per-rule regex confirmation, so per-payload
+cost tracks the rules that could plausibly match rather than the rule count
+"""
+
+import re
+import config
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+LITERAL = sre_constants.LITERAL
+SUBPATTERN = sre_constants.SUBPATTERN
+BRANCH = sre_constants.BRANCH
+AT = sre_constants.AT
+AT_BOUNDARY = sre_constants.AT_BOUNDARY
+
+WORD_RE = re.compile(r"\w+")
+
+
+def _ascii_case_folds():
+    """
+    Non-ASCII characters that re.IGNORECASE treats as an ASCII letter (the
+    Kelvin sign, long s, dotted and dotless i), mapped to that letter, so the
+    prefilter sees "javaſcript" the way the rules do. Confirmed against re
+    itself rather than listed by hand.
+    """
+    folds = {}
+    for code in range(0x80, 0x10000):
+        char = chr(code)
+        for variant in (char.lower(), char.upper(), char.casefold()):
+            letter = variant[:1].lower()
+            if letter.isascii() and letter.isalpha() and re.fullmatch(letter, char, re.IGNORECASE):
+                folds[code] = letter
+                break
+    return folds
+
+
+ASCII_FOLDS = _ascii_case_folds()
+
+
+def required_literals(pattern):
+    """
+    Find a set of lowercase literals, at least one of which must appear in
+    any text the pattern matches. Each entry is (literal, is_word) where
+    is_word means the literal is a whole \\b-delimited word.
+    Returns None when no such set can be derived (the rule is always checked).
+    """
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error:
+        return None
+    return _sequence_literals(list(parsed))
+
+
+def _sequence_literals(items):
+    candidates = []
+    run = []
+    left_bounded = False
+    prev_boundary = False
+
+    for op, av in items + [(None, None)]:
+        if op is LITERAL:
+            if not run:
+                left_bounded = prev_boundary
+            run.append(chr(av))
+            prev_boundary = False
+            continue
+
+        if run:
+            literal = "".join(run).lower()
+            right_bounded = op is AT and av is AT_BOUNDARY
+            is_word = left_bounded and right_bounded and WORD_RE.fullmatch(literal) is not None
+            candidates.append({(literal, is_word)})
+            run = []
+
+        if op is SUBPATTERN:
+            found = _sequence_literals(list(av[-1]))
+            if found:
+                candidates.append(found)
+        elif op is BRANCH:
+            alternatives = [_sequence_literals(list(branch)) for branch in av[1]]
+            if alternatives and all(alternatives):
+                candidates.append(set().union(*alternatives))
+
+        prev_boundary = op is AT and av is AT_BOUNDARY
+
+    if not candidates:
+        return None
+    # Prefer the set whose shortest literal is longest (most selective)
+    return max(candidates, key=lambda lits: min(len(lit) for lit, _ in lits))
+
+
+class SignatureMatch:
+    """Which rule fired, and the text it matched."""
+
+    __slots__ = ('category', 'rule_id', 'pattern', 'text')
+
+    def __init__(self, category, rule_id, pattern, text):
+        self.category = category
+        self.rule_id = rule_id
+        self.pattern = pattern
+        self.text = text
+
+
+class SignatureSet:
+    """
+    Matches a whole rule set against a payload.
+
+    Every rule is reduced to the literals it cannot match without. A payload
+    is case-folded the way re.IGNORECASE compares it and split into word
+    tokens once; whole-word literals are looked up in a dict keyed by token,
+    the few non-word literals (such as "--" or "<iframe") are substring-checked. Only rules whose literal was
+    seen have their compiled regex run, in priority order, so the first
+    confirmed rule is the same one the old sequential loop would report.
+    """
+
+    def __init__(self, rules):
+        """
+        rules: iterable of (category, pattern) pairs, in priority order.
+        """
+        self.rules = []
+        self.compiled = []
+        self.word_index = {}       # word -> [rule index, ...]
+        self.substring_index = {}  # literal -> [rule index, ...]
+        self.always = []           # rules without a usable literal
+
+        per_category = {}
+        for index, (category, pattern) in enumerate(rules):
+            rule_id = f"{category}:{per_category.get(category, 0)}"
+            per_category[category] = per_category.get(category, 0) + 1
+            self.rules.append((category, rule_id, pattern))
+            self.compiled.append(re.compile(pattern, re.IGNORECASE))
+
+            literals = required_literals(pattern)
+            if not literals or not all(literal.isascii() for literal, _ in literals):
+                # Non-ASCII literals have case variants lower() does not produce
+                self.always.append(index)
+                continue
+            for literal, is_word in literals:
+                target = self.word_index if is_word else self.substring_index
+                target.setdefault(literal, []).append(index)
+
+        self.substring_items = list(self.substring_index.items())
+
+    @classmethod
+    def from_config(cls):
+        return cls.from_settings(vars(config))
+
+    @classmethod
+    def from_settings(cls, settings):
+        """SQL injection rules first, then XSS, matching the old check order."""
+        rules = [("sql_injection", p) for p in settings['SQL_INJECTION_PATTERNS']]
+        rules += [("xss_attempt", p) for p in settings['XSS_PATTERNS']]
+        return cls(rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def candidates(self, payload):
+        """Indices of rules whose required literals appear in the payload."""
+        lowered = payload.lower() if payload.isascii() else payload.translate(ASCII_FOLDS).lower()
+        found = set(self.always)
+
+        if self.word_index:
+            word_index = self.word_index
+            for token in set(WORD_RE.findall(lowered)):
+                rules = word_index.get(token)
+                if rules:
+                    found.update(rules)
+
+        for literal, rules in self.substring_items:
+            if literal in lowered:
+                found.update(rules)
+
+        return found
+
+    def search(self, payload):
+        """Returns a SignatureMatch for the highest-priority rule that fires, or None."""
+        for index in sorted(self.candidates(payload)):
+            match = self.compiled[index].search(payload)
+            if match:
+                category, rule_id, pattern = self.rules[index]
+                return SignatureMatch(category, rule_id, pattern, match.group(0)[:50])
+        return None
@@ -0,0 +1,152 @@
+"""
+TCP Stream Reassembly
+Bounded per-flow buffers so payload signatures split across segments are still seen
+"""
+
+from collections import OrderedDict
+from threading import Lock
+import config
+
+SEQ_MASK = 0xFFFFFFFF
+SEQ_HALF = 0x80000000
+FIN_OR_RST = 0x01 | 0x04
+
+
+class FlowState:
+    """Per-flow reassembly state; only the trailing overlap is kept in memory."""
+
+    __slots__ = ('next_seq', 'context', 'inspected', 'last_seen')
+
+    def __init__(self, now):
+        self.next_seq = None
+        self.context = b""
+        self.inspected = 0
+        self.last_seen = now
+
+
+class StreamReassembler:
+    """
+    Tracks TCP flows keyed by (src_ip, sport, dst_ip, dport).
+
+    feed() returns the bytes that should be scanned for the segment: the
+    flow's retained overlap followed by the new, in-order data. New bytes
+    are scanned exactly once; only the last REASSEMBLY_OVERLAP bytes are
+    carried into the next window so a pattern split across two segments
+    still matches. Retransmitted bytes are trimmed, a sequence gap starts
+    a fresh context, and FIN/RST ends the flow.
+
+    Memory is bounded by REASSEMBLY_MAX_FLOWS * REASSEMBLY_OVERLAP: flows
+    are evicted least-recently-used first, and after REASSEMBLY_IDLE_TIMEOUT
+    seconds of silence. Each flow stops being inspected once
+    REASSEMBLY_FLOW_BUDGET bytes have been scanned.
+    """
+
+    def __init__(self):
+        self.flows = OrderedDict()  # 4-tuple -> FlowState, oldest first
+        self.lock = Lock()
+        self.max_flows = config.REASSEMBLY_MAX_FLOWS
+        self.idle_timeout = config.REASSEMBLY_IDLE_TIMEOUT
+        self.flow_budget = config.REASSEMBLY_FLOW_BUDGET
+        self.overlap = config.REASSEMBLY_OVERLAP
+
+        # Counters
+        self.bytes_buffered = 0
+        self.bytes_inspected = 0
+        self.evicted_flows = 0
+
+    @staticmethod
+    def flow_key(summary):
+        return (summary.src_ip, summary.sport, summary.dst_ip, summary.dport)
+
+    def feed(self, summary, now=None):
+        """
+        Add a TCP segment to its flow.
+        Returns the bytes to scan, or None if there is nothing new to inspect.
+        """
+        now = summary.timestamp if now is None else now
+        key = self.flow_key(summary)
+        data = summary.payload or b""
+
+        with self.lock:
+            self._expire(now)
+
+            flow = self.flows.get(key)
+            if flow is None:
+                if summary.tcp_flags & FIN_OR_RST and not data:
+                    return None
+                flow = FlowState(now)
+                self.flows[key] = flow
+                if len(self.flows) > self.max_flows:
+                    self._drop(next(iter(self.flows)))
+                    self.evicted_flows += 1
+            else:
+                self.flows.move_to_end(key)
+                flow.last_seen = now
+
+            window = self._append(flow, summary.tcp_seq, data)
+
+            if summary.tcp_flags & FIN_OR_RST:
+                self._drop(key)
+
+            return window
+
+    def _append(self, flow, seq, data):
+        if seq is not None and flow.next_seq is not None:
+            delta = (seq - flow.next_seq) & SEQ_MASK
+            if delta >= SEQ_HALF:
+                # Retransmission / overlap: skip bytes already scanned
+                already_seen = (flow.next_seq - seq) & SEQ_MASK
+                if already_seen >= len(data):
+                    return None
+                seq = flow.next_seq
+                data = data[already_seen:]
+            elif delta:
+                # Gap (loss or out-of-order): do not splice across it
+                self._set_context(flow, b"")
+
+        if seq is not None:
+            flow.next_seq = (seq + len(data)) & SEQ_MASK
+
+        remaining = self.flow_budget - flow.inspected
+        if not data or remaining <= 0:
+            return None
+        data = data[:remaining]
+        flow.inspected += len(data)
+        self.bytes_inspected += len(data)
+
+        window = flow.context + data if flow.context else data
+        self._set_context(flow, window[-self.overlap:] if self.overlap else b"")
+        return window
+
+    def clear_context(self, summary):
+        """Forget the retained overlap of a flow, e.g. after it produced an alert."""
+        with self.lock:
+            flow = self.flows.get(self.flow_key(summary))
+            if flow:
+                self._set_context(flow, b"")
+
+    def _set_context(self, flow, context):
+        self.bytes_buffered += len(context) - len(flow.context)
+        flow.context = context
+
+    def _drop(self, key):
+        flow = self.flows.pop(key, None)
+        if flow:
+            self.bytes_buffered -= len(flow.context)
+
+    def _expire(self, now):
+        deadline = now - self.idle_timeout
+        while self.flows:
+            key, flow = next(iter(self.flows.items()))
+            if flow.last_seen >= deadline:
+                break
+            self._drop(key)
+            self.evicted_flows += 1
+
+    def stats(self):
+        return {
+            "active_flows": len(self.flows),
+            "bytes_buffered": self.bytes_buffered,
+            "bytes_inspected": self.bytes_inspected,
+            "evicted_flows": self.evicted_flows,
+        }
@@ -0,0 +1,292 @@
+"""
+Sentinel-Eye GeoIP
+Offline IP range -> country/ASN lookups from a memory-mapped, sorted range table
+
+Build the data file once from a CSV export (from the hunter directory):
+    python geoip.py build ranges.csv data/geoip.bin
+"""
+
+import os
+import sys
+import csv
+import mmap
+import socket
+import struct
+import bisect
+import logging
+import argparse
+import ipaddress
+from array import array
+from functools import lru_cache
+from collections import namedtuple
+import config
+
+logger = logging.getLogger('GeoIP')
+
+MAGIC = b"SNTGEO01"
+HEADER = struct.Struct('<8sIII')  # magic, IPv4 ranges, IPv6 ranges, labels
+LOCAL_NETWORK = "Secure Network (Local)"
+UNKNOWN_LOCATION = "Global Web"
+U64 = (1 << 64) - 1
+
+GeoResult = namedtuple('GeoResult', ['location', 'country_code', 'asn', 'as_org'])
+
+LOCAL_RESULT = GeoResult(LOCAL_NETWORK, None, None, None)
+UNKNOWN_RESULT = GeoResult(UNKNOWN_LOCATION, None, None, None)
+
+# IPv4 special-purpose blocks (the ones ipaddress does not treat as global), for the fast path
+_SPECIAL_V4 = sorted(
+    (int(net.network_address), int(net.broadcast_address), net.is_multicast)
+    for net in map(ipaddress.ip_network, (
+        "0.0.0.0/8", "10.0.0.0/8", "100.64.0.0/10", "127.0.0.0/8", "169.254.0.0/16",
+        "172.16.0.0/12", "192.0.0.0/24", "192.0.2.0/24", "192.168.0.0/16", "198.18.0.0/15",
+        "198.51.100.0/24", "203.0.113.0/24", "224.0.0.0/4", "240.0.0.0/4",
+    ))
+)
+_SPECIAL_V4_STARTS = [start for start, _, _ in _SPECIAL_V4]
+
+
+def _column(buffer, offset, count, typecode):
+    """Zero-copy view of `count` little-endian integers starting at offset."""
+    size = array(typecode).itemsize
+    view = memoryview(buffer)[offset:offset + count * size].cast(typecode)
+    if sys.byteorder != 'little':
+        view = array(typecode, view)
+        view.byteswap()
+    return view, offset + count * size
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class GeoIPDatabase:
+    """
+    Read-only view of a compiled GeoIP file.
+
+    The file holds non-overlapping IPv4 and IPv6 ranges sorted by start
+    address, stored column by column (starts, ends, label index), followed
+    by a table of "country_code, country, asn, as_org" labels. Opening it
+    only maps the file; lookups binary-search the mapped columns, so start
+    time does not depend on the size of the database and the pages are
+    shared between processes (e.g. capture shards).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, v4_count, v6_count, label_count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Sentinel-Eye GeoIP file")
+        self.v4_count = v4_count
+        self.v6_count = v6_count
+
+        offset = _align(HEADER.size)
+        self.v4_starts, offset = _column(self.map, offset, v4_count, 'I')
+        self.v4_ends, offset = _column(self.map, offset, v4_count, 'I')
+        self.v4_labels, offset = _column(self.map, offset, v4_count, 'I')
+        offset = _align(offset)
+        self.v6_start_hi, offset = _column(self.map, offset, v6_count, 'Q')
+        self.v6_start_lo, offset = _column(self.map, offset, v6_count, 'Q')
+        self.v6_end_hi, offset = _column(self.map, offset, v6_count, 'Q')
+        self.v6_end_lo, offset = _column(self.map, offset, v6_count, 'Q')
+        self.v6_labels, offset = _column(self.map, offset, v6_count, 'I')
+        self.label_offsets, offset = _column(self.map, offset, label_count + 1, 'I')
+        self.label_base = offset
+        self.label = lru_cache(maxsize=4096)(self._label)
+
+    def _label(self, index):
+        start = self.label_base + self.label_offsets[index]
+        end = self.label_base + self.label_offsets[index + 1]
+        country_code, country, asn, as_org = self.map[start:end].decode('utf-8').split('\t')
+        return GeoResult(country or country_code or UNKNOWN_LOCATION, country_code or None,
+                         int(asn) if asn else None, as_org or None)
+
+    def find_v4(self, value):
+        index = bisect.bisect_right(self.v4_starts, value) - 1
+        if index >= 0 and value <= self.v4_ends[index]:
+            return self.label(self.v4_labels[index])
+        return None
+
+    def find_v6(self, value):
+        hi, lo = value >> 64, value & U64
+        starts_hi, starts_lo = self.v6_start_hi, self.v6_start_lo
+        low, high = 0, self.v6_count
+        # Rightmost range whose start is <= value
+        while low < high:
+            mid = (low + high) // 2
+            if (starts_hi[mid], starts_lo[mid]) <= (hi, lo):
+                low = mid + 1
+            else:
+                high = mid
+        index = low - 1
+        if index >= 0 and (hi, lo) <= (self.v6_end_hi[index], self.v6_end_lo[index]):
+            return self.label(self.v6_labels[index])
+        return None
+
+    def close(self):
+        for name in ('v4_starts', 'v4_ends', 'v4_labels', 'v6_start_hi', 'v6_start_lo',
+                     'v6_end_hi', 'v6_end_lo', 'v6_labels', 'label_offsets'):
+            view = getattr(self, name)
+            if isinstance(view, memoryview):
+                view.release()
+        self.map.close()
+        self.file.close()
+
+
+class GeoIPResolver:
+    """
+    Classifies threat source addresses.
+
+    Private, loopback, link-local and other non-routable addresses (including
+    172.16.0.0/12 and IPv6 ULA) resolve to the local network without touching
+    the database. Public addresses are looked up in GEOIP_DATABASE when it is
+    present. Results for the last GEOIP_CACHE_SIZE distinct addresses are
+    cached, since an attack usually repeats the same few sources.
+    """
+
+    def __init__(self, path=None, cache_size=None):
+        path = path or config.GEOIP_DATABASE
+        self.database = None
+        if path and os.path.exists(path):
+            try:
+                self.database = GeoIPDatabase(path)
+                logger.info(f"GeoIP database {path}: {self.database.v4_count} IPv4 / "
+                            f"{self.database.v6_count} IPv6 ranges")
+            except (OSError, ValueError) as e:
+                logger.error(f"Cannot open GeoIP database {path}: {e}")
+        else:
+            logger.warning(f"GeoIP database {path} not found; public addresses resolve to '{UNKNOWN_LOCATION}'")
+        size = config.GEOIP_CACHE_SIZE if cache_size is None else cache_size
+        self.lookup = lru_cache(maxsize=size)(self._lookup) if size else self._lookup
+
+    def _lookup(self, ip_address):
+        """GeoResult for an address string; malformed input resolves to the unknown location."""
+        try:
+            # Fast path for dotted-quad IPv4, the common case
+            value = int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+        except (OSError, TypeError):
+            return self._lookup_slow(ip_address)
+        index = bisect.bisect_right(_SPECIAL_V4_STARTS, value) - 1
+        if index >= 0 and value <= _SPECIAL_V4[index][1]:
+            return UNKNOWN_RESULT if _SPECIAL_V4[index][2] else LOCAL_RESULT
+        if self.database is None:
+            return UNKNOWN_RESULT
+        return self.database.find_v4(value) or UNKNOWN_RESULT
+
+    def _lookup_slow(self, ip_address):
+        try:
+            address = ipaddress.ip_address(ip_address)
+        except ValueError:
+            return UNKNOWN_RESULT
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            return LOCAL_RESULT if not address.is_multicast else UNKNOWN_RESULT
+        if self.database is None:
+            return UNKNOWN_RESULT
+        if address.version == 4:
+            result = self.database.find_v4(int(address))
+        else:
+            result = self.database.find_v6(int(address))
+        return result or UNKNOWN_RESULT
+
+    def stats(self):
+        if not hasattr(self.lookup, 'cache_info'):
+            return {}
+        info = self.lookup.cache_info()
+        return {"cache_hits": info.hits, "cache_misses": info.misses, "cache_entries": info.currsize}
+
+    def close(self):
+        if self.database:
+            self.database.close()
+
+
+def _parse_row(row):
+    """(version, start, end, label) from 'cidr,...' or 'start_ip,end_ip,...' rows."""
+    if '/' in row[0]:
+        network = ipaddress.ip_network(row[0].strip(), strict=False)
+        start, end, rest = network.network_address, network.broadcast_address, row[1:]
+    else:
+        start, end, rest = ipaddress.ip_address(row[0].strip()), ipaddress.ip_address(row[1].strip()), row[2:]
+    rest = [field.strip().replace('\t', ' ') for field in rest] + [""] * 4
+    country_code, country, asn, as_org = rest[:4]
+    asn = asn.upper().removeprefix("AS")
+    return start.version, int(start), int(end), "\t".join((country_code, country, asn, as_org))
+
+
+def build_database(rows, path):
+    """
+    Compile (version, start, end, label) rows into a GeoIP file at path.
+    Ranges must not overlap, as in GeoLite2, DB-IP or iptoasn exports.
+    Returns (IPv4 ranges, IPv6 ranges).
+    """
+    labels = {}
+    v4, v6 = [], []
+    for version, start, end, label in rows:
+        index = labels.setdefault(label, len(labels))
+        (v4 if version == 4 else v6).append((start, end, index))
+    v4.sort()
+    v6.sort()
+
+    blob = bytearray()
+    offsets = array('I', [0])
+    for label in labels:  # dicts keep insertion order, which matches the indexes
+        blob += label.encode('utf-8')
+        offsets.append(len(blob))
+
+    def column(typecode, values):
+        data = array(typecode, values)
+        if sys.byteorder != 'little':
+            data.byteswap()
+        return data.tobytes()
+
+    def pad(f):
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+
+    tmp = path + ".tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(v4), len(v6), len(labels)))
+        pad(f)
+        f.write(column('I', (r[0] for r in v4)))
+        f.write(column('I', (r[1] for r in v4)))
+        f.write(column('I', (r[2] for r in v4)))
+        pad(f)
+        f.write(column('Q', (r[0] >> 64 for r in v6)))
+        f.write(column('Q', (r[0] & U64 for r in v6)))
+        f.write(column('Q', (r[1] >> 64 for r in v6)))
+        f.write(column('Q', (r[1] & U64 for r in v6)))
+        f.write(column('I', (r[2] for r in v6)))
+        f.write(column('I', offsets))
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(v4), len(v6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentinel-Eye GeoIP database tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Compile a CSV of ranges: cidr|start,end, country_code, country, asn, as_org")
+    build.add_argument('csv')
+    build.add_argument('output', nargs='?', default=config.GEOIP_DATABASE)
+    lookup = commands.add_parser('lookup', help="Resolve addresses with the compiled database")
+    lookup.add_argument('addresses', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.csv, newline='', encoding='utf-8') as f:
+            rows = (_parse_row(row) for row in csv.reader(f)
+                    if row and not row[0].startswith('#') and not row[0].lower().startswith(('network', 'start')))
+            v4, v6 = build_database(rows, args.output)
+        print(f"Wrote {args.output}: {v4} IPv4 and {v6} IPv6 ranges")
+    else:
+        resolver = GeoIPResolver()
+        for address in args.addresses:
+            print(address, tuple(resolver.lookup(address)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Sentinel-Eye Intrusion Prevention
+Expiring block set with batched commits to a pluggable firewall backend
+"""
+
+import time
+import logging
+import ipaddress
+import threading
+import subprocess
+import config
+
+logger = logging.getLogger('IPSEnforcer')
+
+
+class DryRunBackend:
+    """Stand-in firewall: remembers what it was told to block and touches nothing."""
+
+    name = "dry-run"
+
+    def __init__(self):
+        self.blocked = {}  # ip -> ttl seconds
+        self.commits = 0
+
+    def add(self, entries):
+        """entries: [(ip, ttl_seconds), ...], applied as one commit."""
+        self.commits += 1
+        self.blocked.update(entries)
+
+    def remove(self, ips):
+        self.commits += 1
+        for ip in ips:
+            self.blocked.pop(ip, None)
+
+    def close(self):
+        pass
+
+
+class NftablesBackend:
+    """
+    Blocks through nftables sets with per-element timeouts, so the kernel
+    expires entries itself. Each add() is one `nft -f -` transaction no
+    matter how many addresses it carries. Setup creates (or reuses) table
+    IPS_NFT_TABLE with sets blocked_v4 / blocked_v6 and an input chain that
+    drops their members; existing set members survive a restart.
+    """
+
+    name = "nftables"
+
+    def __init__(self, table=None):
+        self.table = table or config.IPS_NFT_TABLE
+        self.commits = 0
+        t = self.table
+        self._run(
+            f"table inet {t} {{\n"
+            f"  set blocked_v4 {{ type ipv4_addr; flags timeout; }}\n"
+            f"  set blocked_v6 {{ type ipv6_addr; flags timeout; }}\n"
+            f"  chain input {{ type filter hook input priority -10; }}\n"
+            f"}}\n"
+            f"flush chain inet {t} input\n"
+            f"add rule inet {t} input ip saddr @blocked_v4 drop\n"
+            f"add rule inet {t} input ip6 saddr @blocked_v6 drop\n"
+        )
+
+    def _run(self, script):
+        subprocess.run(["nft", "-f", "-"], input=script, text=True, check=True, capture_output=True)
+        self.commits += 1
+
+    def _elements(self, entries, timeout):
+        v4, v6 = [], []
+        for ip, ttl in entries:
+            element = f"{ip} timeout {int(ttl)}s" if timeout else ip
+            (v6 if ":" in ip else v4).append(element)
+        return [(name, items) for name, items in (("blocked_v4", v4), ("blocked_v6", v6)) if items]
+
+    def add(self, entries):
+        # "add element" on an existing member is a no-op, so retries are safe
+        self._run("".join(f"add element inet {self.table} {name} {{ {', '.join(items)} }}\n"
+                          for name, items in self._elements(entries, timeout=True)))
+
+    def remove(self, ips):
+        # Only for manual unblocks; expiry is handled by the set timeout
+        self._run("".join(f"delete element inet {self.table} {name} {{ {', '.join(items)} }}\n"
+                          for name, items in self._elements([(ip, 0) for ip in ips], timeout=False)))
+
+    def close(self):
+        pass
+
+
+class IpsetBackend:
+    """
+    Blocks through ipset hash:ip sets with timeouts, one `ipset restore` per
+    commit. The sets must be referenced by an iptables rule, e.g.
+    `iptables -I INPUT -m set --match-set sentinel-v4 src -j DROP`.
+    """
+
+    name = "ipset"
+
+    def __init__(self, prefix=None):
+        self.prefix = prefix or config.IPS_IPSET_PREFIX
+        self.commits = 0
+        self._run(f"create {self.prefix}-v4 hash:ip family inet timeout 0 -exist\n"
+                  f"create {self.prefix}-v6 hash:ip family inet6 timeout 0 -exist\n")
+
+    def _run(self, script):
+        subprocess.run(["ipset", "restore"], input=script, text=True, check=True, capture_output=True)
+        self.commits += 1
+
+    def _set(self, ip):
+        return f"{self.prefix}-v6" if ":" in ip else f"{self.prefix}-v4"
+
+    def add(self, entries):
+        self._run("".join(f"add {self._set(ip)} {ip} timeout {int(ttl)} -exist\n" for ip, ttl in entries))
+
+    def remove(self, ips):
+        self._run("".join(f"del {self._set(ip)} {ip} -exist\n" for ip in ips))
+
+    def close(self):
+        pass
+
+
+BACKENDS = {
+    "dry-run": DryRunBackend,
+    "nftables": NftablesBackend,
+    "ipset": IpsetBackend,
+}
+
+
+class IPSEnforcer:
+    """
+    Decides and applies automatic blocks.
+
+    block() records the source in an in-memory set for IPS_BLOCK_TTL
+    seconds and queues it for the firewall; a source that is already
+    blocked is not queued again. Every IPS_COMMIT_INTERVAL seconds a
+    background thread hands everything queued to the backend in a single
+    commit, so a flood of new sources costs one firewall call per interval
+    rather than one per source. should_drop() is a dict lookup, cheap
+    enough for the capture callback to drop a source's packets before they
+    reach the detectors, but only once a kernel backend has committed its
+    block: until then, and always in dry-run, its packets still reach the
+    host and are still inspected.
+
+    A source whose commit fails is dropped from the block set, so
+    is_blocked() and the BLOCKED label only cover blocks the backend
+    accepted (or was about to), and its next alert queues it again.
+
+    Addresses in IPS_ALLOWLIST are never blocked. When the backend cannot
+    be set up (no nft, no privileges) the enforcer falls back to dry-run
+    and blocking only happens in-process.
+    """
+
+    def __init__(self, backend=None, ttl=None, interval=None):
+        self.ttl = config.IPS_BLOCK_TTL if ttl is None else ttl
+        self.interval = config.IPS_COMMIT_INTERVAL if interval is None else interval
+        self.max_blocked = config.IPS_MAX_BLOCKED
+        self.allowlist = [ipaddress.ip_network(net) for net in config.IPS_ALLOWLIST]
+        self.backend = backend or self._make_backend(config.IPS_BACKEND)
+
+        self.lock = threading.Lock()
+        self.blocked = {}   # ip -> monotonic expiry; read without the lock on the hot path
+        self.enforced = {}  # Same, for blocks the firewall has committed; the early-drop set
+        self.pending = []   # (ip, ttl) waiting for the next commit
+        self.running = False
+        self.thread = None
+
+        # Metrics
+        self.blocks = 0
+        self.repeats = 0
+        self.allowlisted = 0
+        self.refused = 0
+        self.commits = 0
+        self.commit_failures = 0
+        self.dropped_packets = 0
+
+    @staticmethod
+    def _make_backend(name):
+        try:
+            return BACKENDS[name]()
+        except (KeyError, OSError, subprocess.CalledProcessError) as e:
+            logger.error(f"IPS backend '{name}' unavailable ({e}); blocking in dry-run mode")
+            return DryRunBackend()
+
+    def is_allowlisted(self, ip):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return True  # Not something a firewall set can hold
+        return any(address in net for net in self.allowlist)
+
+    def is_blocked(self, ip):
+        expires = self.blocked.get(ip)
+        return expires is not None and expires > time.monotonic()
+
+    @property
+    def enforcing(self):
+        """Whether blocks reach a kernel firewall (False in dry-run or after a failed setup)."""
+        return not isinstance(self.backend, DryRunBackend)
+
+    def should_drop(self, ip):
+        """Capture-side filter for sources the firewall is blocking, counting the packets it discards."""
+        expires = self.enforced.get(ip)
+        if expires is not None and expires > time.monotonic():
+            self.dropped_packets += 1
+            return True
+        return False
+
+    def block(self, ip):
+        """
+        Block a source. Returns seconds left on its block, with new=True if
+        this call created it: (remaining, new). (0, False) means it was not
+        blocked (allowlisted or the block set is full).
+        """
+        now = time.monotonic()
+        with self.lock:
+            expires = self.blocked.get(ip)
+            if expires is not None and expires > now:
+                self.repeats += 1
+                return expires - now, False
+            if self.is_allowlisted(ip):
+                self.allowlisted += 1
+                return 0, False
+            if expires is None and len(self.blocked) >= self.max_blocked:
+                self.refused += 1
+                return 0, False
+            self.blocked[ip] = now + self.ttl
+            self.pending.append((ip, self.ttl))
+            self.blocks += 1
+            return self.ttl, True
+
+    def commit(self):
+        """Send queued blocks to the backend in one call and forget expired ones."""
+        now = time.monotonic()
+        with self.lock:
+            batch, self.pending = self.pending, []
+            expired = [ip for ip, expires in self.blocked.items() if expires <= now]
+            for ip in expired:
+                del self.blocked[ip]
+                self.enforced.pop(ip, None)
+
+        if batch:
+            try:
+                self.backend.add(batch)
+                self.commits += 1
+                if self.enforcing:
+                    with self.lock:
+                        for ip, _ in batch:
+                            if ip in self.blocked:
+                                self.enforced[ip] = self.blocked[ip]
+                logger.info(f"IPS committed {len(batch)} blocks via {self.backend.name}")
+            except (OSError, subprocess.CalledProcessError) as e:
+                # The firewall never got these sources: forget them, so their next alert queues them again
+                self.commit_failures += 1
+                with self.lock:
+                    for ip, _ in batch:
+                        self.blocked.pop(ip, None)
+                logger.error(f"IPS commit of {len(batch)} blocks failed: {e}; they will be retried on their next alert")
+        if expired and isinstance(self.backend, DryRunBackend):
+            self.backend.remove(expired)  # Real backends expire elements themselves
+        return len(batch)
+
+    def _commit_loop(self):
+        while self.running:
+            time.sleep(self.interval)
+            self.commit()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._commit_loop, daemon=True)
+        self.thread.start()
+        logger.info(f"IPS enforcement started ({self.backend.name}, {self.ttl}s blocks, "
+                    f"commits every {self.interval}s)")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "blocked_ips": len(self.blocked),
+                "enforced_ips": len(self.enforced),
+                "pending": len(self.pending),
+                "blocks": self.blocks,
+                "repeats": self.repeats,
+                "allowlisted": self.allowlisted,
+                "refused": self.refused,
+                "commits": self.commits,
+                "commit_failures": self.commit_failures,
+                "dropped_packets": self.dropped_packets,
+            }
+
+    def stop(self):
+        """Stop the timer and commit whatever is still queued."""
+        self.running = False
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        self.commit()
+        self.backend.close()
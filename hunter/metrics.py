@@ -0,0 +1,221 @@
+"""
+Sentinel-Eye Metrics
+Low-overhead counters, gauges and latency histograms with a Prometheus/JSON endpoint
+"""
+
+import json
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import config
+
+logger = logging.getLogger('Metrics')
+
+# Seconds; roughly x2.5 steps from 1us to 10s
+LATENCY_BUCKETS = (
+    0.000001, 0.0000025, 0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025,
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative on export, like Prometheus)."""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'lock')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self.lock:
+            counts = list(self.counts)
+            count, total = self.count, self.sum
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return {
+            "count": count,
+            "sum": total,
+            "avg": total / count if count else 0.0,
+            "p50": self._quantile(cumulative, count, 0.50),
+            "p99": self._quantile(cumulative, count, 0.99),
+            "buckets": cumulative,
+        }
+
+    def _quantile(self, cumulative, count, q):
+        """Upper bound of the bucket holding the q-th observation (None past the last bucket)."""
+        if not count:
+            return 0.0
+        target = q * count
+        for index, running in enumerate(cumulative):
+            if running >= target:
+                return self.buckets[index] if index < len(self.buckets) else None
+        return None
+
+
+class MetricsRegistry:
+    """
+    Holds every metric the engine exports.
+
+    Counters and histograms are keyed by (name, label value); gauges are
+    callables evaluated at export time so hot paths never update them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}    # name -> {label: value}
+        self.histograms = {}  # name -> {label: Histogram}
+        self.gauges = {}      # name -> callable returning a number or {label: number}
+        self.labels = {}      # name -> label key
+        self.help = {}
+
+    def describe(self, name, text, label=None):
+        self.help[name] = text
+        if label:
+            self.labels[name] = label
+
+    def inc(self, name, amount=1, label=""):
+        series = self.counters.get(name)
+        if series is None:
+            with self.lock:
+                series = self.counters.setdefault(name, {})
+        series[label] = series.get(label, 0) + amount
+
+    def observe(self, name, value, label=""):
+        series = self.histograms.get(name)
+        if series is None:
+            with self.lock:
+                series = self.histograms.setdefault(name, {})
+        histogram = series.get(label)
+        if histogram is None:
+            with self.lock:
+                histogram = series.setdefault(label, Histogram())
+        histogram.observe(value)
+
+    def gauge(self, name, fn, text=None, label=None):
+        self.gauges[name] = fn
+        if text:
+            self.describe(name, text, label)
+
+    def _gauge_values(self, name, fn):
+        try:
+            value = fn()
+        except Exception as e:
+            logger.error(f"Gauge {name} failed: {e}")
+            return {}
+        return value if isinstance(value, dict) else {"": value}
+
+    def snapshot(self):
+        """JSON-friendly view of every metric."""
+        data = {"counters": {}, "gauges": {}, "histograms": {}}
+        for name, series in list(self.counters.items()):
+            data["counters"][name] = dict(series)
+        for name, fn in list(self.gauges.items()):
+            data["gauges"][name] = self._gauge_values(name, fn)
+        for name, series in list(self.histograms.items()):
+            data["histograms"][name] = {label: h.snapshot() for label, h in list(series.items())}
+        return data
+
+    def render_prometheus(self):
+        """Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind):
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def labels(name, label, extra=None):
+            parts = []
+            if label != "":
+                parts.append(f'{self.labels.get(name, "label")}="{label}"')
+            if extra:
+                parts.append(extra)
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        for name, series in sorted(self.counters.items()):
+            header(name, "counter")
+            for label, value in sorted(series.items()):
+                lines.append(f"{name}{labels(name, label)} {value}")
+
+        for name, fn in sorted(self.gauges.items()):
+            header(name, "gauge")
+            for label, value in sorted(self._gauge_values(name, fn).items()):
+                lines.append(f"{name}{labels(name, label)} {value}")
+
+        for name, series in sorted(self.histograms.items()):
+            header(name, "histogram")
+            for label, histogram in sorted(series.items()):
+                snap = histogram.snapshot()
+                bounds = [repr(b) for b in histogram.buckets] + ["+Inf"]
+                for bound, running in zip(bounds, snap["buckets"]):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{name}_bucket{labels(name, label, le)} {running}")
+                lines.append(f"{name}_sum{labels(name, label)} {snap['sum']}")
+                lines.append(f"{name}_count{labels(name, label)} {snap['count']}")
+
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Serves GET /metrics (Prometheus text) and GET /metrics.json (snapshot
+    the dashboard can chart) on config.METRICS_PORT.
+    """
+
+    def __init__(self, registry, host=None, port=None):
+        self.registry = registry
+        host = host or config.METRICS_HOST
+        port = config.METRICS_PORT if port is None else port
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = registry.render_prometheus().encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry.snapshot()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        logger.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,177 @@
+"""
+Sentinel-Eye Rule Reloading
+Versioned rule and threshold file, applied to running detectors without a restart
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import config
+
+logger = logging.getLogger('RuleWatcher')
+
+# Settings a rule file may override. Anything that sizes detector state
+# (windows, bucket counts, table capacities) still needs a restart.
+RELOADABLE = (
+    "PORT_SCAN_THRESHOLD",
+    "PORT_SCAN_ALERT_COOLDOWN",
+    "HONEYPOT_ENABLED",
+    "HONEYPOT_PORTS",
+    "HONEYPOT_RISK_SCORE",
+    "ANOMALY_Z_THRESHOLD",
+    "ANOMALY_ALERT_COOLDOWN",
+    "SQL_INJECTION_PATTERNS",
+    "XSS_PATTERNS",
+    "RISK_SCORES",
+    "IPS_BLOCK_THRESHOLD",
+    "IPS_EXEMPT_TYPES",
+    "CAPTURE_RAW_PAYLOAD",
+    "MAX_PAYLOAD_SIZE",
+)
+
+
+# Settings that end up as a threat's risk_score, which the API only accepts as an integer 1-100
+RISK_SETTINGS = ("HONEYPOT_RISK_SCORE", "RISK_SCORES")
+
+
+def _matches(value, default):
+    """Whether value has the default's shape: ints stay ints, lists and dicts match their items."""
+    if isinstance(default, bool):
+        return isinstance(value, bool)
+    if isinstance(default, int):
+        return isinstance(value, int) and not isinstance(value, bool)
+    if isinstance(default, float):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if isinstance(default, list):
+        return isinstance(value, list) and (not default or all(_matches(v, default[0]) for v in value))
+    if isinstance(default, dict):
+        sample = next(iter(default.values()), None)
+        return isinstance(value, dict) and (sample is None or all(_matches(v, sample) for v in value.values()))
+    return isinstance(value, type(default))
+
+
+def _check(name, value, default):
+    """Reject values whose shape differs from the config.py default."""
+    if not _matches(value, default):
+        raise ValueError(f"{name}: expected a value like {default!r}, got {value!r}")
+    if name in RISK_SETTINGS:
+        scores = value.values() if isinstance(value, dict) else [value]
+        if not all(1 <= score <= 100 for score in scores):
+            raise ValueError(f"{name}: risk scores must be 1-100, got {value!r}")
+
+
+def load_rules(path):
+    """
+    Read a rule file:
+
+        {"version": "2026-10-17.1", "settings": {"PORT_SCAN_THRESHOLD": 30, ...}}
+
+    Returns (version, settings). Raises ValueError for anything malformed.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"not valid JSON: {e}")
+
+    if not isinstance(data, dict) or data.get("version") in (None, ""):
+        raise ValueError("missing \"version\"")
+    settings = data.get("settings", {})
+    if not isinstance(settings, dict):
+        raise ValueError("\"settings\" must be an object")
+
+    unknown = sorted(set(settings) - set(RELOADABLE))
+    if unknown:
+        raise ValueError(f"not reloadable: {', '.join(unknown)}")
+    for name, value in settings.items():
+        _check(name, value, getattr(config, name))
+    return str(data["version"]), settings
+
+
+def apply_settings(pipeline, settings):
+    """
+    Compile a pipeline's rules for `settings`, then make them live: config
+    values read at use time are replaced one attribute at a time, and each
+    detector swaps in its compiled rules. A bad rule raises before anything
+    changes.
+    """
+    compiled = pipeline.compile_rules(settings)
+    for name, value in settings.items():
+        setattr(config, name, value)
+    pipeline.apply_rules(compiled)
+
+
+class RuleWatcher:
+    """
+    Polls RULES_FILE every RULES_RELOAD_INTERVAL seconds and hands a changed,
+    valid file to apply(settings), where settings are the config.py defaults
+    overlaid with the file's overrides (so deleting a key restores its
+    default). apply() runs on the watcher thread and may raise to reject
+    the update; the previous version then stays active. A missing file
+    leaves the current rules alone.
+    """
+
+    def __init__(self, apply, path=None, interval=None):
+        self.apply = apply
+        self.path = path or config.RULES_FILE
+        self.interval = config.RULES_RELOAD_INTERVAL if interval is None else interval
+        self.defaults = {name: getattr(config, name) for name in RELOADABLE}
+        self.version = "builtin"  # config.py as imported
+        self.mtime = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+        # Metrics
+        self.reloads = 0
+        self.failures = 0
+        self.loaded_at = 0.0
+
+    def check(self):
+        """Apply the file if it changed since the last check. Returns True when a new version went live."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self.mtime:
+            return False
+        self.mtime = mtime
+
+        start = time.perf_counter()
+        try:
+            version, overrides = load_rules(self.path)
+            self.apply({**self.defaults, **overrides})
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Rejected {self.path}: {e} (keeping version {self.version})")
+            return False
+
+        self.version = version
+        self.reloads += 1
+        self.loaded_at = time.time()
+        logger.info(f"Rules version {version} active ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return True
+
+    def _watch_loop(self):
+        while not self.stopped.wait(self.interval):
+            self.check()
+
+    def start(self):
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self.thread.start()
+        logger.info(f"Watching {self.path} for rule changes")
+
+    def version_info(self):
+        """Active version as a label, for the sentinel_rules_version gauge."""
+        return {self.version: 1}
+
+    def stats(self):
+        return {"reloads": self.reloads, "failures": self.failures, "loaded_at": self.loaded_at}
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
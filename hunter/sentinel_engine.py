@@ -1,20 +1,32 @@
 """
 Sentinel-Eye Hunter Engine Pro
-Multi-threaded network intrusion detection system with AI analysis, IPS, and Honeypot
+Asyncio-core network intrusion detection system with AI analysis, IPS, and Honeypot
 """
 
 import time
+import uuid
 import logging
 import threading
 import queue
-import requests
 import json
 import asyncio
+import argparse
+from collections import Counter
 import binascii
-from scapy.all import sniff, get_if_list, conf, Raw
+from scapy.all import sniff, get_if_list, conf, PcapReader
 from datetime import datetime
 import config
-from detectors import PortScanDetector, ARPSpoofDetector, PayloadInspector, HoneypotDetector
+from detectors import summarize, DetectorPipeline, render_metadata
+from sharding import ShardedCapture
+from delivery import ThreatDelivery
+from spool import ThreatSpool
+from metrics import MetricsRegistry, MetricsServer
+from ai_analysis import ThreatAnalyzer
+from geoip import GeoIPResolver
+from aggregation import ThreatAggregator
+from async_core import ThreatBridge, AsyncThreatDelivery
+from ips import IPSEnforcer
+from rules import RuleWatcher, apply_settings
 
 
 # Configure logging
@@ -35,60 +47,150 @@ class SentinelEngine:
     """
     
     def __init__(self):
-        self.threat_queue = queue.Queue(maxsize=config.MAX_QUEUE_SIZE)
+        # Async core: threats cross to the event loop through a thread-safe bridge
+        self.async_core = config.ENGINE_MODE == "async"
+        self.threat_queue = ThreatBridge() if self.async_core else queue.Queue(maxsize=config.MAX_QUEUE_SIZE)
         self.running = False
         self.interface = None
         
+        self.capture = None
+        self.bpf_filter = None
+        
         # Initialize detection modules
-        self.port_detector = PortScanDetector()
-        self.arp_detector = ARPSpoofDetector()
-        self.payload_inspector = PayloadInspector()
-        self.honeypot = HoneypotDetector()
+        self.pipeline = DetectorPipeline()
+        self.rules = RuleWatcher(self.apply_rules) if config.RULES_FILE else None
+        if self.rules:
+            self.rules.check()  # Start on the current rule file, not just config.py
+        self.metrics = MetricsRegistry()
+        self.spool = ThreatSpool() if config.SPOOL_ENABLED else None
+        overflow = self.spool_payloads if self.spool else None
+        if self.async_core:
+            self.delivery = AsyncThreatDelivery(overflow=overflow, metrics=self.metrics)
+        else:
+            self.delivery = ThreatDelivery(overflow=overflow, metrics=self.metrics)
+        self.analyzer = ThreatAnalyzer()
+        self.geoip = GeoIPResolver()
+        self.aggregator = ThreatAggregator(self.enqueue_threat) if config.AGGREGATION_ENABLED else None
+        self.ips = IPSEnforcer() if config.IPS_BLOCKING_ENABLED else None
+        # Sources a kernel firewall has blocked are discarded in the capture callback, before
+        # detection; in dry-run (or if setup fell back to it) their packets are still inspected
+        self.drop_filter = self.ips.should_drop if self.ips and self.ips.enforcing and config.IPS_EARLY_DROP else None
+        # Late AI explanations go out on their own small delivery channel
+        self.non_blocking_ai = config.AI_NON_BLOCKING and not self.analyzer.mock
+        self.analysis_delivery = None
+        if self.non_blocking_ai:
+            self.analysis_delivery = (AsyncThreatDelivery(batch_url=config.API_ANALYSIS_URL, concurrency=1)
+                                      if self.async_core else
+                                      ThreatDelivery(batch_url=config.API_ANALYSIS_URL, senders=1))
+        
+        # Hot-path instrumentation: detectors are timed on 1 in N packets
+        self.packets_seen = 0
+        self.sample_rate = max(1, config.METRICS_SAMPLE_RATE)
+        self.register_metrics()
         
         logger.info("Sentinel-Eye Engine Pro initialized")
     
-    def extract_raw_payload(self, packet):
-        """Extracts raw hex data for forensic analysis."""
-        if packet.haslayer(Raw):
-            payload = packet[Raw].load
-            # Truncate and convert to hex
-            hex_data = binascii.hexlify(payload[:config.MAX_PAYLOAD_SIZE]).decode('utf-8')
-            # Format with spaces for readability
-            return " ".join(hex_data[i:i+2] for i in range(0, len(hex_data), 2))
-        return "No raw payload data (Header only)"
+    def register_metrics(self):
+        m = self.metrics
+        m.describe("sentinel_threats_total", "Threats detected", label="attack_type")
+        m.describe("sentinel_detector_seconds", "Detector analyze() time (sampled)", label="detector")
+        m.describe("sentinel_queue_wait_seconds", "Time threats spend in threat_queue")
+        m.describe("sentinel_ai_seconds", "analyze_with_ai() time")
+        m.describe("sentinel_api_round_trip_seconds", "Batch POST round-trip time")
+        m.gauge("sentinel_packets_total",
+                lambda: self.packets_seen + (self.capture.submitted if self.capture else 0),
+                "Packets handed to detection")
+        m.gauge("sentinel_threat_queue_depth", self.threat_queue.qsize, "Threats waiting for a processor")
+        m.gauge("sentinel_delivery", self.delivery.metrics, "Threat delivery state", label="state")
+        m.gauge("sentinel_ai", self.analyzer.metrics, "AI analysis cache and rate limiter", label="state")
+        m.gauge("sentinel_geoip", self.geoip.stats, "GeoIP lookup cache", label="state")
+        if self.aggregator:
+            m.gauge("sentinel_aggregation", self.aggregator.stats, "Alert aggregation state", label="state")
+        if self.rules:
+            m.gauge("sentinel_rules_version", self.rules.version_info, "Active rule file version", label="version")
+            m.gauge("sentinel_rules", self.rules.stats, "Rule file reloads", label="state")
+        if self.ips:
+            m.gauge("sentinel_ips", self.ips.stats, "IPS block set and firewall commits", label="state")
+        if self.spool:
+            m.gauge("sentinel_spool", self.spool.metrics, "On-disk spool state", label="state")
+        m.gauge("sentinel_port_scan", self.pipeline.port_detector.stats, "Port scan tracker state", label="state")
+        if self.pipeline.anomaly:
+            m.gauge("sentinel_anomaly", self.pipeline.anomaly.stats, "Traffic anomaly scoring state", label="state")
+        streams = self.pipeline.payload_inspector.streams
+        if streams:
+            m.gauge("sentinel_reassembly", streams.stats, "TCP reassembly state", label="state")
+
+    def observe_detector(self, name, seconds):
+        self.metrics.observe("sentinel_detector_seconds", seconds, name)
+
+    def handle_threat(self, threat):
+        """Every detection lands here; repeats are collapsed before queuing when aggregation is on."""
+        self.metrics.inc("sentinel_threats_total", label=threat['attack_type'])
+        if self.aggregator:
+            self.aggregator.add(threat)
+        else:
+            self.enqueue_threat(threat)
+
+    def enqueue_threat(self, threat):
+        """Hand a (possibly aggregated) threat to the processor stage."""
+        try:
+            threat['_queued_at'] = time.time()
+            self.threat_queue.put_nowait(threat)
+            logger.warning(f"🚨 THREAT DETECTED: {threat['attack_signature']}")
+        except queue.Full:
+            threat['metadata'] = render_metadata(threat.get('metadata', {}))
+            if self.spool and self.spool.append("queue", [threat]):
+                logger.warning(f"Threat queue full! Spooled {threat['attack_signature']} to disk")
+            else:
+                logger.error("Threat queue full!")
 
     def packet_handler(self, packet):
         """Main packet callback."""
         try:
-            threats = []
-            
-            # Run all detectors
-            port_t = self.port_detector.analyze(packet)
-            if port_t: threats.append(port_t)
-            
-            arp_t = self.arp_detector.analyze(packet)
-            if arp_t: threats.append(arp_t)
+            # Dissect once, then share the summary with every detector
+            summary = summarize(packet)
+            if self.drop_filter and summary.src_ip and self.drop_filter(summary.src_ip):
+                return
             
-            pay_t = self.payload_inspector.analyze(packet)
-            if pay_t: threats.append(pay_t)
+            # Time the detectors only on sampled packets
+            self.packets_seen += 1
+            observe = self.observe_detector if self.packets_seen % self.sample_rate == 0 else None
             
-            honey_t = self.honeypot.analyze(packet)
-            if honey_t: threats.append(honey_t)
-            
-            # Queue threats with forensic data
-            for threat in threats:
-                if config.CAPTURE_RAW_PAYLOAD:
-                    threat['metadata']['raw_payload'] = self.extract_raw_payload(packet)
-                
-                try:
-                    self.threat_queue.put_nowait(threat)
-                    logger.warning(f"🚨 THREAT DETECTED: {threat['attack_signature']}")
-                except queue.Full:
-                    logger.error("Threat queue full!")
+            # Run all detectors and queue threats with forensic data
+            for threat in self.pipeline.analyze(summary, observe):
+                self.handle_threat(threat)
         
         except Exception as e:
             logger.error(f"Error in packet handler: {e}")
     
+    def prepare_threat(self, threat):
+        """Queue bookkeeping, IPS action and GeoIP enrichment: everything a processor does before AI."""
+        queued_at = threat.pop('_queued_at', None)
+        threat.setdefault('event_id', uuid.uuid4().hex)
+        if queued_at:
+            self.metrics.observe("sentinel_queue_wait_seconds", time.time() - queued_at)
+
+        # IPS ACTION: repeat alerts for a blocked source do not touch the firewall again
+        remaining, new = 0, False
+        if (self.ips and threat['risk_score'] >= config.IPS_BLOCK_THRESHOLD
+                and threat['attack_type'] not in config.IPS_EXEMPT_TYPES):
+            remaining, new = self.ips.block(threat['ip_address'])
+        if remaining:
+            if new:
+                logger.critical(f"🛡️ IPS ACTION: AUTO-BLOCKING IP {threat['ip_address']} (Risk Score: {threat['risk_score']})")
+                threat['metadata']['ips_reason'] = f"Exceeded risk threshold ({config.IPS_BLOCK_THRESHOLD})"
+            else:
+                threat['metadata']['ips_reason'] = f"Already blocked ({remaining:.0f}s left)"
+            threat['metadata']['ips_action'] = "BLOCKED"
+            threat['metadata']['ips_backend'] = self.ips.backend.name
+        else:
+            threat['metadata']['ips_action'] = "MONITORED"
+
+        geo = self.geoip.lookup(threat['ip_address'])
+        threat['geo_location'] = geo.location
+        if geo.country_code:
+            threat['metadata']['geo'] = {"country_code": geo.country_code, "asn": geo.asn, "as_org": geo.as_org}
+
     def threat_processor(self):
         """Worker thread for AI/API processing and IPS actions."""
         logger.info("Threat processor worker started")
@@ -96,62 +198,125 @@ class SentinelEngine:
         while self.running:
             try:
                 threat = self.threat_queue.get(timeout=1)
-                
-                # IPS ACTION: Blocking simulation
-                if config.IPS_BLOCKING_ENABLED and threat['risk_score'] >= config.IPS_BLOCK_THRESHOLD:
-                    logger.critical(f"🛡️ IPS ACTION: AUTO-BLOCKING IP {threat['ip_address']} (Risk Score: {threat['risk_score']})")
-                    threat['metadata']['ips_action'] = "BLOCKED"
-                    threat['metadata']['ips_reason'] = f"Exceeded risk threshold ({config.IPS_BLOCK_THRESHOLD})"
-                else:
-                    threat['metadata']['ips_action'] = "MONITORED"
+            except queue.Empty:
+                continue
+
+            try:
+                self.prepare_threat(threat)
 
                 # Enrich with AI analysis
+                start = time.perf_counter()
                 threat['ai_analysis'] = self.analyze_with_ai(threat)
-                threat['geo_location'] = self.get_geo_location(threat['ip_address'])
+                self.metrics.observe("sentinel_ai_seconds", time.perf_counter() - start)
                 
                 # Send to Laravel API
                 self.send_to_api(threat)
+            except Exception as e:
+                logger.error(f"Error processing threat: {e}")
+            finally:
+                # A failed threat still counts as processed, or threat_queue.join() would never return
                 self.threat_queue.task_done()
-            
-            except queue.Empty:
-                continue
+
+    async def async_processor(self):
+        """Coroutine counterpart of threat_processor() for the async core."""
+        while True:
+            threat = await self.threat_queue.get()
+            try:
+                self.prepare_threat(threat)
+
+                start = time.perf_counter()
+                threat['ai_analysis'] = await self.analyze_with_ai_async(threat)
+                self.metrics.observe("sentinel_ai_seconds", time.perf_counter() - start)
+
+                # Waits while the delivery buffer is full, holding this threat's slot in the bridge
+                await self.delivery.put(self.api_payload(threat))
             except Exception as e:
                 logger.error(f"Error processing threat: {e}")
+            finally:
+                self.threat_queue.task_done()
     
     def analyze_with_ai(self, threat):
-        """Mock/Real AI Analysis."""
-        if config.USE_MOCK_AI:
-            explanations = {
-                "port_scan": "Reconnaissance scan detected. Attacker is mapping open ports.",
-                "arp_spoof": "Man-in-the-Middle attack detected. ARP cache poisoning in progress.",
-                "sql_injection": "SQL injection attempt found in HTTP headers.",
-                "xss_attempt": "Payload containing malicious scripts detected.",
-                "honeypot_trap": f"Honeypot trigger! Interaction with decoy port {threat['metadata'].get('trap_port')}. High certainty of malicious intent."
-            }
-            return f"[PRO] {explanations.get(threat['attack_type'], 'Cyber threat detected.')}"
-        
-        # ... (real API logic skip for brevity but stays same) ...
-        return f"Real AI analysis for {threat['attack_type']} logic would go here."
+        """
+        Mock/Real AI Analysis.
+        In non-blocking mode a cache miss returns a placeholder at once and
+        the explanation is sent as an update when the model answers.
+        """
+        if not self.non_blocking_ai:
+            return self.analyzer.explain(threat)
+
+        analysis = self.analyzer.cached(threat)
+        if analysis is not None:
+            return analysis
+        if self.analyzer.submit(threat, self.send_analysis_update):
+            return config.AI_PENDING_TEXT
+        return self.analyzer.fallback(threat)
+
+    async def analyze_with_ai_async(self, threat):
+        if self.non_blocking_ai:
+            return self.analyze_with_ai(threat)  # Never blocks: cache, placeholder or canned text
+        return await self.analyzer.explain_async(threat)
+
+    def send_analysis_update(self, threat, analysis):
+        """Attach a late AI explanation to the already delivered threat."""
+        self.analysis_delivery.submit({"event_id": threat['event_id'], "ai_analysis": analysis})
 
     def get_geo_location(self, ip_address):
-        if ip_address.startswith(('192.168.', '10.', '127.')): return "Secure Network (Local)"
-        return "Global Web"
+        return self.geoip.lookup(ip_address).location
 
     def send_to_api(self, threat):
-        payload = {
+        return self.delivery.submit(self.api_payload(threat))
+
+    def api_payload(self, threat):
+        return {
             "ip_address": threat['ip_address'],
             "geo_location": threat.get('geo_location', 'Unknown'),
             "attack_signature": threat['attack_signature'],
             "attack_type": threat['attack_type'],
             "risk_score": threat['risk_score'],
             "ai_analysis": threat.get('ai_analysis', ''),
-            "metadata": json.dumps(threat.get('metadata', {})),
+            "metadata": json.dumps(render_metadata(threat.get('metadata', {}))),
+            "event_id": threat.get('event_id'),
             "timestamp": datetime.now().isoformat()
         }
-        try:
-            requests.post(config.LARAVEL_API_URL, json=payload, timeout=2)
-            return True
-        except: return False
+
+    def spool_payloads(self, payloads):
+        """Delivery overflow: persist API payloads that could not be sent."""
+        return self.spool.append("delivery", payloads)
+
+    def replay_spooled(self, records):
+        """Re-inject spooled records where they left the pipeline."""
+        payloads = [r['item'] for r in records if r['stage'] == 'delivery']
+        threats = [r['item'] for r in records if r['stage'] == 'queue']
+
+        if threats and self.threat_queue.maxsize - self.threat_queue.qsize() < len(threats):
+            return False
+        # A batch the API rejects as invalid counts as done: it is dropped, not replayed forever
+        if payloads and not self.delivery.post_batch(payloads):
+            return False
+
+        for threat in threats:
+            try:
+                self.threat_queue.put(threat, timeout=1)
+            except queue.Full:
+                self.spool.append("queue", [threat])
+        return True
+
+    def spool_drainer(self):
+        """Background replay of the spool at a controlled rate."""
+        logger.info("Spool drainer started")
+
+        while self.running:
+            try:
+                replayed = self.spool.replay(self.replay_spooled, config.SPOOL_DRAIN_BATCH)
+            except Exception as e:
+                logger.error(f"Error replaying spool: {e}")
+                replayed = 0
+
+            if replayed:
+                time.sleep(replayed / config.SPOOL_DRAIN_RATE)
+            else:
+                self.spool.sync()
+                time.sleep(config.SPOOL_DRAIN_INTERVAL)
 
     async def run_simulation(self):
         """Advanced simulation with Global IPs, Honeypot and IPS data."""
@@ -192,27 +357,249 @@ class SentinelEngine:
                     'packet_id': random.randint(1000, 9999)
                 }
             }
-            self.threat_queue.put_nowait(threat)
+            self.enqueue_threat(threat)
 
-    def start(self):
-        self.running = True
+    def apply_rules(self, settings):
+        """
+        RuleWatcher callback, on the watcher thread: compile the new rules,
+        swap them into each detector (and each capture shard), then rebuild
+        the capture filter in case trap ports changed. Per-IP state, the
+        threat queue and the running capture are left as they are.
+        """
+        apply_settings(self.pipeline, settings)
+        if self.capture:
+            self.capture.reload_rules(settings)
+        self.refresh_capture_filter()
+
+    def refresh_capture_filter(self):
+        """
+        Rebuild the BPF expression from the active detectors and config.
+        A running live capture notices the change and restarts with it.
+        """
+        bpf = self.pipeline.bpf_filter() if config.BPF_PREFILTER else None
+        if bpf != self.bpf_filter:
+            logger.info(f"Capture filter: {bpf or '(none)'}")
+            self.bpf_filter = bpf
+        return bpf
+
+    def live_capture(self, prn):
+        """sniff() with the current prefilter, restarted whenever the filter changes."""
+        while self.running:
+            bpf = self.refresh_capture_filter()
+            sniff(iface=self.interface, prn=prn, store=False, filter=bpf,
+                  stop_filter=lambda packet: self.bpf_filter != bpf or not self.running)
+            if self.bpf_filter == bpf:
+                break  # Stopped for another reason (Ctrl+C, interface gone)
+
+    def sharded_capture(self):
+        self.capture = ShardedCapture(self.handle_threat, config.CAPTURE_SHARDS, drop_filter=self.drop_filter)
+        self.capture.start()
+        try:
+            self.live_capture(self.capture.submit)
+        finally:
+            self.capture.stop()
+
+    def start_processing(self, drain_spool=False):
+        """Thread model: delivery senders plus WORKER_THREADS blocking processors."""
+        self.delivery.start()
+        if self.analysis_delivery:
+            self.analysis_delivery.start()
         for i in range(config.WORKER_THREADS):
             threading.Thread(target=self.threat_processor, daemon=True).start()
+        if self.aggregator:
+            self.aggregator.start()
+        if self.ips:
+            self.ips.start()
+        if drain_spool and self.spool:
+            threading.Thread(target=self.spool_drainer, daemon=True).start()
+
+    async def run_core(self, source, drain_spool=False):
+        """
+        Async model: ASYNC_PROCESSORS processor coroutines and the delivery
+        batcher share this event loop. `source` feeds them through the
+        ThreatBridge; a coroutine function runs on the loop, anything else
+        (a blocking capture loop) in a worker thread. When it returns, queued
+        threats are processed and delivered before shutting down.
+        """
+        self.threat_queue.bind(asyncio.get_running_loop())
+        await self.delivery.start()
+        if self.analysis_delivery:
+            await self.analysis_delivery.start()
+        processors = [asyncio.create_task(self.async_processor()) for _ in range(config.ASYNC_PROCESSORS)]
+        if self.aggregator:
+            self.aggregator.start()
+        if self.ips:
+            self.ips.start()
+        if drain_spool and self.spool:
+            threading.Thread(target=self.spool_drainer, daemon=True).start()
+
+        try:
+            if asyncio.iscoroutinefunction(source):
+                await source()
+            else:
+                await asyncio.to_thread(source)
+        finally:
+            if self.aggregator:
+                self.aggregator.stop()
+            self.running = False
+            await self.threat_queue.join()
+            for task in processors:
+                task.cancel()
+            await self.delivery.stop()
+            if self.analysis_delivery:
+                await self.analysis_delivery.stop()
+            if self.ips:
+                self.ips.stop()
+            if self.rules:
+                self.rules.stop()
+            self.analyzer.stop()
+            if self.spool:
+                self.spool.close()
+
+    def start(self):
+        self.running = True
+        if self.rules:
+            self.rules.start()
+        if config.METRICS_ENABLED:
+            try:
+                MetricsServer(self.metrics).start()
+            except OSError as e:
+                logger.error(f"Metrics endpoint unavailable: {e}")
 
         print("\n" + "="*60)
         print("  \U0001f3f0  SENTINEL-EYE PRO: AI-Driven Enterprise Fortress")
         print("="*60)
         print(f"  Mode: {'SIMULATION' if config.SIMULATION_MODE else 'LIVE IDS/IPS'}")
-        print(f"  Features: Honeypot (\u2705) | IPS Block (\u2705) | Forensics (\u2705)")
+        print(f"  Core: {'asyncio (' + str(config.ASYNC_PROCESSORS) + ' processors)' if self.async_core else str(config.WORKER_THREADS) + ' worker threads'}")
+        if not config.SIMULATION_MODE and config.CAPTURE_SHARDS > 0:
+            print(f"  Capture Shards: {config.CAPTURE_SHARDS} detector processes")
+        print(f"  Features: Honeypot (\u2705) | IPS Block ({self.ips.backend.name if self.ips else 'off'}) | Forensics (\u2705)")
         print("="*60 + "\n")
 
         if config.SIMULATION_MODE:
-            asyncio.run(self.run_simulation())
+            source = self.run_simulation
+        elif config.CAPTURE_SHARDS > 0:
+            source = self.sharded_capture
         else:
-            sniff(iface=self.interface, prn=self.packet_handler, store=False)
+            source = lambda: self.live_capture(self.packet_handler)
+
+        if self.async_core:
+            asyncio.run(self.run_core(source, drain_spool=True))
+            return
+        self.start_processing(drain_spool=True)
+        if asyncio.iscoroutinefunction(source):
+            asyncio.run(source())
+        else:
+            source()
+
+    def replay_pcap(self, path, realtime=False, deliver=False):
+        """
+        Offline mode: stream a capture file through the detectors.
+        Detectors see the pcap timestamps, so results do not depend on replay
+        speed. With realtime=True packets are paced at their original spacing;
+        otherwise they are processed as fast as possible. With deliver=True
+        threats go through the normal processor/API path as well.
+        """
+        self.pipeline = DetectorPipeline(profile=True, offline=True)
+        self.running = True
+
+        found = Counter()
+        report = {}
+
+        def read_capture():
+            packets = 0
+            summarize_time = 0.0
+            first_ts = None
+            wall_start = time.perf_counter()
+
+            with PcapReader(path) as reader:
+                for packet in reader:
+                    if realtime:
+                        if first_ts is None:
+                            first_ts = float(packet.time)
+                        delay = (float(packet.time) - first_ts) - (time.perf_counter() - wall_start)
+                        if delay > 0:
+                            time.sleep(delay)
+
+                    packets += 1
+                    try:
+                        start = time.perf_counter()
+                        summary = summarize(packet)
+                        summarize_time += time.perf_counter() - start
+
+                        for threat in self.pipeline.analyze(summary):
+                            found[threat['attack_type']] += 1
+                            if deliver:
+                                self.handle_threat(threat)
+                    except Exception as e:
+                        logger.error(f"Error in packet handler: {e}")
+
+            report.update(packets=packets, elapsed=time.perf_counter() - wall_start, summarize_time=summarize_time)
+
+        if deliver and self.async_core:
+            asyncio.run(self.run_core(read_capture))
+        elif deliver:
+            self.start_processing()
+            read_capture()
+            if self.aggregator:
+                self.aggregator.stop()
+            self.threat_queue.join()
+            self.stop()
+        else:
+            read_capture()
+
+        self.print_replay_report(path, report['packets'], report['elapsed'], report['summarize_time'], found)
+        return found
+
+    def print_replay_report(self, path, packets, elapsed, summarize_time, found):
+        print("\n" + "="*60)
+        print(f"  PCAP REPLAY REPORT: {path}")
+        print("="*60)
+        print(f"  Packets      : {packets:,}")
+        print(f"  Elapsed      : {elapsed:.3f}s")
+        print(f"  Throughput   : {packets / elapsed if elapsed else 0:,.0f} packets/sec")
+        print("-"*60)
+        print(f"  {'Stage':<22}{'total (s)':>12}{'us/packet':>12}{'share':>10}")
+        stages = [("summarize", summarize_time)] + list(self.pipeline.timings.items())
+        # Whatever is left is pcap reading, scapy dissection and bookkeeping
+        stages.insert(0, ("read + dissect", max(0.0, elapsed - sum(t for _, t in stages))))
+        for name, seconds in stages:
+            per_packet = seconds / packets * 1e6 if packets else 0
+            share = seconds / elapsed * 100 if elapsed else 0
+            print(f"  {name:<22}{seconds:>12.3f}{per_packet:>12.2f}{share:>9.1f}%")
+        print("-"*60)
+        print(f"  Threats found: {sum(found.values())}")
+        for attack_type, count in found.most_common():
+            print(f"    {attack_type:<20}{count:>8}")
+        print("="*60 + "\n")
 
     def stop(self):
+        if self.async_core:
+            self.running = False  # run_core() drains and shuts down once its source returns
+            return
+        if self.aggregator:
+            self.aggregator.stop()  # Flush open groups while the processors still run
         self.running = False
+        if self.rules:
+            self.rules.stop()
+        if self.ips:
+            self.ips.stop()
+        self.analyzer.stop()
+        self.delivery.stop()
+        if self.analysis_delivery:
+            self.analysis_delivery.stop()
+        if self.spool:
+            self.spool.close()
 
 if __name__ == "__main__":
-    SentinelEngine().start()
+    parser = argparse.ArgumentParser(description="Sentinel-Eye Hunter Engine")
+    parser.add_argument('--pcap', help="Replay a capture file instead of sniffing live")
+    parser.add_argument('--realtime', action='store_true', help="Replay at the capture's original timing")
+    parser.add_argument('--deliver', action='store_true', help="Also send replayed threats to the API")
+    args = parser.parse_args()
+
+    engine = SentinelEngine()
+    if args.pcap:
+        engine.replay_pcap(args.pcap, realtime=args.realtime, deliver=args.deliver)
+    else:
+        engine.start()
@@ -0,0 +1,203 @@
+"""
+Sentinel-Eye Capture Sharding
+Spreads detection across CPU cores by hashing flows onto detector processes
+"""
+
+import time
+import queue
+import logging
+import threading
+import multiprocessing as mp
+import config
+from detectors import summarize, DetectorPipeline
+from rules import apply_settings
+
+logger = logging.getLogger('ShardedCapture')
+
+
+def shard_key(summary):
+    """Source address used to pin a packet to a shard (IP src, or ARP sender)."""
+    return summary.src_ip or summary.arp_psrc
+
+
+def _shard_worker(inbox, outbox):
+    """
+    Detector process body.
+    Owns a private DetectorPipeline, so per-IP state such as
+    PortScanDetector.state and ARPSpoofDetector.state only ever
+    sees the sources hashed to this shard. A dict on the inbox is a
+    rule reload (see ShardedCapture.reload_rules).
+    """
+    pipeline = DetectorPipeline()
+
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        if isinstance(batch, dict):
+            try:
+                apply_settings(pipeline, batch)
+            except Exception as e:
+                logger.error(f"Shard rejected rule reload: {e}")
+            continue
+
+        threats = []
+        for summary in batch:
+            try:
+                threats.extend(pipeline.analyze(summary))
+            except Exception as e:
+                logger.error(f"Error in shard worker: {e}")
+
+        if threats:
+            outbox.put(threats)
+
+
+class ShardedCapture:
+    """
+    Capture-side half of the sharded live mode.
+    submit() is used as the sniff callback: it dissects the packet once,
+    batches the PacketSummary for its shard and ships full batches over IPC.
+    Threats coming back from every shard are funnelled into threat_sink,
+    normally SentinelEngine.enqueue_threat. Packets whose source
+    drop_filter(src_ip) rejects (blocked by the IPS) are discarded before
+    batching. A flusher thread sends partial batches every
+    SHARD_FLUSH_INTERVAL seconds, so on a quiet link the last packets of a
+    scan do not wait for more traffic.
+    """
+
+    def __init__(self, threat_sink, shards=None, batch_size=None, block_when_full=False, drop_filter=None):
+        self.threat_sink = threat_sink
+        self.drop_filter = drop_filter
+        self.shards = shards or config.CAPTURE_SHARDS
+        self.batch_size = batch_size or config.SHARD_BATCH_SIZE
+        self.flush_interval = config.SHARD_FLUSH_INTERVAL
+        self.block_when_full = block_when_full
+
+        self.inboxes = []
+        self.outbox = None
+        self.workers = []
+        self.collector = None
+        self.flusher = None
+        self.running = False
+        self.stopped = threading.Event()
+
+        self.lock = threading.Lock()  # batches are shared by submit() and the flusher
+        self.batches = [[] for _ in range(self.shards)]
+        self.last_flush = time.monotonic()
+        self.submitted = 0
+        self.dropped = 0
+
+    def start(self):
+        self.outbox = mp.Queue()
+        for _ in range(self.shards):
+            inbox = mp.Queue(maxsize=config.SHARD_QUEUE_SIZE)
+            worker = mp.Process(target=_shard_worker, args=(inbox, self.outbox), daemon=True)
+            worker.start()
+            self.inboxes.append(inbox)
+            self.workers.append(worker)
+
+        self.running = True
+        self.collector = threading.Thread(target=self._collect, daemon=True)
+        self.collector.start()
+        self.stopped.clear()
+        self.flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self.flusher.start()
+        logger.info(f"Sharded capture started with {self.shards} detector processes")
+
+    def submit(self, packet):
+        """Sniff callback: route one packet to its shard."""
+        try:
+            summary = summarize(packet)
+        except Exception as e:
+            logger.error(f"Error summarizing packet: {e}")
+            return
+        if self.drop_filter and summary.src_ip and self.drop_filter(summary.src_ip):
+            return
+
+        key = shard_key(summary)
+        index = hash(key) % self.shards if key else 0
+
+        with self.lock:
+            batch = self.batches[index]
+            batch.append(summary)
+            self.submitted += 1
+
+            if len(batch) >= self.batch_size:
+                self._send(index)
+            elif time.monotonic() - self.last_flush > self.flush_interval:
+                self._flush()
+
+    def flush(self):
+        """Send every partially filled batch."""
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        # Caller holds self.lock
+        for index in range(self.shards):
+            if self.batches[index]:
+                self._send(index)
+        self.last_flush = time.monotonic()
+
+    def _flush_loop(self):
+        """Flush partial batches when no packet has arrived to do it."""
+        while not self.stopped.wait(self.flush_interval):
+            if time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+
+    def _send(self, index):
+        # Caller holds self.lock, which keeps each shard's batches in order
+        batch = self.batches[index]
+        self.batches[index] = []
+        try:
+            if self.block_when_full:
+                self.inboxes[index].put(batch)
+            else:
+                self.inboxes[index].put_nowait(batch)
+        except queue.Full:
+            self.dropped += len(batch)
+            logger.error(f"Shard {index} queue full! Dropped {len(batch)} packets")
+
+    def reload_rules(self, settings):
+        """Send reloaded settings to every shard; each compiles and swaps them between batches."""
+        for inbox in self.inboxes:
+            inbox.put(settings)
+
+    def _collect(self):
+        """Processor-side bridge: forwards shard threats to the single threat sink."""
+        while self.running:
+            try:
+                threats = self.outbox.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            for threat in threats:
+                self.threat_sink(threat)
+
+    def stop(self):
+        """Flush pending batches, let every shard drain, then stop collecting."""
+        if not self.workers:
+            return
+
+        self.stopped.set()
+        self.flusher.join()
+        self.flush()
+        for inbox in self.inboxes:
+            inbox.put(None)
+        for worker in self.workers:
+            worker.join()
+
+        self.running = False
+        self.collector.join()
+
+        # Threats that arrived after the collector's last poll
+        while True:
+            try:
+                threats = self.outbox.get(timeout=0.1)
+            except queue.Empty:
+                break
+            for threat in threats:
+                self.threat_sink(threat)
+
+        self.workers = []
+        self.inboxes = []
+        logger.info(f"Sharded capture stopped ({self.submitted} packets, {self.dropped} dropped)")
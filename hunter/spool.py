@@ -0,0 +1,218 @@
+"""
+Sentinel-Eye Threat Spool
+Append-only, segment-rotated on-disk buffer for threats the pipeline cannot hold
+"""
+
+import os
+import json
+import time
+import struct
+import logging
+import threading
+import config
+
+logger = logging.getLogger('ThreatSpool')
+
+HEADER = struct.Struct('>I')  # big-endian record length
+SEGMENT_PREFIX = "spool-"
+SEGMENT_SUFFIX = ".log"
+CURSOR_SUFFIX = ".cursor"
+
+
+class ThreatSpool:
+    """
+    Durable overflow for threats.
+
+    Records are length-prefixed JSON appended to the active segment file.
+    fsync is batched: every SPOOL_FSYNC_EVERY records or SPOOL_FSYNC_INTERVAL
+    seconds, whichever comes first. Segments rotate at SPOOL_SEGMENT_BYTES.
+
+    replay() reads the oldest segment from its cursor and hands a batch of
+    records to a callback; the cursor only advances (and fully replayed
+    segments are only deleted) when the callback reports success, so a crash
+    or a failed delivery at most replays the last batch again. The callback
+    must report success for records it will never be able to deliver (a
+    batch the API rejects as invalid), or they would hold the spool forever.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or config.SPOOL_DIR
+        self.segment_bytes = config.SPOOL_SEGMENT_BYTES
+        self.max_bytes = config.SPOOL_MAX_BYTES
+        self.fsync_every = config.SPOOL_FSYNC_EVERY
+        self.fsync_interval = config.SPOOL_FSYNC_INTERVAL
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+
+        self.active = None
+        self.active_id = None
+        self.active_size = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+        # Metrics
+        self.appended = 0
+        self.replayed = 0
+        self.rejected = 0
+
+        segments = self._segment_ids()
+        self.disk_bytes = sum(os.path.getsize(self._segment_path(i)) for i in segments)
+        # Never append to a segment left over from a previous run
+        self._open_segment(segments[-1] + 1 if segments else 1)
+        if segments:
+            logger.warning(f"Found {len(segments)} spooled segments ({self.disk_bytes} bytes) to replay")
+
+    def _segment_path(self, segment_id):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment_id:012d}{SEGMENT_SUFFIX}")
+
+    def _cursor_path(self, segment_id):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment_id:012d}{CURSOR_SUFFIX}")
+
+    def _segment_ids(self):
+        ids = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                ids.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(ids)
+
+    def _open_segment(self, segment_id):
+        self.active_id = segment_id
+        self.active = open(self._segment_path(segment_id), 'ab')
+        self.active_size = self.active.tell()
+
+    def _sync(self):
+        if self.unsynced:
+            self.active.flush()
+            os.fsync(self.active.fileno())
+            self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def _rotate(self):
+        self._sync()
+        self.active.close()
+        self._open_segment(self.active_id + 1)
+
+    def append(self, stage, items):
+        """
+        Persist items that could not continue down the pipeline.
+        stage records where they should re-enter on replay ("queue" or "delivery").
+        Returns the number of items written.
+        """
+        written = 0
+        with self.lock:
+            for item in items:
+                data = json.dumps({"stage": stage, "item": item}, default=str).encode('utf-8')
+                size = HEADER.size + len(data)
+                if self.disk_bytes + size > self.max_bytes:
+                    self.rejected += 1
+                    continue
+
+                self.active.write(HEADER.pack(len(data)))
+                self.active.write(data)
+                self.active_size += size
+                self.disk_bytes += size
+                self.unsynced += 1
+                written += 1
+
+                if self.active_size >= self.segment_bytes:
+                    self._rotate()
+
+            self.appended += written
+            if (self.unsynced >= self.fsync_every or
+                    time.monotonic() - self.last_sync >= self.fsync_interval):
+                self._sync()
+
+        if written < len(items):
+            logger.error(f"Spool full ({self.max_bytes} bytes)! Dropped {len(items) - written} threats")
+        return written
+
+    def sync(self):
+        with self.lock:
+            self._sync()
+
+    def replay(self, handler, limit):
+        """
+        Pass up to `limit` spooled records, oldest first, to handler(records);
+        each record is {"stage": ..., "item": ...}. handler returns True on success.
+        Returns how many were replayed (0 if the spool is empty or handler failed).
+        """
+        with self.lock:
+            segments = self._segment_ids()
+            if not segments:
+                return 0
+            segment_id = segments[0]
+            if segment_id == self.active_id:
+                if self.active_size == 0:
+                    return 0
+                # Seal the active segment so it can be read and deleted
+                self._rotate()
+
+        path = self._segment_path(segment_id)
+        offset = self._read_cursor(segment_id)
+        records, end = self._read_records(path, offset, limit)
+
+        if records and not handler(records):
+            return 0
+
+        with self.lock:
+            self.replayed += len(records)
+            if end >= os.path.getsize(path) or not records:
+                # Segment fully replayed (or only a torn tail was left)
+                self.disk_bytes -= os.path.getsize(path)
+                os.remove(path)
+                if os.path.exists(self._cursor_path(segment_id)):
+                    os.remove(self._cursor_path(segment_id))
+            else:
+                self._write_cursor(segment_id, end)
+        return len(records)
+
+    def _read_records(self, path, offset, limit):
+        records = []
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            while len(records) < limit:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                (length,) = HEADER.unpack(header)
+                data = f.read(length)
+                if len(data) < length:
+                    logger.warning(f"Torn record at end of {path}; skipping it")
+                    break
+                try:
+                    records.append(json.loads(data))
+                except ValueError:
+                    logger.error(f"Corrupt spool record in {path}; skipping it")
+                offset = f.tell()
+        return records, offset
+
+    def _read_cursor(self, segment_id):
+        try:
+            with open(self._cursor_path(segment_id)) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_cursor(self, segment_id, offset):
+        path = self._cursor_path(segment_id)
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def metrics(self):
+        with self.lock:
+            return {
+                "appended": self.appended,
+                "replayed": self.replayed,
+                "rejected": self.rejected,
+                "disk_bytes": self.disk_bytes,
+            }
+
+    def close(self):
+        with self.lock:
+            self._sync()
+            self.active.close()
@@ -0,0 +1,89 @@
+"""
+Alert Aggregation Tests
+Repeats of one (ip, type, signature) collapse into a single threat carrying the
+count, highest risk and sample payloads; distinct keys and full tables flush apart
+"""
+
+import os
+import sys
+import time
+import logging
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aggregation import ThreatAggregator
+
+
+def threat(ip="203.0.113.7", attack_type="sql_injection", risk_score=75, payload="GET /?id=1' OR 1=1"):
+    return {"ip_address": ip, "attack_type": attack_type, "attack_signature": attack_type.upper(),
+            "risk_score": risk_score,
+            "metadata": {"raw_payload": payload, "detection_reason": "Pattern matched"}}
+
+
+class ThreatAggregatorTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.emitted = []
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_repeats_collapse_into_one_threat(self):
+        aggregator = ThreatAggregator(self.emitted.append, window=60, max_groups=10, max_samples=2)
+        aggregator.add(threat(risk_score=75))
+        aggregator.add(threat(risk_score=90, payload="GET /?id=2' OR 1=1"))
+        aggregator.add(threat(risk_score=80, payload="GET /?id=2' OR 1=1"))
+        aggregator.add(threat(payload="GET /?id=3' OR 1=1"))
+        aggregator.add(threat(payload="GET /?id=4' OR 1=1"))
+        self.assertEqual(aggregator.flush(), 0)
+        self.assertEqual(self.emitted, [])
+
+        aggregator.stop()
+        self.assertEqual(len(self.emitted), 1)
+        result = self.emitted[0]
+        self.assertEqual(result["risk_score"], 90)
+        self.assertEqual(result["metadata"]["occurrences"], 5)
+        self.assertEqual(result["metadata"]["sample_payloads"], ["GET /?id=2' OR 1=1", "GET /?id=3' OR 1=1"])
+        self.assertTrue(result["metadata"]["detection_reason"].startswith("Pattern matched (x5 in "))
+        self.assertEqual(aggregator.stats(), {"open_groups": 0, "received": 5, "emitted": 1})
+
+    def test_distinct_keys_stay_apart(self):
+        aggregator = ThreatAggregator(self.emitted.append, window=60, max_groups=10)
+        aggregator.add(threat())
+        aggregator.add(threat(ip="198.51.100.9"))
+        aggregator.add(threat(attack_type="xss_attempt"))
+        aggregator.stop()
+        self.assertEqual(len(self.emitted), 3)
+        self.assertTrue(all(t["metadata"]["occurrences"] == 1 for t in self.emitted))
+        self.assertTrue(all("sample_payloads" not in t["metadata"] for t in self.emitted))
+
+    def test_window_close_flushes(self):
+        aggregator = ThreatAggregator(self.emitted.append, window=0.1, max_groups=10)
+        aggregator.start()
+        aggregator.add(threat())
+        aggregator.add(threat())
+        deadline = time.monotonic() + 5
+        while not self.emitted and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.emitted), 1)
+        self.assertEqual(self.emitted[0]["metadata"]["occurrences"], 2)
+
+        # A repeat after the window opens a new group
+        aggregator.add(threat())
+        aggregator.stop()
+        self.assertEqual([t["metadata"]["occurrences"] for t in self.emitted], [2, 1])
+
+    def test_full_table_flushes_the_oldest_early(self):
+        aggregator = ThreatAggregator(self.emitted.append, window=60, max_groups=2)
+        for ip in ("192.0.2.1", "192.0.2.2", "192.0.2.1", "192.0.2.3"):
+            aggregator.add(threat(ip=ip))
+        self.assertEqual([(t["ip_address"], t["metadata"]["occurrences"]) for t in self.emitted],
+                         [("192.0.2.1", 2)])
+        self.assertEqual(aggregator.stats()["open_groups"], 2)
+        aggregator.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
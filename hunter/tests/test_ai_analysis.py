@@ -0,0 +1,70 @@
+"""
+AI Analysis Tests
+The token bucket grants bursts then the configured rate, and a rate of zero
+switches model calls off instead of failing the explanation
+"""
+
+import os
+import sys
+import time
+import logging
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from ai_analysis import ThreatAnalyzer, TokenBucket
+
+
+def make_threat():
+    return {
+        "attack_type": "sql_injection",
+        "attack_signature": "' OR 1=1",
+        "metadata": {"decoded_payload": "GET /?id=1' OR 1=1"},
+    }
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=20, burst=3)
+        self.assertEqual([bucket.acquire() for _ in range(4)], [True, True, True, False])
+
+        start = time.monotonic()
+        self.assertTrue(bucket.acquire(timeout=1.0))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_zero_rate_never_grants(self):
+        for rate in (0, 0.0, -1):
+            with self.subTest(rate=rate):
+                bucket = TokenBucket(rate=rate, burst=5)
+                start = time.monotonic()
+                self.assertFalse(bucket.acquire(timeout=1.0))
+                self.assertLess(time.monotonic() - start, 0.5)
+
+
+class RateLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_zero_rate_uses_canned_explanation(self):
+        with mock.patch.object(config, "AI_RATE_LIMIT", 0):
+            analyzer = ThreatAnalyzer(model_url="http://127.0.0.1:9/unused", mock=False)
+        threat = make_threat()
+        with mock.patch.object(analyzer.session, "post") as post:
+            explanation = analyzer.explain(threat)
+
+        self.assertEqual(explanation, analyzer.fallback(threat))
+        post.assert_not_called()
+        self.assertEqual(analyzer.rate_limited, 1)
+        self.assertEqual(analyzer.model_calls, 0)
+        analyzer.executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Anomaly Detector Tests
+A source that suddenly scans stands out from its own baseline, scoring on the
+background thread finds the same alerts as scoring inline, and idle sources
+give their rows back
+"""
+
+import os
+import sys
+import logging
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import PacketSummary, AnomalyDetector
+
+SETTINGS = dict(ANOMALY_WINDOW=2, ANOMALY_BUCKETS=2, ANOMALY_MAX_HOSTS=64, ANOMALY_WARMUP_TICKS=4,
+                ANOMALY_MIN_PACKETS=5, ANOMALY_IDLE_TICKS=3, ANOMALY_ALERT_COOLDOWN=60)
+START = 1_000_000.0
+
+
+def packet(src_ip, t, dport=443, dst_ip="10.0.0.1", flags=0x10, length=200):
+    summary = PacketSummary()
+    summary.src_ip = src_ip
+    summary.dst_ip = dst_ip
+    summary.sport = 40000
+    summary.dport = dport
+    summary.tcp_flags = flags
+    summary.length = length
+    summary.timestamp = START + t
+    return summary
+
+
+def traffic(seconds=30, scan_from=24):
+    """Two steady sources, 10 packets a second each; the second starts a SYN scan at scan_from."""
+    packets = []
+    for i in range(seconds * 10):
+        t = i / 10
+        packets.append(packet("10.1.0.1", t))
+        if t >= scan_from:
+            packets += [packet("10.1.0.2", t + j / 100, dport=1000 + i * 10 + j, flags=0x02, length=44)
+                        for j in range(10)]
+        else:
+            packets.append(packet("10.1.0.2", t))
+    return packets
+
+
+class AnomalyDetectorTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.settings = mock.patch.multiple(config, **SETTINGS)
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        logging.disable(logging.NOTSET)
+
+    def run_detector(self, detector, packets):
+        threats = []
+        for summary in packets:
+            threats += detector.analyze(summary) or []
+        threats += detector.drain() or []
+        return threats
+
+    def test_scanning_source_alerts(self):
+        threats = self.run_detector(AnomalyDetector(background=False), traffic())
+        self.assertEqual([t["ip_address"] for t in threats], ["10.1.0.2"])
+        self.assertEqual(threats[0]["attack_type"], "traffic_anomaly")
+
+    def test_background_scoring_matches_inline(self):
+        inline = self.run_detector(AnomalyDetector(background=False), traffic())
+        background = self.run_detector(AnomalyDetector(background=True), traffic())
+        self.assertEqual([(t["ip_address"], t["metadata"]["feature"]) for t in background],
+                         [(t["ip_address"], t["metadata"]["feature"]) for t in inline])
+
+    def test_idle_sources_give_their_rows_back(self):
+        detector = AnomalyDetector(background=False)
+        self.run_detector(detector, [packet("10.1.0.1", t / 10) for t in range(20)])
+        self.assertEqual(detector.stats()["tracked_ips"], 1)
+
+        # Another source keeps the buckets closing long after the first went quiet
+        self.run_detector(detector, [packet("10.1.0.9", 2 + t / 10) for t in range(60)])
+        self.assertNotIn("10.1.0.1", detector.rows)
+        self.assertEqual(detector.stats()["expired_ips"], 1)
+
+    def test_full_table_counts_untracked_packets(self):
+        with mock.patch.object(config, "ANOMALY_MAX_HOSTS", 2):
+            detector = AnomalyDetector(background=False)
+        self.run_detector(detector, [packet(f"10.1.0.{i}", 0.1) for i in range(1, 5)])
+        self.assertEqual(detector.stats()["untracked_packets"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Async Core Tests
+Overflow spooling (which may fsync) must run off the event loop, and
+payloads refused in one burst must reach the spool together
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from async_core import AsyncThreatDelivery
+
+
+class OverflowTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_full_buffer_spools_off_the_loop_in_one_write(self):
+        writes = []
+
+        def spool(payloads):
+            writes.append((threading.current_thread(), list(payloads)))
+            return len(payloads)
+
+        async def run():
+            delivery = AsyncThreatDelivery(batch_url="http://127.0.0.1:9/api/threats/batch", overflow=spool)
+            await delivery.start()
+            delivery.batcher.cancel()  # Leave the buffer full
+            for i in range(5):
+                delivery.submit({"event_id": str(i)})
+            await delivery.spilling
+            await delivery.session.close()
+            return delivery
+
+        with mock.patch.object(config, "API_PENDING_LIMIT", 2):
+            delivery = asyncio.run(run())
+
+        self.assertEqual(len(writes), 1)
+        self.assertIsNot(writes[0][0], threading.main_thread())
+        self.assertEqual([p["event_id"] for p in writes[0][1]], ["2", "3", "4"])
+        self.assertEqual(delivery.spooled, 3)
+        self.assertIsNone(delivery.spilling)
+
+
+if __name__ == "__main__":
+    unittest.main()
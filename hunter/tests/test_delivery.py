@@ -0,0 +1,70 @@
+"""
+Threat Delivery Tests
+A batch the API rejects as invalid is dropped and counted, never retried or
+spooled; both the thread and the async delivery behave the same way
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from delivery import ThreatDelivery
+from async_core import AsyncThreatDelivery
+from benchmarks.stub_api import StubThreatAPI
+
+
+def payload(i, risk_score=75):
+    return {"event_id": f"event-{i}", "ip_address": "203.0.113.7", "attack_signature": "PORT_SCAN_DETECTED",
+            "attack_type": "port_scan", "risk_score": risk_score}
+
+
+class RejectedBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.stub = StubThreatAPI().start()
+        self.spooled = []
+
+    def tearDown(self):
+        self.stub.stop()
+        logging.disable(logging.NOTSET)
+
+    def overflow(self, payloads):
+        self.spooled.extend(payloads)
+        return len(payloads)
+
+    def test_threads_drop_a_rejected_batch(self):
+        delivery = ThreatDelivery(batch_url=self.stub.batch_url, batch_size=2, max_latency=0.05, senders=1,
+                                  overflow=self.overflow)
+        delivery.start()
+        for p in (payload(0, risk_score=72.5), payload(1)):
+            delivery.submit(p)
+        delivery.stop()
+
+        self.assertEqual(self.stub.rejections, 1)
+        self.assertEqual(self.spooled, [])
+        metrics = delivery.metrics()
+        self.assertEqual((metrics["rejected"], metrics["dropped"], metrics["failed_attempts"]), (2, 2, 0))
+
+    def test_async_drops_a_rejected_batch(self):
+        async def run():
+            delivery = AsyncThreatDelivery(batch_url=self.stub.batch_url, batch_size=2, max_latency=0.05,
+                                           overflow=self.overflow)
+            await delivery.start()
+            for p in (payload(0, risk_score=72.5), payload(1)):
+                await delivery.put(p)
+            await delivery.stop()
+            return delivery.metrics()
+
+        metrics = asyncio.run(run())
+        self.assertEqual(self.stub.rejections, 1)
+        self.assertEqual(self.spooled, [])
+        self.assertEqual((metrics["rejected"], metrics["dropped"], metrics["failed_attempts"]), (2, 2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
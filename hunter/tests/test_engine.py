@@ -0,0 +1,55 @@
+"""
+Engine Tests
+A threat that fails in a thread processor still counts as processed, so
+threat_queue.join() (as in PCAP replay) returns
+"""
+
+import os
+import sys
+import logging
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from sentinel_engine import SentinelEngine
+
+ENGINE_SETTINGS = dict(ENGINE_MODE="threads", SPOOL_ENABLED=False, METRICS_ENABLED=False,
+                       AGGREGATION_ENABLED=False, USE_MOCK_AI=True, RULES_FILE=None, IPS_BLOCKING_ENABLED=False)
+
+
+def make_threat(i):
+    return {'ip_address': f"203.0.113.{i + 1}", 'attack_signature': "SQL_INJECTION_ATTEMPT",
+            'attack_type': "sql_injection", 'risk_score': 85, 'metadata': {}}
+
+
+class ThreatProcessorTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_join_returns_when_processing_raises(self):
+        with mock.patch.multiple(config, **ENGINE_SETTINGS):
+            engine = SentinelEngine()
+            engine.running = True
+            engine.send_to_api = mock.Mock(side_effect=RuntimeError("API client exploded"))
+            engine.start_processing()
+            for i in range(3):
+                engine.threat_queue.put(make_threat(i))
+
+            joiner = threading.Thread(target=engine.threat_queue.join, daemon=True)
+            joiner.start()
+            joiner.join(timeout=5)
+            engine.stop()
+
+        self.assertFalse(joiner.is_alive())
+        self.assertEqual(engine.send_to_api.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
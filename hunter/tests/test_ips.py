@@ -0,0 +1,93 @@
+"""
+IPS Enforcement Tests
+Early drop only applies to sources a kernel firewall backend has committed;
+in dry-run, or after a failed commit, their packets must still be inspected
+"""
+
+import os
+import sys
+import logging
+import unittest
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ips import DryRunBackend, IPSEnforcer
+
+
+class RecordingBackend:
+    """Kernel-like backend that records commits, or fails them when told to."""
+
+    name = "recording"
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.entries = []
+
+    def add(self, entries):
+        if self.fail:
+            raise subprocess.CalledProcessError(1, ["nft", "-f", "-"])
+        self.entries.extend(entries)
+
+    def remove(self, ips):
+        pass
+
+    def close(self):
+        pass
+
+
+class EarlyDropTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_dry_run_never_drops(self):
+        ips = IPSEnforcer(backend=DryRunBackend())
+        ips.block("198.51.100.7")
+        ips.commit()
+        self.assertFalse(ips.enforcing)
+        self.assertTrue(ips.is_blocked("198.51.100.7"))
+        self.assertFalse(ips.should_drop("198.51.100.7"))
+
+    def test_drops_only_after_a_successful_commit(self):
+        ips = IPSEnforcer(backend=RecordingBackend())
+        ips.block("198.51.100.7")
+        self.assertFalse(ips.should_drop("198.51.100.7"))
+        ips.commit()
+        self.assertTrue(ips.should_drop("198.51.100.7"))
+        self.assertEqual(ips.dropped_packets, 1)
+
+    def test_failed_commit_does_not_drop(self):
+        ips = IPSEnforcer(backend=RecordingBackend(fail=True))
+        ips.block("198.51.100.7")
+        ips.commit()
+        self.assertEqual(ips.commit_failures, 1)
+        self.assertFalse(ips.should_drop("198.51.100.7"))
+
+    def test_failed_commit_is_retried_on_the_next_alert(self):
+        backend = RecordingBackend(fail=True)
+        ips = IPSEnforcer(backend=backend)
+        ips.block("198.51.100.7")
+        ips.commit()
+        self.assertFalse(ips.is_blocked("198.51.100.7"))
+
+        backend.fail = False
+        remaining, new = ips.block("198.51.100.7")
+        self.assertTrue(new)
+        self.assertEqual(ips.commit(), 1)
+        self.assertEqual(backend.entries, [("198.51.100.7", ips.ttl)])
+        self.assertTrue(ips.should_drop("198.51.100.7"))
+
+    def test_expired_block_stops_dropping(self):
+        ips = IPSEnforcer(backend=RecordingBackend(), ttl=0)
+        ips.block("198.51.100.7")
+        ips.commit()
+        self.assertFalse(ips.should_drop("198.51.100.7"))
+        self.assertEqual(ips.stats()["enforced_ips"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
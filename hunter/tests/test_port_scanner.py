@@ -0,0 +1,59 @@
+"""
+Port Scan Detector Tests
+The distinct-port estimate covers only the ports seen in the sliding window,
+not every port a continuously active source has touched
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import PacketSummary, PortScanDetector
+
+
+def syn(src_ip, dport, timestamp):
+    summary = PacketSummary()
+    summary.src_ip = src_ip
+    summary.dst_ip = "10.0.0.5"
+    summary.sport = 40000
+    summary.dport = dport
+    summary.tcp_flags = 0x02
+    summary.timestamp = timestamp
+    return summary
+
+
+class UniquePortsTest(unittest.TestCase):
+
+    def test_ports_from_earlier_windows_leave_the_estimate(self):
+        detector = PortScanDetector(shards=1)
+        detector.apply_rules(detector.limits._replace(cooldown=0))
+        window = config.PORT_SCAN_WINDOW
+        start = 1_000_000.0
+
+        # Sweep 500 ports without ever going idle for a whole window
+        for i in range(500):
+            detector.analyze(syn("198.51.100.7", 1 + i, start + i * 3 * window / 500))
+
+        # Then hammer one port for a whole window
+        threat = None
+        for i in range(200):
+            threat = detector.analyze(syn("198.51.100.7", 443, start + 3 * window + i * window / 200)) or threat
+
+        self.assertIsNotNone(threat)
+        self.assertLessEqual(threat["metadata"]["unique_ports"], 2)
+
+    def test_scan_within_the_window_is_estimated(self):
+        detector = PortScanDetector(shards=1)
+        threat = None
+        for i in range(300):
+            threat = detector.analyze(syn("198.51.100.7", 1 + i, 1_000_000.0 + i * 0.01)) or threat
+
+        self.assertIsNotNone(threat)
+        self.assertAlmostEqual(threat["metadata"]["unique_ports"], threat["metadata"]["syn_count"], delta=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
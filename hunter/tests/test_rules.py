@@ -0,0 +1,97 @@
+"""
+Rule Reloading Tests
+Rule files are validated against the config.py defaults, item by item, and a
+rejected file leaves the running rules untouched
+"""
+
+import os
+import sys
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import DetectorPipeline
+from rules import RELOADABLE, RuleWatcher, apply_settings, load_rules
+
+HUNTER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RuleFileTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "rules.json")
+        self.defaults = {name: getattr(config, name) for name in RELOADABLE}
+        self.writes = 0
+
+    def tearDown(self):
+        for name, value in self.defaults.items():
+            setattr(config, name, value)
+        shutil.rmtree(self.directory)
+        logging.disable(logging.NOTSET)
+
+    def write(self, version, settings):
+        with open(self.path, 'w') as f:
+            json.dump({"version": version, "settings": settings}, f)
+        # Distinct mtimes even on coarse filesystem clocks
+        self.writes += 1
+        os.utime(self.path, ns=(self.writes, self.writes))
+
+    def test_example_file_is_valid(self):
+        version, settings = load_rules(os.path.join(HUNTER_DIR, "rules.example.json"))
+        self.assertEqual(version, "2026-10-17.1")
+        self.assertEqual(settings["RISK_SCORES"]["port_scan"], 75)
+
+    def test_rejects_values_the_api_would_refuse(self):
+        for settings in (
+            {"RISK_SCORES": {"port_scan": 72.5}},
+            {"RISK_SCORES": {"port_scan": "75"}},
+            {"RISK_SCORES": {"port_scan": 0}},
+            {"HONEYPOT_RISK_SCORE": 101},
+            {"HONEYPOT_RISK_SCORE": 95.0},
+            {"PORT_SCAN_THRESHOLD": 30.5},
+            {"PORT_SCAN_THRESHOLD": True},
+            {"HONEYPOT_PORTS": [21, "23"]},
+            {"HONEYPOT_ENABLED": 1},
+            {"ANOMALY_WINDOW": 10},  # Sizes detector state: restart only
+        ):
+            with self.subTest(settings=settings):
+                self.write("bad", settings)
+                with self.assertRaises(ValueError):
+                    load_rules(self.path)
+
+    def test_accepts_ints_for_float_settings(self):
+        self.write("ok", {"ANOMALY_Z_THRESHOLD": 5, "RISK_SCORES": {"port_scan": 72}})
+        self.assertEqual(load_rules(self.path), ("ok", {"ANOMALY_Z_THRESHOLD": 5, "RISK_SCORES": {"port_scan": 72}}))
+
+    def test_watcher_keeps_the_previous_version_on_a_bad_file(self):
+        pipeline = DetectorPipeline()
+        watcher = RuleWatcher(lambda settings: apply_settings(pipeline, settings), path=self.path)
+
+        self.write("v1", {"PORT_SCAN_THRESHOLD": 30, "RISK_SCORES": {**config.RISK_SCORES, "port_scan": 72}})
+        self.assertTrue(watcher.check())
+        self.assertEqual(config.PORT_SCAN_THRESHOLD, 30)
+
+        self.write("v2", {"PORT_SCAN_THRESHOLD": 40, "RISK_SCORES": {"port_scan": 72.5}})
+        self.assertFalse(watcher.check())
+        self.assertEqual((watcher.version, watcher.failures), ("v1", 1))
+        self.assertEqual(config.PORT_SCAN_THRESHOLD, 30)
+        self.assertEqual(config.RISK_SCORES["port_scan"], 72)
+
+        self.write("v3", {"SQL_INJECTION_PATTERNS": ["(unclosed"]})
+        self.assertFalse(watcher.check())
+        self.assertEqual(watcher.version, "v1")
+
+        self.write("v4", {})  # Dropping a key restores its config.py default
+        self.assertTrue(watcher.check())
+        self.assertEqual(config.PORT_SCAN_THRESHOLD, self.defaults["PORT_SCAN_THRESHOLD"])
+
+
+if __name__ == "__main__":
+    unittest.main()
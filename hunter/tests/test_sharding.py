@@ -0,0 +1,58 @@
+"""
+Capture Sharding Tests
+Packets reach the shard that owns their source, threats come back through the
+sink, and a partial batch is flushed on a quiet link without more traffic
+"""
+
+import os
+import sys
+import time
+import logging
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import IP, TCP
+
+import config
+from sharding import ShardedCapture
+
+
+def syn(src_ip, dport):
+    return IP(src=src_ip, dst="10.0.0.5") / TCP(sport=40000, dport=dport, flags="S")
+
+
+class ShardedCaptureTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.threats = []
+        self.capture = ShardedCapture(self.threats.append, shards=2, batch_size=64)
+        self.capture.start()
+
+    def tearDown(self):
+        self.capture.stop()
+        logging.disable(logging.NOTSET)
+
+    def wait_for(self, count, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while len(self.threats) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return len(self.threats)
+
+    def test_lone_probe_is_flushed_without_more_traffic(self):
+        self.capture.submit(syn("198.51.100.7", config.HONEYPOT_PORTS[0]))
+        self.assertEqual(self.wait_for(1), 1)
+        self.assertEqual(self.threats[0]["attack_type"], "honeypot_trap")
+
+    def test_scan_is_detected_across_shards(self):
+        for i in range(config.PORT_SCAN_THRESHOLD):
+            for src_ip in ("198.51.100.7", "198.51.100.8"):
+                self.capture.submit(syn(src_ip, 1000 + i))
+        self.wait_for(2)
+        scans = {t["ip_address"] for t in self.threats if t["attack_type"] == "port_scan"}
+        self.assertEqual(scans, {"198.51.100.7", "198.51.100.8"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Signature Engine Tests
+The prefiltered SignatureSet must flag exactly what the old loop over every
+IGNORECASE rule flags, including non-ASCII case variants of the literals
+"""
+
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from detectors import SignatureSet
+from detectors.signatures import ASCII_FOLDS
+
+PAYLOADS = [
+    "GET /?q=<a href='javaſcript:alert(1)'>x</a> HTTP/1.1\r\n\r\n",        # long s
+    "GET /?q=<ſcript>alert(1)</ſcript> HTTP/1.1\r\n\r\n",
+    "GET /?q=<ſCRIPT>alert(1)</SCRİPT> HTTP/1.1\r\n\r\n",                  # dotted capital I
+    "GET /?id=1 unıon select pass from users HTTP/1.1\r\n\r\n",           # dotless i
+    "GET /?img=<img src=x onerror=alert(1)> HTTP/1.1\r\n\r\n",
+    "GET /?img=<img src=x ONERROR=alert(1)> HTTP/1.1\r\n\r\n",
+    "GET /?id=1' OR '1'='1 HTTP/1.1\r\n\r\n",
+    "GET /index.html HTTP/1.1\r\nHost: café.local\r\nAccept: text/html\r\n\r\n",
+]
+
+
+def sequential(rules, payload):
+    """The old detector: every rule in priority order."""
+    for category, pattern in rules:
+        if re.search(pattern, payload, re.IGNORECASE):
+            return category
+    return None
+
+
+class SignatureSetTest(unittest.TestCase):
+    def setUp(self):
+        self.rules = [("sql_injection", p) for p in config.SQL_INJECTION_PATTERNS]
+        self.rules += [("xss_attempt", p) for p in config.XSS_PATTERNS]
+        self.signatures = SignatureSet(self.rules)
+
+    def test_matches_sequential_loop(self):
+        for payload in PAYLOADS:
+            match = self.signatures.search(payload)
+            with self.subTest(payload=payload):
+                self.assertEqual(match.category if match else None, sequential(self.rules, payload))
+
+    def test_non_ascii_case_variants_are_flagged(self):
+        for payload in PAYLOADS[:4]:
+            with self.subTest(payload=payload):
+                self.assertIsNotNone(self.signatures.search(payload))
+
+    def test_non_ascii_literal_rule_is_always_checked(self):
+        signatures = SignatureSet([("xss_attempt", r"σcript")])
+        self.assertIsNotNone(signatures.search("ΣCRIPT"))
+        self.assertIsNotNone(signatures.search("ςcript"))
+
+    def test_folds_cover_every_ascii_letter_variant(self):
+        letters = [re.compile(letter, re.IGNORECASE) for letter in "abcdefghijklmnopqrstuvwxyz"]
+        expected = {code: pattern.pattern for code in range(0x80, 0x10000)
+                    for pattern in letters if pattern.fullmatch(chr(code))}
+        self.assertEqual(ASCII_FOLDS, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
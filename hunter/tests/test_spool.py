@@ -0,0 +1,124 @@
+"""
+Threat Spool Tests
+Records come back in order, the cursor only moves on success, segments rotate
+and are deleted once replayed, damaged records are skipped, and a batch the
+API rejects is dropped instead of holding the spool forever
+"""
+
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from spool import HEADER, ThreatSpool
+from delivery import ThreatDelivery
+from benchmarks.stub_api import StubThreatAPI
+
+
+def payload(i, risk_score=75):
+    return {"event_id": f"event-{i}", "ip_address": "203.0.113.7", "attack_signature": "PORT_SCAN_DETECTED",
+            "attack_type": "port_scan", "risk_score": risk_score}
+
+
+class SpoolTest(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.directory = tempfile.mkdtemp()
+        self.spool = ThreatSpool(self.directory)
+
+    def tearDown(self):
+        self.spool.close()
+        shutil.rmtree(self.directory)
+        logging.disable(logging.NOTSET)
+
+    def drain(self, limit=1000, attempts=50):
+        # replay() also returns 0 when it only cleared an empty or torn segment, so keep going
+        items = []
+        for _ in range(attempts):
+            self.spool.replay(lambda records: items.extend(r['item'] for r in records) or True, limit)
+        return items
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".log"))
+
+    def leftover_bytes(self):
+        """Bytes still spooled; only the empty active segment should remain after a drain."""
+        return sum(os.path.getsize(os.path.join(self.directory, name)) for name in self.segments())
+
+    def test_replays_in_order_and_empties_the_spool(self):
+        self.assertEqual(self.spool.append("delivery", [payload(i) for i in range(10)]), 10)
+        self.assertEqual([p["event_id"] for p in self.drain(limit=3)], [f"event-{i}" for i in range(10)])
+        self.assertEqual(self.spool.replay(lambda records: True, 10), 0)
+        self.assertEqual(self.spool.metrics()["disk_bytes"], 0)
+
+    def test_failed_handler_keeps_the_cursor(self):
+        self.spool.append("delivery", [payload(i) for i in range(4)])
+        self.assertEqual(self.spool.replay(lambda records: True, 2), 2)
+        self.assertEqual(self.spool.replay(lambda records: False, 2), 0)
+        self.assertEqual([p["event_id"] for p in self.drain()], ["event-2", "event-3"])
+
+    def test_cursor_survives_a_restart(self):
+        self.spool.append("delivery", [payload(i) for i in range(4)])
+        self.spool.replay(lambda records: True, 3)
+        self.spool.close()
+        self.spool = ThreatSpool(self.directory)
+        self.assertEqual([p["event_id"] for p in self.drain()], ["event-3"])
+
+    def test_segments_rotate_and_are_deleted_once_replayed(self):
+        with mock.patch.object(config, "SPOOL_SEGMENT_BYTES", 300):
+            self.spool.close()
+            self.spool = ThreatSpool(self.directory)
+            self.spool.append("delivery", [payload(i) for i in range(10)])
+        self.assertGreater(len(self.segments()), 2)
+        self.assertEqual(len(self.drain()), 10)
+        self.assertEqual(len(self.segments()), 1)
+        self.assertEqual(self.leftover_bytes(), 0)
+
+    def test_disk_cap_rejects_records(self):
+        with mock.patch.object(config, "SPOOL_MAX_BYTES", 500):
+            self.spool.close()
+            self.spool = ThreatSpool(self.directory)
+            written = self.spool.append("delivery", [payload(i) for i in range(10)])
+        self.assertLess(written, 10)
+        self.assertEqual(self.spool.metrics()["rejected"], 10 - written)
+
+    def test_corrupt_and_torn_records_are_skipped(self):
+        self.spool.append("delivery", [payload(0)])
+        self.spool.active.write(HEADER.pack(5) + b"{oops")  # Corrupt JSON
+        self.spool.append("delivery", [payload(1)])
+        self.spool.active.write(HEADER.pack(100) + b"{\"stage\"")  # Torn by a crash mid-write
+        self.spool.sync()
+        self.assertEqual([p["event_id"] for p in self.drain()], ["event-0", "event-1"])
+        self.assertEqual(len(self.segments()), 1)
+        self.assertEqual(self.leftover_bytes(), 0)
+
+    def test_rejected_batch_does_not_block_the_spool(self):
+        stub = StubThreatAPI().start()
+        delivery = ThreatDelivery(batch_url=stub.batch_url)
+        try:
+            self.spool.append("delivery", [payload(0, risk_score=72.5), payload(1)])
+            self.spool.append("delivery", [payload(2), payload(3)])
+            handler = lambda records: delivery.post_batch([r['item'] for r in records])
+
+            self.assertEqual(self.spool.replay(handler, 2), 2)  # Rejected with 422, skipped
+            self.assertEqual(self.spool.replay(handler, 2), 2)
+            self.assertEqual(self.spool.replay(handler, 2), 0)
+        finally:
+            delivery.stop()
+            stub.stop()
+
+        self.assertEqual(stub.rejections, 1)
+        self.assertEqual(stub.threats, 2)
+        metrics = delivery.metrics()
+        self.assertEqual((metrics["delivered"], metrics["rejected"], metrics["dropped"]), (2, 2, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
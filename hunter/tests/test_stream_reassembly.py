@@ -0,0 +1,101 @@
+"""
+Stream Reassembly Tests
+A signature split across segments is still caught, retransmitted bytes are
+not scanned twice, and flows stay within their byte budget and the flow cap
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scapy.all import IP, TCP, Raw
+
+import config
+from detectors import PayloadInspector, StreamReassembler, summarize
+
+SETTINGS = {
+    "REASSEMBLY_ENABLED": True,
+    "REASSEMBLY_MAX_FLOWS": 10000,
+    "REASSEMBLY_IDLE_TIMEOUT": 60,
+    "REASSEMBLY_FLOW_BUDGET": 65536,
+    "REASSEMBLY_OVERLAP": 256,
+}
+
+
+def segment(seq, data=b"", src_ip="203.0.113.7", sport=40000, flags="PA", at=0.0):
+    packet = IP(src=src_ip, dst="10.0.0.5") / TCP(sport=sport, dport=80, seq=seq, flags=flags)
+    if data:
+        packet = packet / Raw(load=data)
+    packet.time = at
+    return summarize(packet)
+
+
+class StreamReassemblerTest(unittest.TestCase):
+
+    def make(self, **overrides):
+        with mock.patch.multiple(config, **{**SETTINGS, **overrides}):
+            return StreamReassembler()
+
+    def test_window_carries_the_overlap(self):
+        streams = self.make(REASSEMBLY_OVERLAP=4)
+        self.assertEqual(streams.feed(segment(1000, b"GET /?id=1 UNI")), b"GET /?id=1 UNI")
+        self.assertEqual(streams.feed(segment(1014, b"ON SELECT")), b" UNION SELECT")
+        self.assertEqual(streams.stats()["bytes_buffered"], 4)
+
+    def test_retransmission_is_not_rescanned(self):
+        streams = self.make()
+        streams.feed(segment(1000, b"abcdef"))
+        self.assertIsNone(streams.feed(segment(1000, b"abcdef")))
+        self.assertEqual(streams.feed(segment(1003, b"defghi")), b"abcdefghi")
+        self.assertEqual(streams.stats()["bytes_inspected"], 9)
+
+    def test_gap_starts_a_fresh_context(self):
+        streams = self.make()
+        streams.feed(segment(1000, b"abc"))
+        self.assertEqual(streams.feed(segment(2000, b"xyz")), b"xyz")
+
+    def test_flow_budget_stops_inspection(self):
+        streams = self.make(REASSEMBLY_FLOW_BUDGET=10)
+        self.assertEqual(streams.feed(segment(1000, b"12345678")), b"12345678")
+        self.assertEqual(streams.feed(segment(1008, b"90abc")), b"1234567890")
+        self.assertIsNone(streams.feed(segment(1013, b"defgh")))
+        self.assertEqual(streams.stats()["bytes_inspected"], 10)
+
+    def test_flow_cap_evicts_least_recently_used(self):
+        streams = self.make(REASSEMBLY_MAX_FLOWS=2)
+        streams.feed(segment(1000, b"a", sport=40000))
+        streams.feed(segment(1000, b"a", sport=40001))
+        streams.feed(segment(1001, b"b", sport=40000))
+        streams.feed(segment(1000, b"a", sport=40002))
+        self.assertEqual([key[1] for key in streams.flows], [40000, 40002])
+        self.assertEqual(streams.stats()["evicted_flows"], 1)
+
+    def test_idle_and_closed_flows_are_dropped(self):
+        streams = self.make(REASSEMBLY_IDLE_TIMEOUT=60)
+        streams.feed(segment(1000, b"abc", sport=40000, at=0.0))
+        streams.feed(segment(1000, b"abc", sport=40001, at=50.0))
+        streams.feed(segment(1003, b"", sport=40001, flags="FA", at=55.0))
+        streams.feed(segment(1000, b"abc", sport=40002, at=61.0))
+        self.assertEqual([key[1] for key in streams.flows], [40002])
+        self.assertEqual(streams.stats()["bytes_buffered"], 3)
+
+
+class SplitSignatureTest(unittest.TestCase):
+
+    def test_union_select_across_segments(self):
+        with mock.patch.multiple(config, **SETTINGS):
+            inspector = PayloadInspector()
+        self.assertIsNone(inspector.analyze(segment(1000, b"GET /?id=1 UNI")))
+        threat = inspector.analyze(segment(1014, b"ON SELECT pass FROM users HTTP/1.1\r\n\r\n"))
+        self.assertIsNotNone(threat)
+        self.assertEqual(threat["attack_type"], "sql_injection")
+
+        # The alerting bytes are forgotten, so the next segment does not alert again
+        self.assertIsNone(inspector.analyze(segment(1052, b"Host: example\r\n")))
+
+
+if __name__ == "__main__":
+    unittest.main()